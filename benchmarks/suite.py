@@ -0,0 +1,341 @@
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from bergmann.convention import DB_MIN_ITERATIONS
+from bergmann.crypto.kuzctrcypher import KuzCtrCypher
+from bergmann.crypto.kuzcypher import KuzCypher, derive_key
+from bergmann.entities.item import Item
+from bergmann.key import Key, KeyMeta
+from bergmann.key_cache import KeyCache
+from bergmann.passwords_model import PasswordsModel
+
+KB = 1 << 10
+MB = 1 << 20
+PASSWORD = "benchmark"
+KDF_ITERATIONS = 150_000
+# A case stops repeating after this many seconds, but runs at least
+# MIN_RUNS times, so the 100 MB cases stay affordable.
+CASE_TIME_BUDGET = 10.0
+MIN_RUNS = 3
+# Slack under which a difference is noise, whatever the threshold says:
+# sub-millisecond cases swing by more than 25% from run to run.
+MIN_TIME_DELTA_MS = 0.2
+MIN_MEMORY_DELTA_MB = 1.0
+# A median within this many interquartile ranges of the baseline's is noise.
+IQR_FACTOR = 2.0
+
+
+@dataclass(frozen=True, slots=True)
+class Profile:
+    payload_sizes: tuple[int, ...]
+    store_sizes: tuple[int, ...]
+    runs: int
+
+
+PROFILES = {
+    "quick": Profile(
+        payload_sizes=(KB, 64 * KB, MB),
+        store_sizes=(10, 1_000, 10_000),
+        runs=20,
+    ),
+    "full": Profile(
+        payload_sizes=(KB, 64 * KB, MB, 16 * MB, 100 * MB),
+        store_sizes=(10, 1_000, 10_000, 100_000),
+        runs=50,
+    ),
+}
+
+
+@dataclass(slots=True)
+class Result:
+    name: str
+    runs: int
+    size_bytes: int
+    p25_ms: float
+    p50_ms: float
+    p75_ms: float
+    p90_ms: float
+    p99_ms: float
+    min_ms: float
+    max_ms: float
+    mb_per_s: float | None
+    peak_memory_mb: float
+
+
+# setup() prepares a case and returns the action to time, and the number of
+# bytes the action processes (0 where throughput means nothing).
+@dataclass(frozen=True, slots=True)
+class Case:
+    name: str
+    setup: Callable[[], tuple[Callable[[], object], int]]
+
+
+def cypher_cases(profile: Profile) -> Iterator[Case]:
+    key = Key(os.urandom(32), KeyMeta(os.urandom(16), KDF_ITERATIONS))
+    for label, cypher_class in (("ecb", KuzCypher), ("ctr", KuzCtrCypher)):
+        for size in profile.payload_sizes:
+            yield Case(
+                f"cypher.{label}.encrypt.{_size_label(size)}",
+                lambda cypher_class=cypher_class, size=size: _encrypt_case(
+                    cypher_class.from_key(key), size
+                ),
+            )
+            yield Case(
+                f"cypher.{label}.decrypt.{_size_label(size)}",
+                lambda cypher_class=cypher_class, size=size: _decrypt_case(
+                    cypher_class.from_key(key), size
+                ),
+            )
+
+
+def kdf_cases() -> Iterator[Case]:
+    key_meta = KeyMeta(os.urandom(16), KDF_ITERATIONS)
+    yield Case(
+        f"kdf.pbkdf2.{KDF_ITERATIONS}",
+        lambda: (lambda: derive_key(PASSWORD.encode(), key_meta), 0),
+    )
+
+
+def store_cases(profile: Profile, directory: Path) -> Iterator[Case]:
+    for count in profile.store_sizes:
+        path = directory / f"store-{count}.bmn"
+        yield Case(
+            f"store.flush.{count}",
+            lambda count=count, path=path: _flush_case(count, path),
+        )
+        yield Case(
+            f"store.load.{count}",
+            lambda count=count, path=path: _load_case(count, path),
+        )
+
+
+def _encrypt_case(cypher: KuzCypher, size: int) -> tuple[Callable[[], object], int]:
+    payload = os.urandom(size)
+    return lambda: cypher.encrypt_into(bytearray(payload)), size
+
+
+def _decrypt_case(cypher: KuzCypher, size: int) -> tuple[Callable[[], object], int]:
+    buffer = bytearray(os.urandom(size))
+    cypher.encrypt_into(buffer)
+    cypher_text = bytes(buffer)
+
+    def decrypt() -> None:
+        with cypher.decrypt_into(bytearray(cypher_text)):
+            pass
+
+    return decrypt, size
+
+
+def _model(count: int) -> PasswordsModel:
+    model = PasswordsModel(
+        key_cache=KeyCache(ttl=math.inf),
+        iterations_provider=lambda: DB_MIN_ITERATIONS,
+    )
+    model.initialize_new_store()
+    model.initialize_key_for_new_db(PASSWORD)
+    model.store.items = [
+        Item(f"site {index}", f"login {index}", f"password {index}")
+        for index in range(count)
+    ]
+    return model
+
+
+def _flush_case(count: int, path: Path) -> tuple[Callable[[], object], int]:
+    model = _model(count)
+    model.flush_encrypted_store(path)
+    return lambda: model.flush_encrypted_store(path), path.stat().st_size
+
+
+# The key comes from the cache, so only reading and decrypting is timed.
+def _load_case(count: int, path: Path) -> tuple[Callable[[], object], int]:
+    model = _model(count)
+    model.flush_encrypted_store(path)
+
+    def load() -> None:
+        with model.read_store_file(path) as store_file:
+            model.initialize_key_for_file(store_file, PASSWORD)
+            model.decrypt_store_file(store_file)
+
+    return load, path.stat().st_size
+
+
+def run_case(case: Case, runs: int) -> Result:
+    action, size = case.setup()
+    action()
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < runs and (
+        len(timings) < MIN_RUNS or time.perf_counter() - started < CASE_TIME_BUDGET
+    ):
+        gc.collect()
+        run_started = time.perf_counter()
+        action()
+        timings.append(time.perf_counter() - run_started)
+    with _traced() as peak:
+        action()
+    timings.sort()
+    p50 = _percentile(timings, 50)
+    return Result(
+        name=case.name,
+        runs=len(timings),
+        size_bytes=size,
+        p25_ms=_percentile(timings, 25) * 1000,
+        p50_ms=p50 * 1000,
+        p75_ms=_percentile(timings, 75) * 1000,
+        p90_ms=_percentile(timings, 90) * 1000,
+        p99_ms=_percentile(timings, 99) * 1000,
+        min_ms=timings[0] * 1000,
+        max_ms=timings[-1] * 1000,
+        mb_per_s=size / MB / p50 if size else None,
+        peak_memory_mb=peak() / MB,
+    )
+
+
+# Peak of the memory allocated by Python while tracing, mmap'ed files and
+# buffers of C extensions aside.
+@contextmanager
+def _traced() -> Iterator[Callable[[], int]]:
+    gc.collect()
+    tracemalloc.start()
+    peak = 0
+    try:
+        yield lambda: peak
+    finally:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+
+# Nearest rank on sorted values.
+def _percentile(values: list[float], percent: int) -> float:
+    rank = max(math.ceil(percent / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+def _size_label(size: int) -> str:
+    if size >= MB:
+        return f"{size // MB}mb"
+    return f"{size // KB}kb"
+
+
+# Names of the cases whose median or peak memory grew past the threshold,
+# a fraction of the baseline value. A slower median also has to clear the
+# spread of the runs, IQR_FACTOR times the wider interquartile range of the
+# two, and MIN_TIME_DELTA_MS: a single fast or slow run moves neither.
+def regressions(
+    results: list[Result], baseline: dict[str, dict], threshold: float
+) -> list[str]:
+    failed = []
+    for result in results:
+        base = baseline.get(result.name)
+        if base is None:
+            continue
+        slower = result.p50_ms - base["p50_ms"]
+        spread = max(
+            result.p75_ms - result.p25_ms,
+            base.get("p75_ms", base["p50_ms"]) - base.get("p25_ms", base["p50_ms"]),
+        )
+        time_bound = max(
+            MIN_TIME_DELTA_MS, threshold * base["p50_ms"], IQR_FACTOR * spread
+        )
+        bigger = result.peak_memory_mb - base["peak_memory_mb"]
+        if slower > time_bound or (
+            bigger > MIN_MEMORY_DELTA_MB and bigger > threshold * base["peak_memory_mb"]
+        ):
+            failed.append(result.name)
+    return failed
+
+
+def print_results(results: list[Result], baseline: dict[str, dict]) -> None:
+    print(
+        f"{'case':<28} {'runs':>5} {'p50 ms':>10} {'p90 ms':>10} {'p99 ms':>10}"
+        f" {'MB/s':>8} {'peak MB':>8} {'vs base':>8}"
+    )
+    for result in results:
+        throughput = f"{result.mb_per_s:8.1f}" if result.mb_per_s else f"{'-':>8}"
+        base = baseline.get(result.name)
+        change = (
+            f"{(result.p50_ms / base['p50_ms'] - 1) * 100:+7.1f}%"
+            if base and base["p50_ms"]
+            else f"{'-':>8}"
+        )
+        print(
+            f"{result.name:<28} {result.runs:>5} {result.p50_ms:10.3f}"
+            f" {result.p90_ms:10.3f} {result.p99_ms:10.3f} {throughput}"
+            f" {result.peak_memory_mb:8.1f} {change}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    parser.add_argument("--profile", choices=PROFILES, default="quick")
+    parser.add_argument("--filter", default="", help="run cases containing this")
+    parser.add_argument("--save", type=Path, help="write the results as a baseline")
+    parser.add_argument("--compare", type=Path, help="baseline to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="fail when the median or peak memory grow past this fraction",
+    )
+    args = parser.parse_args()
+    profile = PROFILES[args.profile]
+    baseline = {}
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())["results"]
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        cases = [
+            case
+            for case in (
+                *cypher_cases(profile),
+                *kdf_cases(),
+                *store_cases(profile, Path(directory)),
+            )
+            if args.filter in case.name
+        ]
+        for case in cases:
+            results.append(run_case(case, profile.runs))
+            print(f"{case.name} done", file=sys.stderr)
+        failed = regressions(results, baseline, args.threshold)
+        # A case fails the gate only if a second run regresses too, so a
+        # burst of load on the machine doesn't.
+        if failed:
+            print(f"confirming {', '.join(failed)}", file=sys.stderr)
+            reruns = [
+                run_case(case, profile.runs) for case in cases if case.name in failed
+            ]
+            failed = regressions(reruns, baseline, args.threshold)
+    print_results(results, baseline)
+
+    if args.save:
+        args.save.write_text(
+            json.dumps(
+                {
+                    "profile": args.profile,
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "results": {result.name: asdict(result) for result in results},
+                },
+                indent=2,
+            )
+        )
+    if failed:
+        print(f"regressed past {args.threshold:.0%}: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
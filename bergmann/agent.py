@@ -0,0 +1,282 @@
+import json
+import os
+import socket
+import socketserver
+import stat
+import struct
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, Final, Self
+
+from bergmann.common.exceptions import AgentError
+from bergmann.entities.item import Item
+from bergmann.interactor import Interactor
+from bergmann.search_index import SearchIndex
+
+AGENT_SOCKET_ENV: Final[str] = "BERGMANN_AGENT_SOCK"
+# The agent locks, wiping the unlocked store, after this long without requests.
+AGENT_IDLE_TIMEOUT: Final[float] = 15 * 60
+# Requests are single lines of JSON no longer than this.
+MAX_REQUEST_SIZE: Final[int] = 64 * 1024
+FIELDS: Final[tuple[str, ...]] = ("password", "login", "description", "id")
+
+type Response = dict[str, Any]
+
+
+def default_socket_path() -> Path:
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return Path(runtime_dir) / "bergmann-agent.sock"
+    return Path(tempfile.gettempdir()) / f"bergmann-{os.getuid()}" / "agent.sock"
+
+
+# Serves lookups in one unlocked store, in the spirit of ssh-agent: the key
+# is derived and the store decrypted once, then every request is a lookup in
+# memory. Requests and responses are lines of JSON:
+#
+#   {"op": "get", "store": path, "query": id or terms, "field": "password"}
+#   {"op": "list", "store": path, "query": terms}
+#   {"op": "ping"} and {"op": "lock"}
+#
+# answered with {"ok": true, ...} or {"ok": false, "error": message}.
+#
+# The agent serves the store as it was unlocked: once the file changes, it
+# locks rather than answer from a stale copy.
+#
+# Only processes of the same user are served: the socket lives in a private
+# directory and, where the platform tells, the peer's uid is checked too.
+class Agent:
+    def __init__(
+        self,
+        store: Path,
+        gateway: Interactor,
+        items: list[Item],
+        idle_timeout: float = AGENT_IDLE_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._store = str(store.resolve())
+        self._store_version = _file_version(store)
+        self._gateway = gateway
+        self._items = {item.id: item for item in items}
+        self._index = SearchIndex(items)
+        self._idle_timeout = idle_timeout
+        self._clock = clock
+        self._last_request_at = clock()
+        # The index caches the last query, so requests are served one by one.
+        self._lock = threading.Lock()
+        self._locked = threading.Event()
+        self._server: _Server | None = None
+        self._socket_path: Path | None = None
+
+    @property
+    def locked(self) -> bool:
+        return self._locked.is_set()
+
+    def handle(self, request: dict[str, Any]) -> Response:
+        with self._lock:
+            self._last_request_at = self._clock()
+            if self.locked:
+                return _error("agent is locked")
+            op = request.get("op")
+            if op == "ping":
+                return {"ok": True, "store": self._store}
+            if op == "lock":
+                self._lock_store()
+                return {"ok": True}
+            if op not in ("get", "list"):
+                return _error(f"unknown op {op!r}")
+            if request.get("store") != self._store:
+                return _error(f"agent holds {self._store}")
+            if _file_version(Path(self._store)) != self._store_version:
+                self._lock_store()
+                return _error("store changed on disk, agent locked")
+            query = request.get("query", "")
+            if not isinstance(query, str):
+                return _error("query must be a string")
+            if op == "list":
+                return {"ok": True, "items": self._list(query)}
+            return self._get(query, request.get("field", "password"))
+
+    def lock(self) -> None:
+        with self._lock:
+            self._lock_store()
+
+    # Binds the socket, so clients can connect as soon as this returns;
+    # requests are answered once serve runs.
+    def listen(self, path: Path) -> None:
+        _prepare_socket_dir(path.parent)
+        path.unlink(missing_ok=True)
+        umask = os.umask(0o177)
+        try:
+            self._server = _Server(str(path), self)
+        finally:
+            os.umask(umask)
+        self._socket_path = path
+
+    # Blocks until the agent is locked, by request or by the idle timeout.
+    def serve(self) -> None:
+        server, path = self._server, self._socket_path
+        if server is None or path is None:
+            raise AgentError("agent is not listening")
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            while not self._locked.wait(self._idle_left()):
+                if self._idle_left() <= 0:
+                    break
+        finally:
+            server.shutdown()
+            server.server_close()
+            path.unlink(missing_ok=True)
+            self.lock()
+
+    def _get(self, query: str, field: object) -> Response:
+        if field not in FIELDS:
+            return _error(f"unknown field {field!r}")
+        try:
+            item = self._items[self._index.find_one(query)]
+        except LookupError as error:
+            return _error(str(error))
+        if field == "password":
+            return {"ok": True, "value": self._gateway.reveal_password(item)}
+        return {"ok": True, "value": getattr(item, str(field))}
+
+    def _list(self, query: str) -> list[list[str]]:
+        items = self._items
+        return [
+            [item_id, items[item_id].login, items[item_id].description]
+            for item_id in self._index.search(query)
+        ]
+
+    def _lock_store(self) -> None:
+        if self.locked:
+            return
+        self._items.clear()
+        self._index = SearchIndex()
+        self._gateway.clean()
+        self._gateway.forget_keys()
+        self._locked.set()
+
+    def _idle_left(self) -> float:
+        return self._last_request_at + self._idle_timeout - self._clock()
+
+
+class AgentClient:
+    def __init__(self, path: Path, timeout: float = 5.0):
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self._socket.settimeout(timeout)
+            self._socket.connect(str(path))
+        except OSError:
+            self._socket.close()
+            raise
+        self._reader = self._socket.makefile("rb")
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._reader.close()
+        self._socket.close()
+
+    def store(self) -> Path:
+        return Path(self.request({"op": "ping"})["store"])
+
+    def get_field(self, store: Path, query: str, field: str = "password") -> str:
+        request = {"op": "get", "store": str(store.resolve()), "query": query}
+        return self.request({**request, "field": field})["value"]
+
+    def list_items(self, store: Path, query: str = "") -> list[tuple[str, str, str]]:
+        request = {"op": "list", "store": str(store.resolve()), "query": query}
+        return [tuple(item) for item in self.request(request)["items"]]
+
+    def lock(self) -> None:
+        self.request({"op": "lock"})
+
+    def request(self, request: dict[str, Any]) -> Response:
+        self._socket.sendall(json.dumps(request).encode() + b"\n")
+        line = self._reader.readline()
+        if not line:
+            raise AgentError("agent closed the connection")
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise AgentError(response.get("error", "request failed"))
+        return response
+
+
+class _Server(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, agent: Agent):
+        self.agent = agent
+        super().__init__(path, _Handler)
+
+    def verify_request(self, request: Any, client_address: Any) -> bool:
+        uid = peer_uid(request)
+        return uid is None or uid == os.getuid()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: _Server
+
+    def handle(self) -> None:
+        while line := self.rfile.readline(MAX_REQUEST_SIZE + 1):
+            if len(line) > MAX_REQUEST_SIZE:
+                self._respond(_error("request too long"))
+                return
+            try:
+                request = json.loads(line)
+            except ValueError:
+                self._respond(_error("request is not JSON"))
+                return
+            if not isinstance(request, dict):
+                self._respond(_error("request must be an object"))
+                return
+            self._respond(self.server.agent.handle(request))
+
+    def _respond(self, response: Response) -> None:
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+# The uid of the process on the other end, None where the platform doesn't
+# tell (the socket's directory permissions still apply). Only Linux lays out
+# SO_PEERCRED as pid, uid, gid; OpenBSD puts the uid first.
+def peer_uid(connection: socket.socket) -> int | None:
+    if sys.platform != "linux":
+        return None
+    credentials = connection.getsockopt(
+        socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i")
+    )
+    _, uid, _ = struct.unpack("3i", credentials)
+    return uid
+
+
+# The socket's directory is what keeps other users out where the peer's uid
+# can't be checked, so it has to be ours and closed to anyone else. Shared
+# directories such as /tmp are refused, sticky or not.
+def _prepare_socket_dir(path: Path) -> None:
+    path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    info = path.stat()
+    if info.st_uid != os.getuid():
+        raise AgentError(f"{path} belongs to another user")
+    if stat.S_IMODE(info.st_mode) & 0o077:
+        raise AgentError(f"{path} is accessible to other users")
+
+
+def _file_version(path: Path) -> tuple[int, int] | None:
+    try:
+        info = path.stat()
+    except FileNotFoundError:
+        return None
+    return info.st_mtime_ns, info.st_size
+
+
+def _error(message: str) -> Response:
+    return {"ok": False, "error": message}
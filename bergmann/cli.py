@@ -0,0 +1,291 @@
+import argparse
+import getpass
+import os
+import signal
+import sys
+from contextlib import suppress
+from pathlib import Path
+from typing import TextIO
+
+from bergmann.agent import (
+    AGENT_IDLE_TIMEOUT,
+    AGENT_SOCKET_ENV,
+    FIELDS,
+    Agent,
+    AgentClient,
+    default_socket_path,
+)
+from bergmann.common.exceptions import (
+    AgentError,
+    CommandFailed,
+    IntegrityError,
+    InvalidHeader,
+)
+from bergmann.di import di
+from bergmann.entities.item import Item
+from bergmann.interactor import Interactor
+from bergmann.search_index import SearchIndex
+
+COMMANDS = ("get", "list", "add", "rm", "agent")
+# Written by the forked agent to its parent once it listens.
+AGENT_READY = b"ready"
+
+
+# Secrets come from the terminal, or line by line from a file descriptor
+# when one is given, so scripts can pass them without echoing or argv.
+class SecretReader:
+    def __init__(self, fd: int | None):
+        self._file = None if fd is None else os.fdopen(fd, closefd=False)
+
+    def read(self, prompt: str) -> str:
+        if self._file is None:
+            return getpass.getpass(prompt)
+        line = self._file.readline()
+        if not line:
+            raise CommandFailed(f"no secret left on fd {self._file.fileno()}")
+        return line.removesuffix("\n")
+
+
+# Runs one subcommand against an existing store without the TUI. Results go
+# to stdout, errors to stderr; returns the exit status.
+def run(argv: list[str], stdout: TextIO = sys.stdout) -> int:
+    args = build_parser().parse_args(argv)
+    gateway = di.gateway
+    try:
+        args.command(args, gateway, SecretReader(args.password_fd), stdout)
+        gateway.flush()
+    except (CommandFailed, AgentError) as error:
+        return _fail(str(error))
+    except IntegrityError:
+        return _fail("password invalid or store corrupted")
+    except InvalidHeader as error:
+        return _fail(f"corrupted store, first corrupted part: {error.reason}")
+    except OSError as error:
+        return _fail(str(error))
+    finally:
+        # A failed write was reported above, cleaning only retries it.
+        with suppress(Exception):
+            gateway.clean()
+        gateway.forget_keys()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("store", type=Path, help="path of the store file")
+    common.add_argument(
+        "--password-fd",
+        type=int,
+        metavar="FD",
+        help="read secrets line by line from FD instead of the terminal",
+    )
+    parser = argparse.ArgumentParser(prog="bergmann")
+    commands = parser.add_subparsers(required=True)
+
+    get = commands.add_parser(
+        "get", parents=[common], help="print a field of the item matching QUERY"
+    )
+    get.add_argument("query", help="item id or search terms matching one item")
+    get.add_argument("--field", choices=FIELDS, default="password")
+    get.set_defaults(command=get_item)
+
+    list_ = commands.add_parser(
+        "list", parents=[common], help="print id, login and description of items"
+    )
+    list_.add_argument("query", nargs="?", default="", help="search terms")
+    list_.set_defaults(command=list_items)
+
+    add = commands.add_parser(
+        "add", parents=[common], help="add an item, its password is asked for"
+    )
+    add.add_argument("--login", required=True)
+    add.add_argument("--description", required=True)
+    add.set_defaults(command=add_item)
+
+    rm = commands.add_parser("rm", parents=[common], help="remove the item by id")
+    rm.add_argument("item_id")
+    rm.set_defaults(command=remove_item)
+
+    agent = commands.add_parser(
+        "agent",
+        parents=[common],
+        help=f"keep the store unlocked and serve get and list, see {AGENT_SOCKET_ENV}",
+    )
+    agent.add_argument("--socket", type=Path, help="path of the agent's socket")
+    agent.add_argument(
+        "--foreground",
+        action="store_true",
+        help="serve in the foreground instead of forking into the background",
+    )
+    agent.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=AGENT_IDLE_TIMEOUT,
+        metavar="SECONDS",
+        help="lock and exit after this long without requests",
+    )
+    agent.set_defaults(command=run_agent)
+    return parser
+
+
+# get and list go through the agent when one serves the store, see run_agent.
+def get_item(
+    args: argparse.Namespace, gateway: Interactor, secrets: SecretReader, out: TextIO
+) -> None:
+    agent = _agent_for(args.store)
+    if agent is not None:
+        with agent:
+            print(agent.get_field(args.store, args.query, args.field), file=out)
+        return
+    item = _only_match(_unlock(args.store, gateway, secrets), args.query)
+    if args.field == "password":
+        print(gateway.reveal_password(item), file=out)
+    else:
+        print(getattr(item, args.field), file=out)
+
+
+def list_items(
+    args: argparse.Namespace, gateway: Interactor, secrets: SecretReader, out: TextIO
+) -> None:
+    agent = _agent_for(args.store)
+    if agent is not None:
+        with agent:
+            for item in agent.list_items(args.store, args.query):
+                print(*item, sep="\t", file=out)
+        return
+    items = {item.id: item for item in _unlock(args.store, gateway, secrets)}
+    for item_id in SearchIndex(items.values()).search(args.query):
+        item = items[item_id]
+        print(item.id, item.login, item.description, sep="\t", file=out)
+
+
+def add_item(
+    args: argparse.Namespace, gateway: Interactor, secrets: SecretReader, out: TextIO
+) -> None:
+    _unlock(args.store, gateway, secrets)
+    item = Item(
+        description=args.description,
+        login=args.login,
+        password=secrets.read("Item password: "),
+    )
+    gateway.add_item(args.store, item)
+    print(item.id, file=out)
+
+
+def remove_item(
+    args: argparse.Namespace, gateway: Interactor, secrets: SecretReader, out: TextIO
+) -> None:
+    items = _unlock(args.store, gateway, secrets)
+    if all(item.id != args.item_id for item in items):
+        raise CommandFailed(f"no item with id {args.item_id}")
+    gateway.delete_item(args.store, args.item_id)
+
+
+# Prints the socket in the shell syntax of ssh-agent, so that
+# eval "$(bergmann agent STORE)" points later commands at it. Like ssh-agent,
+# it forks: the command returns, and eval with it, while the child serves
+# until locked. The fork comes before the store is unlocked, while the main
+# thread is the only one running.
+def run_agent(
+    args: argparse.Namespace, gateway: Interactor, secrets: SecretReader, out: TextIO
+) -> None:
+    password = _read_master_password(args.store, gateway, secrets)
+    path = args.socket or default_socket_path()
+    if args.foreground:
+        agent = _start_agent(args, gateway, password, path)
+        _print_socket(path, out)
+    elif (ready_fd := _fork()) is None:
+        _print_socket(path, out)
+        return
+    else:
+        with os.fdopen(ready_fd, "wb") as ready:
+            agent = _start_agent(args, gateway, password, path)
+            ready.write(AGENT_READY)
+        _detach()
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    with suppress(KeyboardInterrupt):
+        agent.serve()
+
+
+def _start_agent(
+    args: argparse.Namespace, gateway: Interactor, password: str, path: Path
+) -> Agent:
+    items = gateway.load_existent_store(args.store, password)
+    agent = Agent(args.store, gateway, items, idle_timeout=args.idle_timeout)
+    agent.listen(path)
+    return agent
+
+
+def _print_socket(path: Path, out: TextIO) -> None:
+    print(f"{AGENT_SOCKET_ENV}={path}; export {AGENT_SOCKET_ENV};", file=out)
+    out.flush()
+
+
+# Returns in the parent once the child has reported it listens. If it
+# failed to, the child's own error comes first on stderr. The child gets the
+# end of the pipe to report on.
+def _fork() -> int | None:
+    read_fd, write_fd = os.pipe()
+    if pid := os.fork():
+        os.close(write_fd)
+        with os.fdopen(read_fd, "rb") as ready:
+            if ready.read() != AGENT_READY:
+                os.waitpid(pid, 0)
+                raise CommandFailed("agent exited before listening")
+        return None
+    os.close(read_fd)
+    return write_fd
+
+
+# The child leaves the session of the terminal and lets go of the standard
+# streams: eval reads the command's output until it is closed.
+def _detach() -> None:
+    os.setsid()
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+    os.close(devnull)
+
+
+def _agent_for(store: Path) -> AgentClient | None:
+    path = os.environ.get(AGENT_SOCKET_ENV)
+    if not path:
+        return None
+    try:
+        client = AgentClient(Path(path))
+    except OSError:
+        return None
+    try:
+        if client.store() == store.resolve():
+            return client
+    except (OSError, AgentError):
+        pass
+    client.close()
+    return None
+
+
+def _unlock(path: Path, gateway: Interactor, secrets: SecretReader) -> list[Item]:
+    password = _read_master_password(path, gateway, secrets)
+    return gateway.load_existent_store(path, password)
+
+
+def _read_master_password(
+    path: Path, gateway: Interactor, secrets: SecretReader
+) -> str:
+    # Named the other way round: true for an empty file.
+    if gateway.is_store_initialized(path):
+        raise CommandFailed(f"{path} is empty, initialize it in the TUI first")
+    return secrets.read("Master password: ")
+
+
+def _only_match(items: list[Item], query: str) -> Item:
+    try:
+        item_id = SearchIndex(items).find_one(query)
+    except LookupError as error:
+        raise CommandFailed(f"{error}, see bergmann list") from None
+    return next(item for item in items if item.id == item_id)
+
+
+def _fail(message: str) -> int:
+    print(f"bergmann: {message}", file=sys.stderr)
+    return 1
@@ -1 +0,0 @@
-from bergmann.common.logger import logger
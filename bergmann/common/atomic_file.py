@@ -0,0 +1,61 @@
+import os
+import stat
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager, suppress
+from pathlib import Path
+from typing import BinaryIO
+
+
+# Writes go to a sibling temp file that replaces the target only once it is
+# complete and synced, so a crash leaves either the old or the new content.
+# The temp file is allocated at the expected size upfront, so its blocks are
+# reserved in one go instead of growing with every write.
+#
+# The temp file has a unique name, so concurrent writers don't clobber each
+# other's, and is created readable by the owner only; the mode of the
+# target is applied once the content is in.
+@contextmanager
+def atomic_write(path: Path, expected_size: int = 0) -> Iterator[BinaryIO]:
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    temp_path = Path(temp_name)
+    file = os.fdopen(fd, "w+b")
+    try:
+        _preallocate(file, expected_size)
+        yield file
+        file.flush()
+        _copy_mode(path, file)
+        os.fsync(file.fileno())
+        file.close()
+        os.replace(temp_path, path)
+    except BaseException:
+        file.close()
+        with suppress(FileNotFoundError):
+            temp_path.unlink()
+        raise
+    sync_directory(path.parent)
+
+
+def sync_directory(path: Path) -> None:
+    if os.name != "posix":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _copy_mode(path: Path, file: BinaryIO) -> None:
+    try:
+        mode = path.stat().st_mode
+    except FileNotFoundError:
+        return
+    os.chmod(file.fileno(), stat.S_IMODE(mode))
+
+
+def _preallocate(file: BinaryIO, size: int) -> None:
+    if size <= 0 or not hasattr(os, "posix_fallocate"):
+        return
+    with suppress(OSError):
+        os.posix_fallocate(file.fileno(), 0, size)
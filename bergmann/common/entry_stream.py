@@ -0,0 +1,119 @@
+from collections.abc import Callable, Iterable, Sequence
+from typing import Final
+
+# First byte of the encoded content, bumped on any change of the layout.
+ENTRIES_FORMAT_VERSION: Final[int] = 1
+
+# Entries as a version byte followed by length-prefixed entries, each a
+# sequence of length-prefixed UTF-8 fields. Lengths are LEB128 varints, so
+# a field under 128 bytes costs one byte on top of its text, where JSON
+# spends quotes and separators and six bytes per escaped non-ASCII char.
+
+
+def encode_entries(entries: Iterable[Sequence[str]]) -> bytearray:
+    buffer = bytearray((ENTRIES_FORMAT_VERSION,))
+    body = bytearray()
+    for entry in entries:
+        body.clear()
+        _encode_fields(body, entry)
+        _write_varint(buffer, len(body))
+        buffer += body
+    return buffer
+
+
+# The record of a single entry, as encode_entries writes it after its length.
+def encode_entry(entry: Sequence[str]) -> bytes:
+    body = bytearray()
+    _encode_fields(body, entry)
+    return bytes(body)
+
+
+# Incrementally decodes what encode_entries produced. Bytes are fed in
+# arbitrary chunks and every entry is returned as soon as it is complete,
+# so at most one entry is buffered. Given a digest function, the stream
+# also collects the digest of every record as it was read.
+class EntryStream:
+    def __init__(self, record_digest: Callable[[memoryview], bytes] | None = None):
+        self._buffer = bytearray()
+        self._version_read = False
+        self._record_digest = record_digest
+        self.digests: list[bytes] = []
+
+    def feed(self, data: bytes | memoryview) -> list[list[str]]:
+        self._buffer += data
+        return self._parse()
+
+    def close(self) -> list[list[str]]:
+        entries = self._parse()
+        if self._buffer or not self._version_read:
+            raise ValueError("incomplete entries stream")
+        return entries
+
+    def _parse(self) -> list[list[str]]:
+        buffer = self._buffer
+        if not self._version_read:
+            if not buffer:
+                return []
+            if buffer[0] != ENTRIES_FORMAT_VERSION:
+                raise ValueError(f"unsupported entries format version {buffer[0]}")
+            del buffer[0]
+            self._version_read = True
+        entries = []
+        offset = 0
+        with memoryview(buffer) as view:
+            while offset < len(view):
+                length = _read_varint(view, offset)
+                if length is None:
+                    break
+                size, body_offset = length
+                end = body_offset + size
+                if end > len(view):
+                    break
+                entries.append(_decode_fields(view, body_offset, end))
+                if self._record_digest is not None:
+                    self.digests.append(self._record_digest(view[body_offset:end]))
+                offset = end
+        del buffer[:offset]
+        return entries
+
+
+def _encode_fields(body: bytearray, entry: Sequence[str]) -> None:
+    for field in entry:
+        data = field.encode("utf8")
+        _write_varint(body, len(data))
+        body += data
+
+
+def _decode_fields(view: memoryview, offset: int, end: int) -> list[str]:
+    fields = []
+    while offset < end:
+        length = _read_varint(view, offset)
+        if length is None or length[1] + length[0] > end:
+            raise ValueError("entry field overruns the entry")
+        size, offset = length
+        fields.append(str(view[offset : offset + size], "utf8"))
+        offset += size
+    return fields
+
+
+def _write_varint(buffer: bytearray, value: int) -> None:
+    while value >= 0x80:
+        buffer.append(value & 0x7F | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+# None when the buffer ends in the middle of the varint.
+def _read_varint(view: memoryview, offset: int) -> tuple[int, int] | None:
+    value = 0
+    shift = 0
+    while offset < len(view):
+        byte = view[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+        if shift > 63:
+            raise ValueError("varint too long")
+    return None
@@ -4,7 +4,9 @@ from typing import Literal
 class InvalidHeader(Exception):
     def __init__(
         self,
-        reason: Literal["magic-bytes", "alg", "salt", "iterations", "content-hash"],
+        reason: Literal[
+            "magic-bytes", "alg", "salt", "iterations", "content-hash", "flags"
+        ],
         *args,
     ):
         self.reason = reason
@@ -12,4 +14,19 @@ class InvalidHeader(Exception):
 
 
 class IntegrityError(Exception):
+    # Set when the damage is pinned down to a single item.
+    def __init__(self, *args, item_id: str | None = None):
+        self.item_id = item_id
+        super().__init__(*args)
+
+
+class OperationCancelled(Exception):
+    pass
+
+
+class CommandFailed(Exception):
+    pass
+
+
+class AgentError(Exception):
     pass
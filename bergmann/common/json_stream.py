@@ -0,0 +1,104 @@
+import codecs
+import json
+import re
+from typing import Any, Final
+
+_STRING_BODY: Final[re.Pattern[str]] = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*', re.DOTALL)
+_STRING: Final[str] = rf'"{_STRING_BODY.pattern}"'
+# An array of strings, the shape of every stored item, matched in one go.
+_FLAT_ARRAY: Final[re.Pattern[str]] = re.compile(
+    rf"\[\s*(?:{_STRING}\s*(?:,\s*{_STRING}\s*)*)?\]", re.DOTALL
+)
+_STRUCTURAL: Final[re.Pattern[str]] = re.compile(r'["\[\]{}]')
+_WHITESPACE: Final[str] = " \t\n\r"
+
+
+# Incrementally parses a top-level JSON array whose elements are arrays or
+# objects. Bytes are fed in arbitrary chunks and every element is returned
+# as soon as its closing bracket arrives, so at most one element is buffered
+# and each character is scanned once, however large the element is.
+class JsonArrayStream:
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder("utf8")()
+        self._element: list[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._finished = False
+
+    def feed(self, data: bytes | memoryview) -> list[Any]:
+        return self._parse(self._decoder.decode(data))
+
+    def close(self) -> list[Any]:
+        elements = self._parse(self._decoder.decode(b"", final=True))
+        if not self._finished:
+            raise ValueError("incomplete JSON array")
+        return elements
+
+    def _parse(self, text: str) -> list[Any]:
+        elements: list[Any] = []
+        position = 0
+        element_start = 0
+        while position < len(text):
+            if self._in_string:
+                position = self._skip_string(text, position)
+                continue
+            if self._depth <= 1:
+                position = self._skip_separators(text, position)
+                if position == len(text):
+                    break
+                element_start = position
+                flat_array = (
+                    _FLAT_ARRAY.match(text, position) if self._depth == 1 else None
+                )
+                if flat_array is not None:
+                    elements.append(json.loads(flat_array.group()))
+                    position = flat_array.end()
+                    continue
+            match = _STRUCTURAL.search(text, position)
+            if match is None:
+                break
+            position = match.end()
+            char = match.group()
+            if char == '"':
+                self._in_string = True
+            elif char in "[{":
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._depth == 1:
+                    self._element.append(text[element_start:position])
+                    elements.append(json.loads("".join(self._element)))
+                    self._element.clear()
+                elif self._depth == 0:
+                    self._finished = True
+        if self._depth > 1:
+            self._element.append(text[element_start:])
+        return elements
+
+    def _skip_string(self, text: str, position: int) -> int:
+        if self._escaped:
+            self._escaped = False
+            return position + 1
+        position = _STRING_BODY.match(text, position).end()  # type: ignore[union-attr]
+        if position == len(text):
+            return position
+        # Either the closing quote or a backslash split from its escapee.
+        if text[position] == "\\":
+            self._escaped = True
+        else:
+            self._in_string = False
+        return position + 1
+
+    def _skip_separators(self, text: str, position: int) -> int:
+        separators = _WHITESPACE + "," if self._depth == 1 else _WHITESPACE
+        while position < len(text) and text[position] in separators:
+            position += 1
+        if position == len(text):
+            return position
+        if self._finished:
+            raise ValueError("trailing content after JSON array")
+        expected = "[{]" if self._depth == 1 else "["
+        if text[position] not in expected:
+            raise ValueError("JSON array of arrays or objects expected")
+        return position
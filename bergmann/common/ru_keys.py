@@ -12,3 +12,4 @@ RU_KEY_FOR_EN__U: Final[str] = "г"
 RU_KEY_FOR_EN__P: Final[str] = "з"
 RU_KEY_FOR_EN__D: Final[str] = "в"
 RU_KEY_FOR_EN__E: Final[str] = "у"
+RU_KEY_FOR_EN__S: Final[str] = "ы"
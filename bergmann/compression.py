@@ -0,0 +1,76 @@
+import lzma
+import zlib
+from collections.abc import Buffer, Iterable, Iterator
+
+from bergmann.convention import StoreFlags
+from bergmann.crypto.kuzcypher import STREAM_CHUNK_SIZE
+
+
+def is_compressed(flags: StoreFlags) -> bool:
+    return bool(flags & (StoreFlags.ZLIB_COMPRESSED | StoreFlags.LZMA_COMPRESSED))
+
+
+# None level stands for the default of the codec.
+def compress(data: Buffer, flags: StoreFlags, level: int | None = None) -> bytearray:
+    if flags & StoreFlags.LZMA_COMPRESSED:
+        compressor = lzma.LZMACompressor(
+            preset=lzma.PRESET_DEFAULT if level is None else level
+        )
+    else:
+        compressor = zlib.compressobj(
+            zlib.Z_DEFAULT_COMPRESSION if level is None else level
+        )
+    result = bytearray()
+    with memoryview(data) as view:
+        for offset in range(0, len(view), STREAM_CHUNK_SIZE):
+            with view[offset : offset + STREAM_CHUNK_SIZE] as chunk:
+                result += compressor.compress(chunk)
+    result += compressor.flush()
+    return result
+
+
+# Output comes in pieces of at most STREAM_CHUNK_SIZE, however well the
+# input compresses. Damaged input raises ValueError.
+def iter_decompress(chunks: Iterable[Buffer], flags: StoreFlags) -> Iterator[bytes]:
+    try:
+        if flags & StoreFlags.LZMA_COMPRESSED:
+            yield from _iter_lzma(chunks)
+        else:
+            yield from _iter_zlib(chunks)
+    except (zlib.error, lzma.LZMAError) as error:
+        raise ValueError("damaged compressed content") from error
+
+
+def _iter_zlib(chunks: Iterable[Buffer]) -> Iterator[bytes]:
+    decompressor = zlib.decompressobj()
+    for chunk in chunks:
+        data = memoryview(chunk)
+        while data:
+            if decompressor.eof:
+                raise ValueError("trailing data after compressed content")
+            output = decompressor.decompress(data, STREAM_CHUNK_SIZE)
+            data = memoryview(decompressor.unconsumed_tail)
+            if output:
+                yield output
+        # Output held back by the size limit once the input is used up.
+        while output := decompressor.decompress(b"", STREAM_CHUNK_SIZE):
+            yield output
+    if not decompressor.eof or decompressor.unused_data:
+        raise ValueError("incomplete compressed content")
+
+
+def _iter_lzma(chunks: Iterable[Buffer]) -> Iterator[bytes]:
+    decompressor = lzma.LZMADecompressor()
+    for chunk in chunks:
+        data = memoryview(chunk)
+        while not decompressor.eof:
+            output = decompressor.decompress(data, STREAM_CHUNK_SIZE)
+            data = memoryview(b"")
+            if output:
+                yield output
+            if decompressor.needs_input:
+                break
+        if data and decompressor.eof:
+            raise ValueError("trailing data after compressed content")
+    if not decompressor.eof or decompressor.unused_data:
+        raise ValueError("incomplete compressed content")
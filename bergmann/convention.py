@@ -1,8 +1,76 @@
+from enum import IntFlag
 from typing import Final
 
-DB_MAGIC_BYTES: Final[bytes] = b"68210121"
-DB_ALG_BYTES: Final[bytes] = b"KUZ"
+
+class StoreFlags(IntFlag):
+    # Snapshot followed by appended add/replace/delete records.
+    JOURNAL = 1
+    # Every field is encrypted on its own, so listing items leaves passwords
+    # encrypted. Reveals the length of each field.
+    FIELD_ENCRYPTED = 2
+    # Individually encrypted records located through an encrypted index, so
+    # a single item is read or rewritten in place. Excludes JOURNAL.
+    INDEXED = 4
+    # The snapshot is encoded with common.entry_stream instead of JSON.
+    BINARY_ENTRIES = 8
+    # The snapshot is compressed before it is encrypted. At most one is set.
+    ZLIB_COMPRESSED = 16
+    LZMA_COMPRESSED = 32
+
+
+# Header of the current format: content hash is the Merkle root of the
+# digests of the items.
+DB_MAGIC_BYTES: Final[bytes] = b"68210123"
+# Format flags added to the legacy header, content hash of the whole content.
+DB_FLAGGED_MAGIC_BYTES: Final[bytes] = b"68210122"
+DB_LEGACY_MAGIC_BYTES: Final[bytes] = b"68210121"
+DB_SUPPORTED_MAGIC_BYTES: Final[frozenset[bytes]] = frozenset(
+    (DB_MAGIC_BYTES, DB_FLAGGED_MAGIC_BYTES, DB_LEGACY_MAGIC_BYTES)
+)
+DB_FLAGS: Final[StoreFlags] = StoreFlags.JOURNAL | StoreFlags.BINARY_ENTRIES
+DB_LAYOUT_FLAGS: Final[StoreFlags] = StoreFlags.JOURNAL | StoreFlags.INDEXED
+DB_COMPRESSION_FLAGS: Final[StoreFlags] = (
+    StoreFlags.ZLIB_COMPRESSED | StoreFlags.LZMA_COMPRESSED
+)
+# Every flag this version reads, a header with any other bit set is refused.
+DB_KNOWN_FLAGS: Final[StoreFlags] = (
+    StoreFlags.JOURNAL
+    | StoreFlags.FIELD_ENCRYPTED
+    | StoreFlags.INDEXED
+    | StoreFlags.BINARY_ENTRIES
+    | DB_COMPRESSION_FLAGS
+)
+# Modes chosen for a store that are kept when it is rewritten.
+DB_PRESERVED_FLAGS: Final[StoreFlags] = (
+    StoreFlags.FIELD_ENCRYPTED | StoreFlags.INDEXED | DB_COMPRESSION_FLAGS
+)
+DB_FLAGS_SIZE: Final[int] = 2
+KUZ_ECB_ALG_BYTES: Final[bytes] = b"KUZ"
+KUZ_CTR_ALG_BYTES: Final[bytes] = b"KZC"
+DB_ALG_BYTES: Final[bytes] = KUZ_CTR_ALG_BYTES
+DB_SUPPORTED_ALGS: Final[frozenset[bytes]] = frozenset(
+    (KUZ_ECB_ALG_BYTES, KUZ_CTR_ALG_BYTES)
+)
 DB_ITERATIONS_BYTES: Final[bytes] = (150_000).to_bytes(length=4)
+DB_ITERATIONS_SIZE: Final[int] = len(DB_ITERATIONS_BYTES)
+DB_MIN_ITERATIONS: Final[int] = 100_000
+DB_MAX_ITERATIONS: Final[int] = 50_000_000
+KDF_TARGET_LATENCY: Final[float] = 0.25
 DB_SALT_SIZE: Final[int] = 16
 CONTENT_HASH_SIZE: Final[int] = 32
 PASSWORDS_HASH_FUNCTION: Final[str] = "sha256"
+JOURNAL_FRAME_LENGTH_SIZE: Final[int] = 8
+# Committed size of the journal and the chain tag of its last frame, right
+# after the header of a journaled store.
+JOURNAL_COMMIT_SIZE: Final[int] = JOURNAL_FRAME_LENGTH_SIZE + CONTENT_HASH_SIZE
+# The journal is folded into a new snapshot once it is both larger than this
+# and larger than this fraction of the snapshot.
+JOURNAL_COMPACTION_MIN_SIZE: Final[int] = 1 << 16
+JOURNAL_COMPACTION_RATIO: Final[float] = 0.5
+# Offset and size of the index of an indexed store, right after the header.
+INDEX_LOCATOR_SIZE: Final[int] = 16
+INDEX_SLOT_ALIGNMENT: Final[int] = 64
+# Slots left behind by deleted or grown records are reclaimed by rewriting
+# the store once they are both larger than this and this fraction of it.
+INDEX_COMPACTION_MIN_SIZE: Final[int] = 1 << 16
+INDEX_COMPACTION_RATIO: Final[float] = 0.5
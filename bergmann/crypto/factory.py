@@ -0,0 +1,31 @@
+import importlib
+from typing import TYPE_CHECKING, Final
+
+from bergmann.common.exceptions import InvalidHeader
+from bergmann.convention import KUZ_CTR_ALG_BYTES, KUZ_ECB_ALG_BYTES
+from bergmann.key import Key, KeyMeta
+
+if TYPE_CHECKING:
+    from bergmann.crypto.kuzcypher import ICypher, KuzCypher
+
+# Modules and classes of the cyphers, imported on the first build, so loading
+# the model (and the UI) doesn't pay for the cypher tables and worker pools.
+CYPHERS: Final[dict[bytes, tuple[str, str]]] = {
+    KUZ_ECB_ALG_BYTES: ("bergmann.crypto.kuzcypher", "KuzCypher"),
+    KUZ_CTR_ALG_BYTES: ("bergmann.crypto.kuzctrcypher", "KuzCtrCypher"),
+}
+
+
+def build_cypher(algorithm: bytes, password: str, key_meta: KeyMeta) -> "ICypher":
+    return cypher_class(algorithm)(password, key_meta)
+
+
+def build_cypher_from_key(algorithm: bytes, key: Key) -> "ICypher":
+    return cypher_class(algorithm).from_key(key)
+
+
+def cypher_class(algorithm: bytes) -> "type[KuzCypher]":
+    if algorithm not in CYPHERS:
+        raise InvalidHeader(reason="alg")
+    module, name = CYPHERS[algorithm]
+    return getattr(importlib.import_module(module), name)
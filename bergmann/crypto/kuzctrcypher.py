@@ -0,0 +1,201 @@
+import os
+import sys
+from array import array
+from collections import deque
+from collections.abc import Buffer, Callable, Iterator, Sequence
+from itertools import chain
+from typing import TYPE_CHECKING, Final
+
+from bergmann.common.exceptions import IntegrityError
+from bergmann.crypto.kuzcypher import IBlockCypher, KuzCypher
+from bergmann.crypto.worker_pools import worker_pool
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor, Future, ProcessPoolExecutor
+
+NONCE_SIZE: Final[int] = 8
+# Keystream is produced in segments of this size. A segment depends only on
+# the nonce and its first block number, so segments are independent jobs.
+SEGMENT_SIZE: Final[int] = 1 << 20
+# Below this size starting worker processes costs more than it saves.
+PARALLEL_THRESHOLD: Final[int] = 1 << 22
+# Segments copied out to the pool at a time, per worker: enough to keep
+# the workers busy, few enough to bound memory on top of the buffer.
+SEGMENTS_IN_FLIGHT_PER_WORKER: Final[int] = 2
+
+_worker_block_cypher: IBlockCypher | None = None
+
+
+# Counter mode from GOST R 34.13-2015: keystream block i is E(nonce || i).
+# The cypher text is prefixed with a random nonce generated on every flush.
+class KuzCtrCypher(KuzCypher):
+    def encrypt_into(self, buffer: bytearray) -> None:
+        nonce = os.urandom(NONCE_SIZE)
+        self._apply_keystream(nonce, buffer)
+        buffer[:0] = nonce
+
+    def decrypt_into(self, buffer: bytearray | memoryview) -> memoryview:
+        if len(buffer) < NONCE_SIZE:
+            raise IntegrityError()
+        view = memoryview(buffer)
+        nonce = view[:NONCE_SIZE].tobytes()
+        content = view[NONCE_SIZE:]
+        self._apply_keystream(nonce, content)
+        return content
+
+    # Each chunk covers one segment per worker, so the parallel path keeps
+    # all workers busy while holding only a few segments in memory.
+    def iter_decrypt(self, cypher_text: Buffer) -> Iterator[memoryview]:
+        with memoryview(cypher_text) as view:
+            if len(view) < NONCE_SIZE:
+                raise IntegrityError()
+            nonce = view[:NONCE_SIZE].tobytes()
+            content = view[NONCE_SIZE:]
+            workers = self._workers(len(content))
+            chunk_size = SEGMENT_SIZE * workers
+            chunk_buffer = memoryview(bytearray(min(len(content), chunk_size)))
+            executor = self._executor(workers)
+            for offset in range(0, len(content), chunk_size):
+                chunk = chunk_buffer[: len(content) - offset]
+                chunk[:] = content[offset : offset + len(chunk)]
+                self._xor_segments(
+                    executor, workers, nonce, offset // self.block_size, chunk
+                )
+                yield chunk
+
+    def encrypt_fields(self, fields: Sequence[bytes]) -> list[bytes]:
+        nonces = [os.urandom(NONCE_SIZE) for _ in fields]
+        return [
+            nonce + field
+            for nonce, field in zip(
+                nonces, self._xor_fields(nonces, fields), strict=True
+            )
+        ]
+
+    def decrypt_fields(self, fields: Sequence[bytes]) -> list[bytes]:
+        if any(len(field) < NONCE_SIZE for field in fields):
+            raise IntegrityError()
+        return self._xor_fields(
+            [field[:NONCE_SIZE] for field in fields],
+            [field[NONCE_SIZE:] for field in fields],
+        )
+
+    # Every value has its own nonce, but the counter blocks of all of them
+    # go through the block cypher together.
+    def _xor_fields(
+        self, nonces: Sequence[bytes], fields: Sequence[bytes]
+    ) -> list[bytes]:
+        blocks_counts = [-(-len(field) // self.block_size) for field in fields]
+        keystream = bytearray(sum(blocks_counts) * self.block_size)
+        nonce_words = b"".join(
+            nonce * blocks_count
+            for nonce, blocks_count in zip(nonces, blocks_counts, strict=True)
+        )
+        counters = array("Q", chain.from_iterable(map(range, blocks_counts)))
+        if sys.byteorder == "little":
+            counters.byteswap()
+        with memoryview(keystream).cast("Q") as words:
+            words[0::2] = memoryview(nonce_words).cast("Q")
+            words[1::2] = counters
+        self._crypto_impl.encrypt_into(keystream)
+        result = []
+        offset = 0
+        for field in fields:
+            size = len(field)
+            key = int.from_bytes(keystream[offset : offset + size])
+            result.append((int.from_bytes(field) ^ key).to_bytes(size))
+            offset += -(-size // self.block_size) * self.block_size
+        return result
+
+    def _apply_keystream(self, nonce: bytes, buffer: bytearray | memoryview) -> None:
+        with memoryview(buffer) as view:
+            workers = self._workers(len(view))
+            executor = self._executor(workers)
+            self._xor_segments(executor, workers, nonce, 0, view)
+
+    def _workers(self, size: int) -> int:
+        if size < PARALLEL_THRESHOLD:
+            return 1
+        return os.cpu_count() or 1
+
+    def _executor(self, workers: int) -> "Executor | None":
+        if workers == 1:
+            return None
+        # One pool per key, shut down in shutdown_pools.
+        pool_key = (self._block_cypher_factory, self._key_bytes, workers)
+        return worker_pool(pool_key, lambda: self._start_pool(workers))
+
+    def _start_pool(self, workers: int) -> "ProcessPoolExecutor":
+        # Only stores past PARALLEL_THRESHOLD need the pool machinery.
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self._block_cypher_factory, self._key_bytes),
+        )
+
+    def _xor_segments(
+        self,
+        executor: "Executor | None",
+        workers: int,
+        nonce: bytes,
+        first_block: int,
+        view: memoryview,
+    ) -> None:
+        offsets = range(0, len(view), SEGMENT_SIZE)
+        first_blocks = (first_block + offset // self.block_size for offset in offsets)
+        if executor is None:
+            for offset, block in zip(offsets, first_blocks, strict=True):
+                segment = view[offset : offset + SEGMENT_SIZE]
+                segment[:] = xor_keystream(self._crypto_impl, nonce, block, segment)
+            return
+        # Not executor.map, which copies out every segment up front.
+        in_flight: deque[tuple[int, Future[bytes]]] = deque()
+        for offset, block in zip(offsets, first_blocks, strict=True):
+            segment = view[offset : offset + SEGMENT_SIZE].tobytes()
+            future = executor.submit(_xor_keystream_in_worker, nonce, block, segment)
+            in_flight.append((offset, future))
+            if len(in_flight) >= workers * SEGMENTS_IN_FLIGHT_PER_WORKER:
+                _write_segment(view, *in_flight.popleft())
+        while in_flight:
+            _write_segment(view, *in_flight.popleft())
+
+
+def xor_keystream(
+    block_cypher: IBlockCypher,
+    nonce: bytes,
+    first_block: int,
+    data: bytes | memoryview,
+) -> bytes:
+    size = len(data)
+    blocks_count = -(-size // 16)
+    keystream = bytearray(nonce + bytes(16 - NONCE_SIZE)) * blocks_count
+    counters = array("Q", range(first_block, first_block + blocks_count))
+    if sys.byteorder == "little":
+        counters.byteswap()
+    with memoryview(keystream).cast("Q") as words:
+        words[1::2] = counters
+    block_cypher.encrypt_into(keystream)
+    with memoryview(keystream)[:size] as keystream_view:
+        return (int.from_bytes(data) ^ int.from_bytes(keystream_view)).to_bytes(size)
+
+
+def _write_segment(view: memoryview, offset: int, future: "Future[bytes]") -> None:
+    result = future.result()
+    view[offset : offset + len(result)] = result
+
+
+def _init_worker(
+    block_cypher_factory: Callable[[bytes], IBlockCypher], key_bytes: bytes
+) -> None:
+    global _worker_block_cypher
+    _worker_block_cypher = block_cypher_factory(key_bytes)
+
+
+def _xor_keystream_in_worker(nonce: bytes, first_block: int, data: bytes) -> bytes:
+    if _worker_block_cypher is None:
+        raise ValueError("worker block cypher not initialized")
+    return xor_keystream(_worker_block_cypher, nonce, first_block, data)
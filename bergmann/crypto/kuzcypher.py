@@ -1,10 +1,25 @@
 import hashlib
 import typing
+from collections.abc import Buffer, Callable, Iterator, Sequence
+from functools import cache
+from typing import Final, Self
 
-from grassnechik import Grassnechik
-from grassnechik import Key as BinaryKey
+from bergmann.common.exceptions import IntegrityError
+from bergmann.key import Key, KeyMeta
 
-from bergmann.key import KeyMeta
+# Streaming decryption works on chunks of this size, so memory used on top
+# of the (possibly memory-mapped) cypher text doesn't grow with the store.
+STREAM_CHUNK_SIZE: Final[int] = 1 << 20
+
+
+def derive_key(password: bytes, key_meta: KeyMeta) -> Key:
+    key_bytes = hashlib.pbkdf2_hmac(
+        hash_name=key_meta.hash_function,
+        password=password,
+        iterations=key_meta.iterations,
+        salt=key_meta.salt,
+    )
+    return Key(key_bytes, key_meta)
 
 
 class ICypher(typing.Protocol):
@@ -12,46 +27,148 @@ class ICypher(typing.Protocol):
 
     def decrypt(self, cypher_text: bytes) -> bytes: ...
 
+    def encrypt_into(self, buffer: bytearray) -> None: ...
+
+    def decrypt_into(self, buffer: bytearray | memoryview) -> memoryview: ...
+
+    def iter_decrypt(self, cypher_text: Buffer) -> Iterator[memoryview]: ...
+
+    def encrypt_fields(self, fields: Sequence[bytes]) -> list[bytes]: ...
+
+    def decrypt_fields(self, fields: Sequence[bytes]) -> list[bytes]: ...
+
     @property
     def key_meta(self) -> KeyMeta: ...
 
+    @property
+    def key(self) -> Key: ...
+
+
+class IBlockCypher(typing.Protocol):
+    def encrypt(self, plain_text: bytes) -> bytes: ...
+
+    def decrypt(self, cypher_text: bytes) -> bytes: ...
+
+    def encrypt_into(self, buffer: bytearray | memoryview) -> None: ...
+
+    def decrypt_into(self, buffer: bytearray | memoryview) -> None: ...
+
+
+@cache
+def default_block_cypher_factory() -> Callable[[bytes], IBlockCypher]:
+    try:
+        from bergmann.crypto.kuznyechik_numpy import NumpyKuznyechik
+    except ImportError:
+        from bergmann.crypto.kuznyechik import Kuznyechik
+
+        return Kuznyechik
+    return NumpyKuznyechik
+
 
 class KuzCypher:
-    def __init__(self, password: str, key_meta: KeyMeta):
-        self._key_meta = key_meta
+    def __init__(
+        self,
+        password: str,
+        key_meta: KeyMeta,
+        block_cypher_factory: Callable[[bytes], IBlockCypher] | None = None,
+    ):
         key_bytes = self._build_key_bytes(password.encode("utf8"), key_meta)
-        self._crypto_impl = Grassnechik(BinaryKey(key_bytes))  # type: ignore
+        self._init_key(Key(key_bytes, key_meta), block_cypher_factory)
+
+    @classmethod
+    def from_key(
+        cls,
+        key: Key,
+        block_cypher_factory: Callable[[bytes], IBlockCypher] | None = None,
+    ) -> Self:
+        cypher = cls.__new__(cls)
+        cypher._init_key(key, block_cypher_factory)
+        return cypher
 
     @property
     def key_meta(self) -> KeyMeta:
         return self._key_meta
 
+    @property
+    def key(self) -> Key:
+        return Key(self._key_bytes, self._key_meta)
+
     def encrypt(self, message: str) -> bytes:
-        plain_text = self.pad(message.encode("utf8"))
-        cypher_blocks: list[bytes] = []
-        for block_index in range(0, len(plain_text), self.block_size):
-            block = plain_text[block_index : block_index + self.block_size]
-            encrypted = self._crypto_impl.encrypt(tuple(block))
-            cypher_blocks.append(bytes(encrypted))
-        return b"".join(cypher_blocks)
+        buffer = bytearray(message.encode("utf8"))
+        self.encrypt_into(buffer)
+        return bytes(buffer)
 
     def decrypt(self, cypher_text: bytes) -> bytes:
-        plain_blocks: list[bytes] = []
-        for block_index in range(0, len(cypher_text), self.block_size):
-            block = cypher_text[block_index : block_index + self.block_size]
-            decrypted = self._crypto_impl.decrypt(tuple(block))
-            plain_blocks.append(bytes(decrypted))
-        plain_text_with_padding = b"".join(plain_blocks)
-        return self.unpad(plain_text_with_padding)
+        buffer = bytearray(cypher_text)
+        with self.decrypt_into(buffer) as plain_text:
+            return plain_text.tobytes()
 
-    def _build_key_bytes(self, password: bytes, key_meta: KeyMeta) -> bytes:
-        key_bytes = hashlib.pbkdf2_hmac(
-            hash_name=key_meta.hash_function,
-            password=password,
-            iterations=key_meta.iterations,
-            salt=key_meta.salt,
+    def encrypt_into(self, buffer: bytearray) -> None:
+        self.pad_into(buffer)
+        self._crypto_impl.encrypt_into(buffer)
+
+    def decrypt_into(self, buffer: bytearray | memoryview) -> memoryview:
+        if len(buffer) % self.block_size:
+            raise IntegrityError()
+        self._crypto_impl.decrypt_into(buffer)
+        return self.unpad_view(buffer)
+
+    # Yields views of one reused buffer: each chunk must be consumed before
+    # the next one is requested.
+    def iter_decrypt(self, cypher_text: Buffer) -> Iterator[memoryview]:
+        with memoryview(cypher_text) as view:
+            if not view or len(view) % self.block_size:
+                raise IntegrityError()
+            chunk_buffer = memoryview(bytearray(min(len(view), STREAM_CHUNK_SIZE)))
+            for offset in range(0, len(view), STREAM_CHUNK_SIZE):
+                chunk = chunk_buffer[: len(view) - offset]
+                chunk[:] = view[offset : offset + len(chunk)]
+                self._crypto_impl.decrypt_into(chunk)
+                if offset + len(chunk) == len(view):
+                    chunk = self.unpad_view(chunk)
+                yield chunk
+
+    # Many short values are encrypted as one buffer: a single pass through
+    # the block cypher instead of one call per value.
+    def encrypt_fields(self, fields: Sequence[bytes]) -> list[bytes]:
+        buffer = bytearray()
+        bounds = []
+        for field in fields:
+            start = len(buffer)
+            buffer += field
+            self.pad_into(buffer)
+            bounds.append((start, len(buffer)))
+        self._crypto_impl.encrypt_into(buffer)
+        return [bytes(buffer[start:end]) for start, end in bounds]
+
+    def decrypt_fields(self, fields: Sequence[bytes]) -> list[bytes]:
+        if any(not field or len(field) % self.block_size for field in fields):
+            raise IntegrityError()
+        buffer = bytearray(b"".join(fields))
+        self._crypto_impl.decrypt_into(buffer)
+        result = []
+        start = 0
+        with memoryview(buffer) as view:
+            for field in fields:
+                end = start + len(field)
+                result.append(self.unpad_view(view[start:end]).tobytes())
+                start = end
+        return result
+
+    def _init_key(
+        self,
+        key: Key,
+        block_cypher_factory: Callable[[bytes], IBlockCypher] | None,
+    ) -> None:
+        self._key_meta = key.meta
+        self._block_cypher_factory = (
+            block_cypher_factory or default_block_cypher_factory()
         )
-        return key_bytes
+        self._key_bytes = key.binary
+        self._crypto_impl = self._block_cypher_factory(self._key_bytes)
+
+    def _build_key_bytes(self, password: bytes, key_meta: KeyMeta) -> bytes:
+        return derive_key(password, key_meta).binary
 
     @property
     def block_size(self) -> int:
@@ -62,5 +179,18 @@ class KuzCypher:
         return message_bytes + (bytes([pad_len]) * pad_len)
 
     def unpad(self, message_bytes: bytes) -> bytes:
-        pad_len = message_bytes[-1]
-        return message_bytes[:-pad_len]
+        return self.unpad_view(message_bytes).tobytes()
+
+    def pad_into(self, buffer: bytearray) -> None:
+        pad_len = self.block_size - len(buffer) % self.block_size
+        buffer.extend(bytes([pad_len]) * pad_len)
+
+    # A wrong key or damaged data rarely ends with valid padding.
+    def unpad_view(self, buffer: Buffer) -> memoryview:
+        view = memoryview(buffer)
+        pad_len = view[-1] if view else 0
+        if not 1 <= pad_len <= min(self.block_size, len(view)):
+            raise IntegrityError()
+        if view[-pad_len:] != bytes([pad_len]) * pad_len:
+            raise IntegrityError()
+        return view[:-pad_len]
@@ -0,0 +1,115 @@
+from collections.abc import Callable
+from functools import cache
+from typing import Final
+
+from bergmann.crypto.kuznyechik_tables import (
+    BLOCK_SIZE,
+    PI_INVERSE,
+    ROUNDS,
+    apply_table,
+    decrypt_round_keys,
+    expand_key,
+    inverse_linear_substitution_table,
+    linear_inverse_table,
+    linear_substitution_table,
+)
+
+
+# GOST R 34.12-2015 (Kuznyechik) with blocks handled as 128-bit integers.
+# A round is sixteen lookups into combined S-box + linear-transform tables,
+# the output is bit-compatible with ``grassnechik.Grassnechik``.
+class Kuznyechik:
+    block_size: Final[int] = BLOCK_SIZE
+
+    def __init__(self, key: bytes):
+        self._round_keys = expand_key(key)
+        self._decrypt_round_keys = decrypt_round_keys(self._round_keys)
+
+    @property
+    def round_keys(self) -> tuple[int, ...]:
+        return self._round_keys
+
+    @property
+    def decrypt_round_keys(self) -> tuple[int, ...]:
+        return self._decrypt_round_keys
+
+    def encrypt(self, plain_text: bytes) -> bytes:
+        buffer = bytearray(plain_text)
+        self.encrypt_into(buffer)
+        return bytes(buffer)
+
+    def decrypt(self, cypher_text: bytes) -> bytes:
+        buffer = bytearray(cypher_text)
+        self.decrypt_into(buffer)
+        return bytes(buffer)
+
+    def encrypt_into(self, buffer: bytearray | memoryview) -> None:
+        self._transform_into(buffer, self.encrypt_block)
+
+    def decrypt_into(self, buffer: bytearray | memoryview) -> None:
+        self._transform_into(buffer, self.decrypt_block)
+
+    def _transform_into(
+        self,
+        buffer: bytearray | memoryview,
+        transform_block: Callable[[int], int],
+    ) -> None:
+        with memoryview(buffer) as view:
+            self._check_size(view)
+            for offset in range(0, len(view), BLOCK_SIZE):
+                end = offset + BLOCK_SIZE
+                block = transform_block(int.from_bytes(view[offset:end]))
+                view[offset:end] = block.to_bytes(BLOCK_SIZE)
+
+    def encrypt_block(self, block: int) -> int:
+        t0, t1, t2, t3, t4, t5, t6, t7, t8, t9, t10, t11, t12, t13, t14, t15 = (
+            linear_substitution_table()
+        )
+        round_keys = self._round_keys
+        for round_index in range(ROUNDS):
+            x = block ^ round_keys[round_index]
+            block = (
+                t0[x >> 120] ^ t1[(x >> 112) & 0xFF]
+                ^ t2[(x >> 104) & 0xFF] ^ t3[(x >> 96) & 0xFF]
+                ^ t4[(x >> 88) & 0xFF] ^ t5[(x >> 80) & 0xFF]
+                ^ t6[(x >> 72) & 0xFF] ^ t7[(x >> 64) & 0xFF]
+                ^ t8[(x >> 56) & 0xFF] ^ t9[(x >> 48) & 0xFF]
+                ^ t10[(x >> 40) & 0xFF] ^ t11[(x >> 32) & 0xFF]
+                ^ t12[(x >> 24) & 0xFF] ^ t13[(x >> 16) & 0xFF]
+                ^ t14[(x >> 8) & 0xFF] ^ t15[x & 0xFF]
+            )  # fmt: skip
+        return block ^ round_keys[ROUNDS]
+
+    def decrypt_block(self, block: int) -> int:
+        # L^-1(x ^ k) == L^-1(x) ^ L^-1(k), so after the first inverse linear
+        # step every round is a single lookup into the combined
+        # (S^-1, L^-1) table followed by a xor with a transformed round key.
+        t0, t1, t2, t3, t4, t5, t6, t7, t8, t9, t10, t11, t12, t13, t14, t15 = (
+            inverse_linear_substitution_table()
+        )
+        x = apply_table(linear_inverse_table(), block ^ self._round_keys[ROUNDS])
+        decrypt_round_keys = self._decrypt_round_keys
+        for round_index in range(ROUNDS - 1, 0, -1):
+            x = (
+                t0[x >> 120] ^ t1[(x >> 112) & 0xFF]
+                ^ t2[(x >> 104) & 0xFF] ^ t3[(x >> 96) & 0xFF]
+                ^ t4[(x >> 88) & 0xFF] ^ t5[(x >> 80) & 0xFF]
+                ^ t6[(x >> 72) & 0xFF] ^ t7[(x >> 64) & 0xFF]
+                ^ t8[(x >> 56) & 0xFF] ^ t9[(x >> 48) & 0xFF]
+                ^ t10[(x >> 40) & 0xFF] ^ t11[(x >> 32) & 0xFF]
+                ^ t12[(x >> 24) & 0xFF] ^ t13[(x >> 16) & 0xFF]
+                ^ t14[(x >> 8) & 0xFF] ^ t15[x & 0xFF]
+            ) ^ decrypt_round_keys[round_index]  # fmt: skip
+        substituted = x.to_bytes(BLOCK_SIZE).translate(_pi_inverse_bytes())
+        return int.from_bytes(substituted) ^ self._round_keys[0]
+
+    def _check_size(self, data: memoryview) -> None:
+        if len(data) % BLOCK_SIZE:
+            raise ValueError(
+                f"data len must be a multiple of {BLOCK_SIZE}, but given {len(data)}"
+            )
+
+
+@cache
+def _pi_inverse_bytes() -> bytes:
+    return bytes(PI_INVERSE)
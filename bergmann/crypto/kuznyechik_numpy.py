@@ -0,0 +1,108 @@
+from collections.abc import Callable, Iterator
+from functools import cache
+from typing import Final
+
+import numpy as np
+import numpy.typing as npt
+
+from bergmann.crypto.kuznyechik_tables import (
+    BLOCK_SIZE,
+    PI_INVERSE,
+    ROUNDS,
+    Table,
+    decrypt_round_keys,
+    expand_key,
+    inverse_linear_substitution_table,
+    linear_inverse_table,
+    linear_substitution_table,
+)
+
+# Blocks processed per vectorized pass: keeps the working set in cache and
+# bounds temporary arrays regardless of the payload size.
+CHUNK_BLOCKS: Final[int] = 1 << 12
+
+type Blocks = npt.NDArray[np.uint64]
+
+
+# Treats a chunk of N blocks as an (N, 2) uint64 array and runs every round
+# over all of them at once: sixteen vectorized table lookups and xors.
+class NumpyKuznyechik:
+    block_size: Final[int] = BLOCK_SIZE
+
+    def __init__(self, key: bytes):
+        round_keys = expand_key(key)
+        self._round_keys = _as_blocks(round_keys)
+        self._decrypt_round_keys = _as_blocks(decrypt_round_keys(round_keys))
+
+    def encrypt(self, plain_text: bytes) -> bytes:
+        buffer = bytearray(plain_text)
+        self.encrypt_into(buffer)
+        return bytes(buffer)
+
+    def decrypt(self, cypher_text: bytes) -> bytes:
+        buffer = bytearray(cypher_text)
+        self.decrypt_into(buffer)
+        return bytes(buffer)
+
+    def encrypt_into(self, buffer: bytearray | memoryview) -> None:
+        for chunk in self._chunks(buffer):
+            chunk[:] = self.encrypt_blocks(chunk)
+
+    def decrypt_into(self, buffer: bytearray | memoryview) -> None:
+        for chunk in self._chunks(buffer):
+            chunk[:] = self.decrypt_blocks(chunk)
+
+    def encrypt_blocks(self, blocks: Blocks) -> Blocks:
+        table = _table(linear_substitution_table)
+        round_keys = self._round_keys
+        for round_index in range(ROUNDS):
+            blocks = _lookup(table, blocks ^ round_keys[round_index])
+        return blocks ^ round_keys[ROUNDS]
+
+    def decrypt_blocks(self, blocks: Blocks) -> Blocks:
+        table = _table(inverse_linear_substitution_table)
+        decrypt_round_keys = self._decrypt_round_keys
+        blocks = _lookup(
+            _table(linear_inverse_table), blocks ^ self._round_keys[ROUNDS]
+        )
+        for round_index in range(ROUNDS - 1, 0, -1):
+            blocks = _lookup(table, blocks) ^ decrypt_round_keys[round_index]
+        substituted = _pi_inverse()[blocks.view(np.uint8)].view(np.uint64)
+        return substituted ^ self._round_keys[0]
+
+    def _chunks(self, buffer: bytearray | memoryview) -> Iterator[Blocks]:
+        if len(buffer) % BLOCK_SIZE:
+            raise ValueError(
+                f"data len must be a multiple of {BLOCK_SIZE}, but given {len(buffer)}"
+            )
+        blocks = np.frombuffer(buffer, dtype=np.uint64).reshape(-1, 2)
+        for start in range(0, len(blocks), CHUNK_BLOCKS):
+            yield blocks[start : start + CHUNK_BLOCKS]
+
+
+def _lookup(table: npt.NDArray[np.complex128], blocks: Blocks) -> Blocks:
+    positions = blocks.view(np.uint8).T.copy()
+    result = table[0].take(positions[0]).view(np.uint64)
+    for position in range(1, BLOCK_SIZE):
+        result ^= table[position].take(positions[position]).view(np.uint64)
+    return result.reshape(-1, 2)
+
+
+def _as_blocks(values: tuple[int, ...]) -> Blocks:
+    raw = b"".join(value.to_bytes(BLOCK_SIZE) for value in values)
+    return np.frombuffer(raw, dtype=np.uint64).reshape(-1, 2)
+
+
+# Table entries are stored as complex128 only because it is a 16-byte
+# scalar type: gathering whole blocks with ``take`` is far cheaper than
+# fancy-indexing rows of a (256, 2) uint64 array.
+@cache
+def _table(build: Callable[[], Table]) -> npt.NDArray[np.complex128]:
+    rows = build()
+    raw = b"".join(value.to_bytes(BLOCK_SIZE) for row in rows for value in row)
+    return np.frombuffer(raw, dtype=np.complex128).reshape(BLOCK_SIZE, 256)
+
+
+@cache
+def _pi_inverse() -> npt.NDArray[np.uint8]:
+    return np.array(PI_INVERSE, dtype=np.uint8)
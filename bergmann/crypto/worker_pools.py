@@ -0,0 +1,32 @@
+import atexit
+import threading
+from collections.abc import Callable, Hashable
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+# Worker pools of the cyphers, started on first use and kept until
+# shutdown_pools: spawning workers costs more than a store's worth of work.
+# Kept apart from the cyphers, which are imported on first use only.
+_pools: "dict[Hashable, Executor]" = {}
+_lock = threading.Lock()
+
+
+def worker_pool(key: Hashable, start: "Callable[[], Executor]") -> "Executor":
+    with _lock:
+        if key not in _pools:
+            _pools[key] = start()
+        return _pools[key]
+
+
+# Stops the workers, and with them the keys they were started with.
+def shutdown_pools() -> None:
+    with _lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown()
+
+
+atexit.register(shutdown_pools)
@@ -1,25 +1,68 @@
 from collections.abc import Callable
 from functools import cached_property
+from typing import TYPE_CHECKING
 
-from textual.validation import ValidationResult
-
-from bergmann import failures_presenter
+from bergmann.convention import DB_FLAGS, StoreFlags
 from bergmann.files_helper import FilesHelper
 from bergmann.interactor import Interactor
+from bergmann.kdf_calibration import calibrate_iterations
+from bergmann.key_cache import KeyCache
 from bergmann.passwords_model import PasswordsModel
+from bergmann.tracing import Tracer
+
+if TYPE_CHECKING:
+    from textual.validation import ValidationResult
 
 __all__ = ["di"]
 
 
 class DI:
+    # Idle TTL in seconds of the derived keys cache, None disables the cache.
+    key_cache_ttl: float | None = None
+    # New stores encrypt every field separately, see StoreFlags.
+    field_encryption: bool = False
+    # New stores keep every item in its own record, see StoreFlags.
+    indexed_layout: bool = False
+    # Compression of new stores, one of DB_COMPRESSION_FLAGS, and its level.
+    compression: StoreFlags = StoreFlags(0)
+    compression_level: int | None = None
+    # Spans of unlocking and writing stores are recorded, see Tracer.
+    tracing: bool = False
+
+    @cached_property
+    def key_cache(self) -> KeyCache | None:
+        if self.key_cache_ttl is None:
+            return None
+        return KeyCache(ttl=self.key_cache_ttl)
+
     @cached_property
     def passwords_interactor(self) -> PasswordsModel:
-        return PasswordsModel()
+        return PasswordsModel(
+            key_cache=self.key_cache,
+            iterations_provider=calibrate_iterations,
+            store_flags=self.store_flags,
+            compression_level=self.compression_level,
+            tracer=self.tracer,
+        )
+
+    @property
+    def store_flags(self) -> StoreFlags:
+        flags = StoreFlags.INDEXED if self.indexed_layout else DB_FLAGS
+        if self.field_encryption:
+            flags |= StoreFlags.FIELD_ENCRYPTED
+        return flags | self.compression
 
     @cached_property
-    def failures_presenter(self) -> Callable[[ValidationResult], str]:
+    def failures_presenter(self) -> Callable[["ValidationResult"], str]:
+        # Imported here, the headless commands never load Textual.
+        from bergmann import failures_presenter
+
         return failures_presenter.present
 
+    @cached_property
+    def tracer(self) -> Tracer:
+        return Tracer(enabled=self.tracing)
+
     @cached_property
     def files_helper(self) -> FilesHelper:
         return FilesHelper()
@@ -29,6 +72,7 @@ class DI:
         return Interactor(
             files_helper=self.files_helper,
             passwords_model=self.passwords_interactor,
+            tracer=self.tracer,
         )
 
 
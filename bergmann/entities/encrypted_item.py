@@ -1,4 +1,6 @@
+from collections.abc import Sequence
 from dataclasses import dataclass
+from typing import Self
 
 
 @dataclass(slots=True, frozen=True)
@@ -7,5 +9,10 @@ class EncryptedItem:
     login: bytes
     password: bytes
 
+    @classmethod
+    def from_hex_tuple(cls, fields: Sequence[str]) -> Self:
+        description, login, password = (bytes.fromhex(field) for field in fields)
+        return cls(description, login, password)
+
     def as_hex_tuple(self) -> tuple[str, str, str]:
         return self.description.hex(), self.login.hex(), self.password.hex()
@@ -3,10 +3,19 @@ from dataclasses import dataclass
 from bergmann.common.exceptions import InvalidHeader
 from bergmann.convention import (
     CONTENT_HASH_SIZE,
-    DB_ALG_BYTES,
-    DB_ITERATIONS_BYTES,
+    DB_COMPRESSION_FLAGS,
+    DB_FLAGS_SIZE,
+    DB_ITERATIONS_SIZE,
+    DB_KNOWN_FLAGS,
+    DB_LAYOUT_FLAGS,
+    DB_LEGACY_MAGIC_BYTES,
     DB_MAGIC_BYTES,
+    DB_MAX_ITERATIONS,
+    DB_MIN_ITERATIONS,
     DB_SALT_SIZE,
+    DB_SUPPORTED_ALGS,
+    DB_SUPPORTED_MAGIC_BYTES,
+    StoreFlags,
 )
 
 
@@ -17,26 +26,56 @@ class Header:
     salt_bytes: bytes
     iterations_bytes: bytes
     content_hash: bytes
+    flags: StoreFlags = StoreFlags(0)
 
     def __post_init__(self):
-        if self.magic_bytes != DB_MAGIC_BYTES:
+        if self.magic_bytes not in DB_SUPPORTED_MAGIC_BYTES:
             raise InvalidHeader(reason="magic-bytes")
-        if self.alg_bytes != DB_ALG_BYTES:
+        if self.alg_bytes not in DB_SUPPORTED_ALGS:
             raise InvalidHeader(reason="alg")
         if len(self.salt_bytes) != DB_SALT_SIZE:
             raise InvalidHeader(reason="salt")
-        if self.iterations_bytes != DB_ITERATIONS_BYTES:
+        if not self._iterations_valid():
             raise InvalidHeader(reason="iterations")
         if len(self.content_hash) != CONTENT_HASH_SIZE:
             raise InvalidHeader(reason="content-hash")
+        if not self._flags_valid():
+            raise InvalidHeader(reason="flags")
+
+    @property
+    def is_legacy(self) -> bool:
+        return self.magic_bytes == DB_LEGACY_MAGIC_BYTES
+
+    @property
+    def has_merkle_root(self) -> bool:
+        return self.magic_bytes == DB_MAGIC_BYTES
+
+    def _iterations_valid(self) -> bool:
+        if len(self.iterations_bytes) != DB_ITERATIONS_SIZE:
+            return False
+        iterations = int.from_bytes(self.iterations_bytes)
+        return DB_MIN_ITERATIONS <= iterations <= DB_MAX_ITERATIONS
+
+    def _flags_valid(self) -> bool:
+        if self.is_legacy:
+            return not self.flags
+        if (self.flags & DB_LAYOUT_FLAGS).bit_count() > 1:
+            return False
+        if (self.flags & DB_COMPRESSION_FLAGS).bit_count() > 1:
+            return False
+        # Not flags & ~DB_KNOWN_FLAGS: the complement of a flag only keeps
+        # the bits StoreFlags defines.
+        return self.flags | DB_KNOWN_FLAGS == DB_KNOWN_FLAGS
 
     def as_bytes(self):
+        flags_bytes = b"" if self.is_legacy else self.flags.to_bytes(DB_FLAGS_SIZE)
         return b"".join(
             (
                 self.magic_bytes,
                 self.alg_bytes,
                 self.salt_bytes,
                 self.iterations_bytes,
+                flags_bytes,
                 self.content_hash,
             )
         )
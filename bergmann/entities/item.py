@@ -1,17 +1,25 @@
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Self
 
 
+def new_item_id() -> str:
+    return os.urandom(8).hex()
+
+
 @dataclass(slots=True)
 class Item:
     description: str
     login: str
     password: str
+    id: str = field(default_factory=new_item_id)
 
     def as_tuple(self) -> tuple[str, str, str]:
         return self.description, self.login, self.password
 
+    def as_entry(self) -> tuple[str, str, str, str]:
+        return self.description, self.login, self.password, self.id
+
     @classmethod
     def example(cls) -> Self:
         return cls(
@@ -0,0 +1,66 @@
+import json
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Literal, Self
+
+from bergmann.common.exceptions import IntegrityError
+
+type JournalOperation = Literal["add", "replace", "delete"]
+# Item fields followed by its id, as serialized in the snapshot.
+type Entry = Sequence[str]
+
+
+# One change appended to a journaled store. Records are replayed in order
+# on top of the snapshot, so items are addressed by id rather than position.
+@dataclass(frozen=True, slots=True)
+class JournalRecord:
+    operation: JournalOperation
+    item_id: str
+    entry: Entry | None = None
+
+    @classmethod
+    def add(cls, entry: Entry) -> Self:
+        return cls("add", entry[-1], entry)
+
+    @classmethod
+    def replace(cls, entry: Entry) -> Self:
+        return cls("replace", entry[-1], entry)
+
+    @classmethod
+    def delete(cls, item_id: str) -> Self:
+        return cls("delete", item_id)
+
+    @classmethod
+    def from_bytes(cls, data: bytes | memoryview) -> Self:
+        record = json.loads(str(data, "utf8"))
+        if not isinstance(record, list) or len(record) != 2:
+            raise IntegrityError()
+        operation, argument = record
+        if operation == "delete" and isinstance(argument, str):
+            return cls.delete(argument)
+        if operation not in ("add", "replace") or not _is_entry(argument):
+            raise IntegrityError()
+        return cls(operation, argument[-1], argument)
+
+    def as_bytes(self) -> bytes:
+        argument = self.item_id if self.entry is None else list(self.entry)
+        return json.dumps([self.operation, argument]).encode("utf8")
+
+    def apply(self, entries: dict[str, Entry]) -> None:
+        if self.operation == "add" and self.entry is not None:
+            entries[self.item_id] = self.entry
+            return
+        if self.item_id not in entries:
+            raise IntegrityError()
+        if self.operation == "replace" and self.entry is not None:
+            entries[self.item_id] = self.entry
+        else:
+            del entries[self.item_id]
+
+
+def _is_entry(value: object) -> bool:
+    return (
+        isinstance(value, list)
+        and len(value) > 0
+        and all(isinstance(field, str) for field in value)
+    )
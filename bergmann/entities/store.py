@@ -1,35 +1,85 @@
-import hashlib
 import json
-from typing import Self
+from collections.abc import Callable, Iterable, Sequence
+from itertools import batched
+from typing import Final, Self
 
+from bergmann.common.entry_stream import encode_entries, encode_entry
+from bergmann.convention import StoreFlags
 from bergmann.entities.header import Header
 from bergmann.entities.item import Item
 from bergmann.entities.store_meta import StoreMeta
 from bergmann.key import KeyMeta
+from bergmann.merkle_tree import MerkleTree, leaf_digest
 
+# Entries are encoded this many at a time: JSONEncoder.encode runs in C, while
+# iterencode falls back to pure Python, and the batches keep the transient
+# str small next to the output buffer.
+SERIALIZE_BATCH_SIZE: Final[int] = 4096
 
+
+type EntryFunction = Callable[[Item], Sequence[str]]
+type DigestFunction = Callable[[Sequence[str]], bytes]
+
+
+# Keeps a Merkle tree over the digests of the stored entries of its items,
+# built on first use unless the digests are known, e.g. from loading.
 class Store:
-    def __init__(self, meta: "StoreMeta", items: list[Item] | None = None):
+    def __init__(
+        self,
+        meta: "StoreMeta",
+        items: list[Item] | None = None,
+        entry_of: EntryFunction = Item.as_entry,
+        digests: Sequence[bytes] | None = None,
+    ):
         self._meta = meta
         self._items: list[Item] = items or []
+        self._entry_of = entry_of
+        self._digest_of = digest_function(meta.flags)
+        self._tree = MerkleTree(digests) if digests is not None else None
 
     @classmethod
-    def from_header(cls, header: Header, items: list[Item] | None = None) -> Self:
-        meta = StoreMeta(salt=header.salt_bytes)
-        return cls(meta=meta, items=items)
+    def from_header(
+        cls,
+        header: Header,
+        items: list[Item] | None = None,
+        entry_of: EntryFunction = Item.as_entry,
+        digests: Sequence[bytes] | None = None,
+    ) -> Self:
+        meta = StoreMeta.from_header(header)
+        # A store rewritten in another encoding hashes its entries anew.
+        if digest_function(meta.flags) is not digest_function(header.flags):
+            digests = None
+        return cls(
+            meta=meta,
+            items=items,
+            entry_of=entry_of,
+            digests=digests,
+        )
+
+    @property
+    def algorithm(self) -> bytes:
+        return self._meta.algorithm
 
     @property
     def key_meta(self) -> KeyMeta:
         return self._meta.key_meta
 
+    @property
+    def flags(self) -> StoreFlags:
+        return self._meta.flags
+
     @property
     def header(self) -> Header:
+        return self.build_header(self.items_hash())
+
+    def build_header(self, content_hash: bytes) -> Header:
         return Header(
             magic_bytes=self._meta.magic_bytes,
             alg_bytes=self._meta.algorithm,
             salt_bytes=self._meta.salt,
             iterations_bytes=self._meta.iterations_bytes,
-            content_hash=self.items_hash(),
+            content_hash=content_hash,
+            flags=self._meta.flags,
         )
 
     @property
@@ -39,11 +89,88 @@ class Store:
     @items.setter
     def items(self, value: list[Item]) -> None:
         self._items = value
+        self._tree = None
 
     def items_hash(self) -> bytes:
-        json_convertible = [item.as_tuple() for item in self._items]
-        json_bytes = json.dumps(json_convertible).encode("utf8")
-        return hashlib.sha256(json_bytes).digest()
+        return self._content_tree().root
+
+    def item_digests(self) -> Sequence[bytes]:
+        return self._content_tree().leaves
+
+    def entry(self, item: Item) -> Sequence[str]:
+        return self._entry_of(item)
+
+    # The plain text of a snapshot flush, encrypted in place afterwards.
+    def serialize_items(self) -> bytearray:
+        entries = (self._entry_of(item) for item in self._items)
+        return serialize_snapshot(self.flags, entries)
 
     def add_item(self, item: Item) -> None:
         self._items.append(item)
+        if self._tree is not None:
+            self._tree.append(self._digest(item))
+
+    def replace_item(self, item: Item) -> None:
+        index = self._index(item.id)
+        self._items[index] = item
+        if self._tree is not None:
+            self._tree.replace(index, self._digest(item))
+
+    def delete_item(self, item_id: str) -> None:
+        index = self._index(item_id)
+        self._items.pop(index)
+        if self._tree is not None:
+            self._tree.pop(index)
+
+    def _content_tree(self) -> MerkleTree:
+        if self._tree is None:
+            self._tree = MerkleTree(self._digest(item) for item in self._items)
+        return self._tree
+
+    def _digest(self, item: Item) -> bytes:
+        return self._digest_of(self._entry_of(item))
+
+    def _index(self, item_id: str) -> int:
+        for index, item in enumerate(self._items):
+            if item.id == item_id:
+                return index
+        raise ValueError(f"no item with id {item_id}")
+
+
+def entry_payload(entry: Sequence[str]) -> bytes:
+    return json.dumps(list(entry)).encode("utf8")
+
+
+def entry_digest(entry: Sequence[str]) -> bytes:
+    return leaf_digest(entry_payload(entry))
+
+
+def record_digest(entry: Sequence[str]) -> bytes:
+    return leaf_digest(encode_entry(entry))
+
+
+# Leaves hash an entry as the store keeps it, so loading hashes the bytes
+# read: the record of a binary snapshot, the JSON text of anything else.
+def digest_function(flags: StoreFlags) -> DigestFunction:
+    if flags & StoreFlags.BINARY_ENTRIES:
+        return record_digest
+    return entry_digest
+
+
+def serialize_snapshot(
+    flags: StoreFlags, entries: Iterable[Sequence[str]]
+) -> bytearray:
+    if flags & StoreFlags.BINARY_ENTRIES:
+        return encode_entries(entries)
+    return serialize_entries(entries)
+
+
+def serialize_entries(entries: Iterable[Sequence[str]]) -> bytearray:
+    encoder = json.JSONEncoder()
+    buffer = bytearray(b"[")
+    for batch in batched(entries, SERIALIZE_BATCH_SIZE):
+        if len(buffer) > 1:
+            buffer += b", "
+        buffer += encoder.encode(batch)[1:-1].encode("utf8")
+    buffer += b"]"
+    return buffer
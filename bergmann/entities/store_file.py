@@ -0,0 +1,39 @@
+import mmap
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Self
+
+from bergmann.entities.header import Header
+from bergmann.key import KeyMeta
+
+
+# Everything the unlock pipeline needs from a store file, read in one open.
+# The file is memory-mapped, so the cypher text is paged in as it is
+# decrypted instead of being copied into memory up front.
+@dataclass(frozen=True, slots=True)
+class StoreFile:
+    path: Path
+    header: Header
+    data: mmap.mmap | bytes = field(repr=False)
+
+    @property
+    def key_meta(self) -> KeyMeta:
+        return KeyMeta.from_header(self.header)
+
+    @contextmanager
+    def encrypted_content(self) -> Iterator[memoryview]:
+        with memoryview(self.data) as view:
+            with view[self.header.bytes_size_on_disk :] as content:
+                yield content
+
+    def close(self) -> None:
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
@@ -1,20 +1,48 @@
 from typing import Final, Self
 
-from bergmann.convention import DB_ALG_BYTES, DB_ITERATIONS_BYTES, DB_MAGIC_BYTES
+from bergmann.convention import (
+    DB_ALG_BYTES,
+    DB_FLAGS,
+    DB_ITERATIONS_BYTES,
+    DB_ITERATIONS_SIZE,
+    DB_LAYOUT_FLAGS,
+    DB_MAGIC_BYTES,
+    DB_PRESERVED_FLAGS,
+    StoreFlags,
+)
 from bergmann.entities.header import Header
 from bergmann.key import KeyMeta
 
 
 class StoreMeta:
-    def __init__(self, salt: bytes):
+    def __init__(
+        self,
+        salt: bytes,
+        algorithm: bytes = DB_ALG_BYTES,
+        iterations: int = int.from_bytes(DB_ITERATIONS_BYTES),
+        flags: StoreFlags = DB_FLAGS,
+    ):
         self.magic_bytes: Final[bytes] = DB_MAGIC_BYTES
-        self.algorithm: Final[bytes] = DB_ALG_BYTES
+        self.algorithm: Final[bytes] = algorithm
         self.salt: Final[bytes] = salt
-        self.iterations: Final[int] = int.from_bytes(DB_ITERATIONS_BYTES)
+        self.iterations: Final[int] = iterations
+        self.flags: Final[StoreFlags] = flags
 
     @classmethod
     def from_header(cls, header: Header) -> Self:
-        return cls(salt=header.salt_bytes)
+        return cls(
+            salt=header.salt_bytes,
+            algorithm=header.alg_bytes,
+            iterations=int.from_bytes(header.iterations_bytes),
+            flags=cls._rewrite_flags(header.flags),
+        )
+
+    @staticmethod
+    def _rewrite_flags(flags: StoreFlags) -> StoreFlags:
+        preserved = flags & DB_PRESERVED_FLAGS
+        if preserved & DB_LAYOUT_FLAGS:
+            return preserved
+        return DB_FLAGS | preserved
 
     @property
     def key_meta(self) -> KeyMeta:
@@ -22,4 +50,4 @@ class StoreMeta:
 
     @property
     def iterations_bytes(self) -> bytes:
-        return DB_ITERATIONS_BYTES
+        return self.iterations.to_bytes(length=DB_ITERATIONS_SIZE)
@@ -1,8 +1,15 @@
+import threading
+from collections.abc import Callable
 from pathlib import Path
 
+from bergmann.common.exceptions import OperationCancelled
 from bergmann.entities.item import Item
 from bergmann.files_helper import FilesHelper
-from bergmann.passwords_model import PasswordsModel
+from bergmann.passwords_model import PasswordsModel, PendingWrite
+from bergmann.store_writer import WRITE_DEBOUNCE, Change, StoreWriter
+from bergmann.tracing import Tracer
+
+type UnlockStep = Callable[[Path, str, threading.Event], list[Item]]
 
 
 class Interactor:
@@ -10,27 +17,143 @@ class Interactor:
         self,
         files_helper: FilesHelper,
         passwords_model: PasswordsModel,
+        write_debounce: float = WRITE_DEBOUNCE,
+        tracer: Tracer | None = None,
     ):
         self._files_helper = files_helper
         self._passwords_model = passwords_model
+        self._tracer = tracer or Tracer()
+        self._unlock_lock = threading.Lock()
+        # Guards the loaded store against the writer thread.
+        self._store_lock = threading.Lock()
+        self._writer = StoreWriter(
+            self._prepare_write, self._store_lock, debounce=write_debounce
+        )
 
     def is_store_initialized(self, path: Path) -> bool:
         return self._files_helper.is_emtpy(path)
 
     def init_new_store(self, path: Path, password: str) -> list[Item]:
-        self._passwords_model.initialize_new_store()
-        self._passwords_model.initialize_key_for_new_db(password)
-        self._passwords_model.flush_encrypted_store(path)
-        return self._passwords_model.get_items()
+        return self._init_new_store(path, password, threading.Event())
 
     def load_existent_store(self, path: Path, password: str) -> list[Item]:
-        self._passwords_model.initialize_key(path, password)
-        self._passwords_model.decrypt_store(path)
-        return self._passwords_model.get_items()
+        return self._load_existent_store(path, password, threading.Event())
+
+    async def init_new_store_async(self, path: Path, password: str) -> list[Item]:
+        return await self._run_in_thread(self._init_new_store, path, password)
+
+    async def load_existent_store_async(self, path: Path, password: str) -> list[Item]:
+        return await self._run_in_thread(self._load_existent_store, path, password)
 
+    # Edits are applied to the loaded store at once and written to disk in
+    # the background, see flush.
     def update(self, path: Path, content: list[Item]) -> None:
-        self._passwords_model.update_items(content)
-        self._passwords_model.flush_encrypted_store(path)
+        with self._store_lock:
+            self._passwords_model.update_items(content)
+            self._writer.submit(path, None)
+
+    def add_item(self, path: Path, item: Item) -> None:
+        with self._store_lock:
+            self._writer.submit(path, self._passwords_model.stage_add_item(item))
+
+    def replace_item(self, path: Path, item: Item) -> None:
+        with self._store_lock:
+            self._writer.submit(path, self._passwords_model.stage_replace_item(item))
+
+    def delete_item(self, path: Path, item_id: str) -> None:
+        with self._store_lock:
+            self._writer.submit(path, self._passwords_model.stage_delete_item(item_id))
+
+    def reveal_password(self, item: Item) -> str:
+        with self._store_lock:
+            return self._passwords_model.reveal_password(item)
+
+    # Blocks until every submitted edit is on disk.
+    def flush(self) -> None:
+        self._writer.flush()
+
+    def wait_idle(self) -> None:
+        self._writer.wait_idle()
 
     def clean(self) -> None:
-        self._passwords_model.clean()
+        try:
+            self._writer.flush()
+        finally:
+            self._writer.discard()
+            with self._store_lock:
+                self._passwords_model.clean()
+
+    def purge_expired_keys(self) -> None:
+        self._passwords_model.purge_expired_keys()
+
+    def forget_keys(self) -> None:
+        self._passwords_model.forget_keys()
+
+    async def _run_in_thread(
+        self, step: UnlockStep, path: Path, password: str
+    ) -> list[Item]:
+        # Imported here, the headless commands never run an event loop.
+        import asyncio
+
+        # The key derivation can't be interrupted, so on cancellation the
+        # thread is only told to stop and drop its state at the next phase.
+        cancelled = threading.Event()
+        try:
+            return await asyncio.to_thread(step, path, password, cancelled)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    # Called by the writer under the store lock, the write it returns takes
+    # the lock again only to snapshot the store for a compaction.
+    def _prepare_write(self, path: Path, changes: list[Change]) -> PendingWrite:
+        model = self._passwords_model
+        if None in changes:
+            write = model.prepare_flush(path)
+        else:
+            write = model.prepare_changes(path, changes)  # type: ignore[arg-type]
+
+        def persist() -> None:
+            with self._tracer.span("interactor.persist", changes=len(changes)):
+                write()
+                if model.needs_compaction(path):
+                    with self._store_lock:
+                        compaction = model.prepare_flush(path)
+                    compaction()
+
+        return persist
+
+    def _init_new_store(
+        self, path: Path, password: str, cancelled: threading.Event
+    ) -> list[Item]:
+        with self._tracer.span("interactor.init_store"):
+            self._wait_for_writer()
+            with self._unlock_lock, self._store_lock:
+                self._passwords_model.initialize_new_store()
+                self._passwords_model.initialize_key_for_new_db(password)
+                self._raise_if_cancelled(cancelled)
+                self._passwords_model.flush_encrypted_store(path)
+                return list(self._passwords_model.get_items())
+
+    def _load_existent_store(
+        self, path: Path, password: str, cancelled: threading.Event
+    ) -> list[Item]:
+        with self._tracer.span("interactor.load_store"):
+            self._wait_for_writer()
+            with self._unlock_lock, self._store_lock:
+                with self._passwords_model.read_store_file(path) as store_file:
+                    self._passwords_model.initialize_key_for_file(store_file, password)
+                    self._raise_if_cancelled(cancelled)
+                    self._passwords_model.decrypt_store_file(store_file)
+                self._raise_if_cancelled(cancelled)
+                return list(self._passwords_model.get_items())
+
+    # Edits to the previous store are written before another one is unlocked.
+    def _wait_for_writer(self) -> None:
+        with self._tracer.span("interactor.wait_writer"):
+            self._writer.flush()
+
+    def _raise_if_cancelled(self, cancelled: threading.Event) -> None:
+        if cancelled.is_set():
+            self._passwords_model.clean()
+            raise OperationCancelled()
@@ -0,0 +1,103 @@
+import hashlib
+import hmac
+from collections.abc import Buffer, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Final
+
+from bergmann.common.exceptions import IntegrityError
+from bergmann.convention import (
+    CONTENT_HASH_SIZE,
+    JOURNAL_COMMIT_SIZE,
+    JOURNAL_COMPACTION_MIN_SIZE,
+    JOURNAL_COMPACTION_RATIO,
+    JOURNAL_FRAME_LENGTH_SIZE,
+)
+from bergmann.crypto.kuzcypher import ICypher
+
+# Derives the key of the frame chain from the store key.
+JOURNAL_CHAIN_CONTEXT: Final[bytes] = b"bergmann journal chain"
+
+
+# Where the journal of the loaded store ends on disk, so the next record is
+# written right after the last committed one, and the tag it chains onto.
+@dataclass(slots=True)
+class JournalState:
+    path: Path
+    commit_offset: int
+    journal_offset: int
+    snapshot_size: int
+    chain_tag: bytes
+    journal_size: int = 0
+
+    @property
+    def end_offset(self) -> int:
+        return self.journal_offset + self.journal_size
+
+    def needs_compaction(self) -> bool:
+        threshold = self.snapshot_size * JOURNAL_COMPACTION_RATIO
+        return self.journal_size >= max(JOURNAL_COMPACTION_MIN_SIZE, threshold)
+
+
+def frame_prefix(size: int) -> bytes:
+    return size.to_bytes(JOURNAL_FRAME_LENGTH_SIZE)
+
+
+# Frames have to fill the view: one running past its end was cut.
+def iter_frames(view: memoryview) -> Iterator[memoryview]:
+    offset = 0
+    while offset < len(view):
+        body_offset = offset + JOURNAL_FRAME_LENGTH_SIZE
+        size = int.from_bytes(view[offset:body_offset])
+        if body_offset + size > len(view):
+            raise IntegrityError()
+        yield view[body_offset : body_offset + size]
+        offset = body_offset + size
+
+
+def journal_commit(journal_size: int, chain_tag: bytes) -> bytes:
+    return frame_prefix(journal_size) + chain_tag
+
+
+def parse_commit(data: memoryview) -> tuple[int, bytes]:
+    if len(data) != JOURNAL_COMMIT_SIZE:
+        raise IntegrityError()
+    journal_size = int.from_bytes(data[:JOURNAL_FRAME_LENGTH_SIZE])
+    return journal_size, data[JOURNAL_FRAME_LENGTH_SIZE:].tobytes()
+
+
+def chain_key(store_key: bytes) -> bytes:
+    return hmac.digest(store_key, JOURNAL_CHAIN_CONTEXT, hashlib.sha256)
+
+
+# Each frame is chained onto the tag of the one before, the first onto the
+# header and the snapshot. Frames of another store, or of this one before it
+# was compacted, don't chain onto them, and a journal cut at any frame ends
+# on another tag than the committed one.
+def chain_start(key: bytes, header: bytes, snapshot: Buffer) -> bytes:
+    mac = hmac.new(key, header, hashlib.sha256)
+    mac.update(snapshot)
+    return mac.digest()
+
+
+def chain_tag(key: bytes, previous: bytes, body: bytearray | memoryview) -> bytes:
+    mac = hmac.new(key, previous, hashlib.sha256)
+    mac.update(frame_prefix(len(body)))
+    mac.update(body)
+    return mac.digest()
+
+
+def seal_record(cypher: ICypher, payload: bytes) -> bytearray:
+    buffer = bytearray(hashlib.sha256(payload).digest())
+    buffer += payload
+    cypher.encrypt_into(buffer)
+    return buffer
+
+
+def open_record(cypher: ICypher, body: memoryview) -> bytes:
+    with cypher.decrypt_into(bytearray(body)) as plain_text:
+        digest = plain_text[:CONTENT_HASH_SIZE]
+        payload = plain_text[CONTENT_HASH_SIZE:].tobytes()
+        if hashlib.sha256(payload).digest() != digest:
+            raise IntegrityError()
+    return payload
@@ -0,0 +1,40 @@
+import hashlib
+import os
+import time
+from functools import cache
+
+from bergmann.convention import (
+    DB_MAX_ITERATIONS,
+    DB_MIN_ITERATIONS,
+    DB_SALT_SIZE,
+    KDF_TARGET_LATENCY,
+    PASSWORDS_HASH_FUNCTION,
+)
+
+PROBE_ITERATIONS = 20_000
+PROBE_ROUNDS = 3
+ITERATIONS_GRANULARITY = 1_000
+
+
+@cache
+def calibrate_iterations(
+    target_latency: float = KDF_TARGET_LATENCY,
+    hash_function: str = PASSWORDS_HASH_FUNCTION,
+) -> int:
+    iterations_per_second = measure_pbkdf2_throughput(hash_function)
+    iterations = int(iterations_per_second * target_latency)
+    iterations -= iterations % ITERATIONS_GRANULARITY
+    return min(max(iterations, DB_MIN_ITERATIONS), DB_MAX_ITERATIONS)
+
+
+def measure_pbkdf2_throughput(
+    hash_function: str = PASSWORDS_HASH_FUNCTION,
+    probe_iterations: int = PROBE_ITERATIONS,
+) -> float:
+    password, salt = os.urandom(16), os.urandom(DB_SALT_SIZE)
+    best_elapsed = float("inf")
+    for _ in range(PROBE_ROUNDS):
+        started = time.perf_counter()
+        hashlib.pbkdf2_hmac(hash_function, password, salt, probe_iterations)
+        best_elapsed = min(best_elapsed, time.perf_counter() - started)
+    return probe_iterations / max(best_elapsed, 1e-9)
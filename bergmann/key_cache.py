@@ -0,0 +1,91 @@
+import hashlib
+import hmac
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from bergmann.key import Key, KeyMeta
+
+type CacheKey = tuple[str, bytes, int, str]
+
+
+@dataclass(slots=True)
+class _Entry:
+    key_bytes: bytearray = field(repr=False)
+    verifier: bytes = field(repr=False)
+    last_used: float
+
+
+class KeyCache:
+    def __init__(self, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self._ttl = ttl
+        self._clock = clock
+        self._entries: dict[CacheKey, _Entry] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def verifier(key: Key, password: str) -> bytes:
+        # Lets a cached key be handed out only for the password it was
+        # derived from, without keeping the password itself in memory.
+        return hmac.digest(key.binary, password.encode("utf8"), hashlib.sha256)
+
+    def get(self, path: Path, key_meta: KeyMeta, password: str) -> Key | None:
+        with self._lock:
+            self._purge_expired()
+            entry = self._entries.get(self._cache_key(path, key_meta))
+            if entry is None:
+                return None
+            key = Key(bytes(entry.key_bytes), key_meta)
+            if not hmac.compare_digest(entry.verifier, self.verifier(key, password)):
+                return None
+            entry.last_used = self._clock()
+            return key
+
+    def put(self, path: Path, key: Key, verifier: bytes) -> None:
+        with self._lock:
+            cache_key = self._cache_key(path, key.meta)
+            if cache_key in self._entries:
+                self._wipe(self._entries.pop(cache_key))
+            self._entries[cache_key] = _Entry(
+                key_bytes=bytearray(key.binary),
+                verifier=verifier,
+                last_used=self._clock(),
+            )
+
+    def evict(self, path: Path) -> None:
+        resolved = str(path.resolve())
+        with self._lock:
+            for cache_key in [key for key in self._entries if key[0] == resolved]:
+                self._wipe(self._entries.pop(cache_key))
+
+    def purge_expired(self) -> None:
+        with self._lock:
+            self._purge_expired()
+
+    def clear(self) -> None:
+        with self._lock:
+            for entry in self._entries.values():
+                self._wipe(entry)
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _purge_expired(self) -> None:
+        now = self._clock()
+        for cache_key, entry in list(self._entries.items()):
+            if now - entry.last_used >= self._ttl:
+                self._wipe(self._entries.pop(cache_key))
+
+    def _cache_key(self, path: Path, key_meta: KeyMeta) -> CacheKey:
+        return (
+            str(path.resolve()),
+            key_meta.salt,
+            key_meta.iterations,
+            key_meta.hash_function,
+        )
+
+    def _wipe(self, entry: _Entry) -> None:
+        entry.key_bytes[:] = bytes(len(entry.key_bytes))
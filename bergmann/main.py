@@ -1,12 +1,120 @@
+import argparse
+import math
 import sys
 
-from bergmann.ui.app import Bergmann
+from bergmann.cli import COMMANDS, run
+from bergmann.convention import StoreFlags
+from bergmann.di import di
+from bergmann.tracing import SpanRecord, format_span
+
+KEY_CACHE_TTL_OPTION = "--key-cache-ttl="
+FIELD_ENCRYPTION_OPTION = "--field-encryption"
+INDEXED_LAYOUT_OPTION = "--indexed-layout"
+COMPRESSION_OPTION = "--compression="
+GLOBAL_OPTIONS = (
+    "--debug",
+    KEY_CACHE_TTL_OPTION,
+    FIELD_ENCRYPTION_OPTION,
+    INDEXED_LAYOUT_OPTION,
+    COMPRESSION_OPTION,
+)
+COMPRESSION_FLAGS = {
+    "zlib": StoreFlags.ZLIB_COMPRESSED,
+    "lzma": StoreFlags.LZMA_COMPRESSED,
+}
+# zlib takes -1 for its default, lzma presets go from 0 to 9.
+COMPRESSION_LEVELS = {
+    "zlib": range(-1, 10),
+    "lzma": range(0, 10),
+}
 
 
 def main() -> None:
     debug = "--debug" in sys.argv
+    try:
+        di.key_cache_ttl = parse_key_cache_ttl(sys.argv)
+        di.compression, di.compression_level = parse_compression(sys.argv)
+    except argparse.ArgumentTypeError as error:
+        print(f"bergmann: {error}", file=sys.stderr)
+        sys.exit(2)
+    di.field_encryption = FIELD_ENCRYPTION_OPTION in sys.argv
+    di.indexed_layout = INDEXED_LAYOUT_OPTION in sys.argv
+    di.tracing = debug
+    arguments = [arg for arg in sys.argv[1:] if not arg.startswith(GLOBAL_OPTIONS)]
+    if arguments and arguments[0] in COMMANDS:
+        if debug:
+            di.tracer.subscribe(print_span)
+        sys.exit(run(arguments))
+    # Imported here, so the headless commands start without Textual.
+    from bergmann.ui.app import Bergmann
+
     app = Bergmann(debug=debug)
-    app.run()
+    try:
+        app.run()
+    finally:
+        try:
+            di.gateway.flush()
+        finally:
+            di.gateway.forget_keys()
+
+
+def parse_key_cache_ttl(argv: list[str]) -> float | None:
+    for arg in argv:
+        if arg.startswith(KEY_CACHE_TTL_OPTION):
+            return key_cache_ttl(arg.removeprefix(KEY_CACHE_TTL_OPTION))
+    return None
+
+
+# Type of --key-cache-ttl, in the argparse way: seconds, finite and >= 0.
+def key_cache_ttl(value: str) -> float:
+    try:
+        ttl = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"invalid --key-cache-ttl value: {value!r}"
+        ) from None
+    if not math.isfinite(ttl) or ttl < 0:
+        raise argparse.ArgumentTypeError(
+            f"--key-cache-ttl must be a finite number of seconds >= 0: {value!r}"
+        )
+    return ttl
+
+
+# Spans of the headless commands go to stderr, so they don't mix with output.
+def print_span(span: SpanRecord) -> None:
+    print(format_span(span), file=sys.stderr)
+
+
+# --compression=zlib or --compression=lzma:9, the level defaults to the codec's.
+def parse_compression(argv: list[str]) -> tuple[StoreFlags, int | None]:
+    for arg in argv:
+        if arg.startswith(COMPRESSION_OPTION):
+            return compression(arg.removeprefix(COMPRESSION_OPTION))
+    return StoreFlags(0), None
+
+
+# Type of --compression, in the argparse way: a known codec, and a level
+# within its range if one is given.
+def compression(value: str) -> tuple[StoreFlags, int | None]:
+    codec, separator, level = value.partition(":")
+    if codec not in COMPRESSION_FLAGS:
+        raise argparse.ArgumentTypeError(
+            f"--compression codec must be one of {', '.join(COMPRESSION_FLAGS)}:"
+            f" {value!r}"
+        )
+    if not separator:
+        return COMPRESSION_FLAGS[codec], None
+    levels = COMPRESSION_LEVELS[codec]
+    try:
+        parsed_level = int(level)
+    except ValueError:
+        parsed_level = None
+    if parsed_level not in levels:
+        raise argparse.ArgumentTypeError(
+            f"--compression level of {codec} must be from {levels.start}"
+            f" to {levels.stop - 1}: {value!r}"
+        )
+    return COMPRESSION_FLAGS[codec], parsed_level
 
 
 if __name__ == "__main__":
@@ -0,0 +1,93 @@
+import hashlib
+from collections.abc import Iterable, Sequence
+from typing import Final
+
+# Leaves and inner nodes are hashed with different prefixes, so a node can't
+# be passed off as an item (RFC 6962).
+_LEAF_PREFIX: Final[bytes] = b"\x00"
+_NODE_PREFIX: Final[bytes] = b"\x01"
+EMPTY_ROOT: Final[bytes] = hashlib.sha256(b"").digest()
+
+
+def leaf_digest(payload: bytes) -> bytes:
+    return hashlib.sha256(_LEAF_PREFIX + payload).digest()
+
+
+def node_digest(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(_NODE_PREFIX + left + right).digest()
+
+
+def merkle_root(leaves: Sequence[bytes]) -> bytes:
+    return MerkleTree(leaves).root
+
+
+# Binary hash tree over per-item digests. A node without a sibling is carried
+# to the next level as is, so appending or replacing a leaf rehashes only its
+# path to the root. Removing a leaf shifts every leaf after it, so the inner
+# levels are rebuilt, once for any number of removals, when the root is read.
+class MerkleTree:
+    def __init__(self, leaves: Iterable[bytes] = ()):
+        self._levels: list[list[bytes]] = [list(leaves)]
+        self._stale = True
+
+    @property
+    def root(self) -> bytes:
+        if self._stale:
+            self._rebuild()
+        if not self._levels[0]:
+            return EMPTY_ROOT
+        return self._levels[-1][0]
+
+    @property
+    def leaves(self) -> Sequence[bytes]:
+        return self._levels[0]
+
+    def __len__(self) -> int:
+        return len(self._levels[0])
+
+    def append(self, leaf: bytes) -> None:
+        self._levels[0].append(leaf)
+        self._update_path(len(self._levels[0]) - 1)
+
+    def replace(self, index: int, leaf: bytes) -> None:
+        self._levels[0][index] = leaf
+        self._update_path(index)
+
+    def pop(self, index: int) -> bytes:
+        self._stale = True
+        return self._levels[0].pop(index)
+
+    def _update_path(self, index: int) -> None:
+        if self._stale:
+            return
+        level = 0
+        while len(self._levels[level]) > 1:
+            if level + 1 == len(self._levels):
+                self._levels.append([])
+            parent = index // 2
+            value = self._parent_digest(self._levels[level], parent)
+            upper = self._levels[level + 1]
+            if parent < len(upper):
+                upper[parent] = value
+            else:
+                upper.append(value)
+            index = parent
+            level += 1
+
+    def _rebuild(self) -> None:
+        self._stale = False
+        del self._levels[1:]
+        while len(self._levels[-1]) > 1:
+            nodes = self._levels[-1]
+            self._levels.append(
+                [
+                    self._parent_digest(nodes, parent)
+                    for parent in range(-(-len(nodes) // 2))
+                ]
+            )
+
+    def _parent_digest(self, nodes: list[bytes], parent: int) -> bytes:
+        left = 2 * parent
+        if left + 1 == len(nodes):
+            return nodes[left]
+        return node_digest(nodes[left], nodes[left + 1])
@@ -1,28 +1,99 @@
 import hashlib
+import hmac
 import json
+import mmap
 import os
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import closing
+from dataclasses import replace
 from pathlib import Path
+from typing import BinaryIO
 
+from bergmann.common.atomic_file import atomic_write
+from bergmann.common.entry_stream import EntryStream
 from bergmann.common.exceptions import IntegrityError
+from bergmann.common.json_stream import JsonArrayStream
+from bergmann.compression import compress, is_compressed, iter_decompress
 from bergmann.convention import (
     CONTENT_HASH_SIZE,
     DB_ALG_BYTES,
+    DB_FLAGS,
+    DB_FLAGS_SIZE,
     DB_ITERATIONS_BYTES,
-    DB_MAGIC_BYTES,
+    DB_ITERATIONS_SIZE,
+    DB_LEGACY_MAGIC_BYTES,
     DB_SALT_SIZE,
+    INDEX_LOCATOR_SIZE,
+    JOURNAL_COMMIT_SIZE,
+    JOURNAL_FRAME_LENGTH_SIZE,
+    StoreFlags,
 )
-from bergmann.crypto.kuzcypher import ICypher, KuzCypher
+from bergmann.crypto.factory import build_cypher, build_cypher_from_key
+from bergmann.crypto.kuzcypher import STREAM_CHUNK_SIZE, ICypher, derive_key
+from bergmann.crypto.worker_pools import shutdown_pools
+from bergmann.entities.encrypted_item import EncryptedItem
 from bergmann.entities.header import Header
 from bergmann.entities.item import Item
-from bergmann.entities.store import Store
+from bergmann.entities.journal_record import Entry, JournalRecord
+from bergmann.entities.store import (
+    EntryFunction,
+    Store,
+    digest_function,
+    entry_digest,
+    entry_payload,
+    serialize_snapshot,
+)
+from bergmann.entities.store_file import StoreFile
 from bergmann.entities.store_meta import StoreMeta
+from bergmann.journal import (
+    JournalState,
+    chain_key,
+    chain_start,
+    chain_tag,
+    frame_prefix,
+    iter_frames,
+    journal_commit,
+    open_record,
+    parse_commit,
+    seal_record,
+)
 from bergmann.key import KeyMeta
+from bergmann.key_cache import KeyCache
+from bergmann.merkle_tree import leaf_digest, merkle_root
+from bergmann.record_index import IndexEntry, RecordIndex, locator, parse_locator
+from bergmann.tracing import Tracer
+
+# A write prepared under the store lock, see prepare_flush.
+type PendingWrite = Callable[[], None]
+
+
+def default_iterations() -> int:
+    return int.from_bytes(DB_ITERATIONS_BYTES)
 
 
 class PasswordsModel:
-    def __init__(self):
+    def __init__(
+        self,
+        key_cache: KeyCache | None = None,
+        iterations_provider: Callable[[], int] | None = None,
+        store_flags: StoreFlags = DB_FLAGS,
+        compression_level: int | None = None,
+        tracer: Tracer | None = None,
+    ):
         self._cypher_impl: ICypher | None = None
         self._store: Store | None = None
+        self._key_cache = key_cache
+        self._iterations_provider = iterations_provider or default_iterations
+        self._unconfirmed_key_verifier: bytes | None = None
+        self._journal: JournalState | None = None
+        self._index: RecordIndex | None = None
+        self._store_flags = store_flags
+        self._compression_level = compression_level
+        self._tracer = tracer or Tracer()
+        # Fields of a field-encrypted store as stored. Items whose password
+        # has not been entered in this session keep it only here and carry
+        # an empty password, see reveal_password.
+        self._sealed_items: dict[str, EncryptedItem] = {}
 
     def get_items(self) -> list[Item]:
         return self.store.items
@@ -49,64 +120,645 @@ class PasswordsModel:
 
     def read_header(self, path: Path) -> Header:
         with path.open("rb") as file:
-            header = Header(
-                magic_bytes=file.read(len(DB_MAGIC_BYTES)),
-                alg_bytes=file.read(len(DB_ALG_BYTES)),
-                salt_bytes=file.read(DB_SALT_SIZE),
-                iterations_bytes=file.read(len(DB_ITERATIONS_BYTES)),
-                content_hash=file.read(CONTENT_HASH_SIZE),
-            )
-        return header
+            return self._read_header(file)
+
+    def read_store_file(self, path: Path) -> StoreFile:
+        with self._tracer.span("model.read_header"), path.open("rb") as file:
+            header = self._read_header(file)
+            if os.fstat(file.fileno()).st_size == header.bytes_size_on_disk:
+                return StoreFile(path, header, b"")
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if hasattr(data, "madvise"):
+            data.madvise(mmap.MADV_SEQUENTIAL)
+        return StoreFile(path, header, data)
 
     def update_items(self, items: list[Item]) -> None:
         self.store.items = items
+        for item in items:
+            if item.password:
+                self._sealed_items.pop(item.id, None)
+
+    def reveal_password(self, item: Item) -> str:
+        sealed = self._sealed_items.get(item.id)
+        if item.password or sealed is None:
+            return item.password
+        (password,) = self.cypher_impl.decrypt_fields([sealed.password])
+        return password.decode("utf8")
 
     def decrypt_store(self, path: Path) -> None:
-        header = self.read_header(path)
-        content_bytes = self._decrypt_content(path, header)
-        self._check_integrity(content_bytes, header)
-        self.store = Store.from_header(header, items=self._parse_items(content_bytes))
+        with self.read_store_file(path) as store_file:
+            self.decrypt_store_file(store_file)
+
+    def decrypt_store_file(self, store_file: StoreFile) -> None:
+        with self._tracer.span("model.decrypt_store") as span:
+            self._decrypt_store_file(store_file)
+            span.set(items=len(self.store.items))
+
+    def _decrypt_store_file(self, store_file: StoreFile) -> None:
+        header = store_file.header
+        cypher = self.cypher_impl
+        journal = None
+        index = None
+        with store_file.encrypted_content() as content:
+            if header.flags & StoreFlags.JOURNAL:
+                entries, digests, journal = self._replay_journal(
+                    cypher, store_file, content
+                )
+            elif header.flags & StoreFlags.INDEXED:
+                entries, digests, index = self._read_indexed(
+                    cypher, store_file, content
+                )
+            else:
+                entries, digests = self._read_entries(cypher, content, header)
+        try:
+            with self._tracer.span("model.build_items"):
+                items, sealed_items = self._build_items(entries, header.flags)
+        except ValueError as error:
+            raise IntegrityError() from error
+        self._sealed_items = sealed_items
+        self.store = Store.from_header(
+            header,
+            items=items,
+            entry_of=self._entry_function(header.flags),
+            digests=digests,
+        )
+        self._journal = journal
+        self._index = index
+        self._remember_key(store_file.path)
 
     def initialize_new_store(self) -> None:
-        self.store = Store(meta=StoreMeta(salt=os.urandom(DB_SALT_SIZE)))
+        meta = StoreMeta(
+            salt=os.urandom(DB_SALT_SIZE),
+            iterations=self._iterations_provider(),
+            flags=self._store_flags,
+        )
+        self.store = Store(meta=meta, entry_of=self._entry_function(meta.flags))
         self.store.add_item(Item.example())
 
     def initialize_key_for_new_db(self, master_password: str) -> None:
-        self._cypher_impl = KuzCypher(master_password, self.store.key_meta)
+        self._cypher_impl = self._build_cypher(
+            None, self.store.algorithm, master_password, self.store.key_meta
+        )
 
     def initialize_key(self, path: Path, master_password: str) -> None:
         header = self.read_header(path)
         key_meta = KeyMeta.from_header(header)
-        self._cypher_impl = KuzCypher(master_password, key_meta)
+        self._cypher_impl = self._build_cypher(
+            path, header.alg_bytes, master_password, key_meta
+        )
+
+    def initialize_key_for_file(
+        self, store_file: StoreFile, master_password: str
+    ) -> None:
+        self._cypher_impl = self._build_cypher(
+            store_file.path,
+            store_file.header.alg_bytes,
+            master_password,
+            store_file.key_meta,
+        )
 
     def flush_encrypted_store(self, path: Path) -> None:
-        encrypted_items = self._encrypt_content(self.store.items)
-        path.write_bytes(self.store.header.as_bytes() + encrypted_items)
+        self.prepare_flush(path)()
+
+    # prepare_flush and prepare_changes take what the write needs from the
+    # store while the caller holds the lock guarding it, and return the
+    # write, which runs without the lock and only touches the file and the
+    # state of the file kept here.
+    def prepare_flush(self, path: Path) -> PendingWrite:
+        with self._tracer.span("model.snapshot", items=len(self.store.items)):
+            self._seal_unsealed_items()
+            items = list(self.store.items)
+            entries = [self._entry(item) for item in items]
+            digests = list(self.store.item_digests())
+            header = self.store.build_header(self.store.items_hash())
+
+        def flush() -> None:
+            with self._tracer.span("model.flush", items=len(items)):
+                if header.flags & StoreFlags.INDEXED:
+                    self._flush_indexed(path, header, items, entries, digests)
+                else:
+                    self._flush_snapshot(path, header, entries)
+                self._remember_key(path)
+
+        return flush
+
+    def prepare_changes(
+        self, path: Path, records: Sequence[JournalRecord]
+    ) -> PendingWrite:
+        index = self._index
+        if index is not None and index.path == path:
+            header = self.store.build_header(self.store.items_hash())
+            return lambda: self._update_indexed(index, header, records)
+        journal = self._journal
+        if journal is None or journal.path != path:
+            return self.prepare_flush(path)
+        return lambda: self._append_records(journal, records)
 
+    def needs_compaction(self, path: Path) -> bool:
+        if self._index is not None and self._index.path == path:
+            return self._index.needs_compaction()
+        if self._journal is not None and self._journal.path == path:
+            return self._journal.needs_compaction()
+        return False
+
+    def _flush_snapshot(self, path: Path, header: Header, entries: list[Entry]) -> None:
+        tracer = self._tracer
+        flags = header.flags
+        with tracer.span("model.serialize"):
+            content = serialize_snapshot(flags, entries)
+        if is_compressed(flags):
+            with tracer.span("model.compress"):
+                content = compress(content, flags, self._compression_level)
+        if flags & StoreFlags.FIELD_ENCRYPTED:
+            content_hash = self._field_encrypted_hash(header.content_hash)
+            header = replace(header, content_hash=content_hash)
+        else:
+            with tracer.span("model.encrypt", bytes=len(content)):
+                self.cypher_impl.encrypt_into(content)
+        header_bytes = header.as_bytes()
+        prefix = b""
+        journal = None
+        if flags & StoreFlags.JOURNAL:
+            key = chain_key(self.cypher_impl.key.binary)
+            tag = chain_start(key, header_bytes, content)
+            prefix = journal_commit(0, tag) + frame_prefix(len(content))
+            journal = JournalState(
+                path=path,
+                commit_offset=len(header_bytes),
+                journal_offset=len(header_bytes) + len(prefix) + len(content),
+                snapshot_size=len(content),
+                chain_tag=tag,
+            )
+        size = len(header_bytes) + len(prefix) + len(content)
+        with tracer.span("model.write", bytes=size), atomic_write(path, size) as file:
+            file.write(header_bytes)
+            file.write(prefix)
+            file.write(content)
+        self._index = None
+        self._journal = journal
+
+    def _flush_indexed(
+        self,
+        path: Path,
+        header: Header,
+        items: list[Item],
+        entries: list[Entry],
+        digests: list[bytes],
+    ) -> None:
+        with self._tracer.span("model.serialize"):
+            payloads = [entry_payload(entry) for entry in entries]
+        with self._tracer.span("model.encrypt", records=len(payloads)):
+            records = self.cypher_impl.encrypt_fields(payloads)
+        data_offset = header.bytes_size_on_disk + INDEX_LOCATOR_SIZE
+        index = RecordIndex(path=path, data_offset=data_offset)
+        placed = [
+            index.place(item.id, len(record), digest)
+            for item, record, digest in zip(items, records, digests, strict=True)
+        ]
+        with (
+            self._tracer.span("model.write", bytes=index.data_end),
+            atomic_write(path, index.data_end) as file,
+        ):
+            for entry, record in zip(placed, records, strict=True):
+                file.seek(entry.offset)
+                file.write(record)
+            self._switch_index(file, self._write_index(file, index, header))
+        self._journal = None
+        self._index = index
+
+    def add_item(self, path: Path, item: Item) -> None:
+        self.persist_changes(path, [self.stage_add_item(item)])
+
+    def replace_item(self, path: Path, item: Item) -> None:
+        self.persist_changes(path, [self.stage_replace_item(item)])
+
+    def delete_item(self, path: Path, item_id: str) -> None:
+        self.persist_changes(path, [self.stage_delete_item(item_id)])
+
+    def stage_add_item(self, item: Item) -> JournalRecord:
+        self.store.add_item(item)
+        return JournalRecord.add(self._entry(item))
+
+    def stage_replace_item(self, item: Item) -> JournalRecord:
+        self._sealed_items.pop(item.id, None)
+        self.store.replace_item(item)
+        return JournalRecord.replace(self._entry(item))
+
+    def stage_delete_item(self, item_id: str) -> JournalRecord:
+        self._sealed_items.pop(item_id, None)
+        self.store.delete_item(item_id)
+        return JournalRecord.delete(item_id)
+
+    def persist_changes(self, path: Path, records: Sequence[JournalRecord]) -> None:
+        self.prepare_changes(path, records)()
+        if self.needs_compaction(path):
+            self.flush_encrypted_store(path)
+
+    # Keystream workers hold the key, so they go with it: here unless the
+    # key stays cached, in forget_keys otherwise.
     def clean(self) -> None:
         self._store = None
         self._cypher_impl = None
+        self._unconfirmed_key_verifier = None
+        self._journal = None
+        self._index = None
+        self._sealed_items = {}
+        if self._key_cache is None:
+            shutdown_pools()
+
+    def purge_expired_keys(self) -> None:
+        if self._key_cache is not None:
+            self._key_cache.purge_expired()
+
+    def forget_keys(self) -> None:
+        if self._key_cache is not None:
+            self._key_cache.clear()
+        shutdown_pools()
+
+    def _build_cypher(
+        self,
+        path: Path | None,
+        algorithm: bytes,
+        master_password: str,
+        key_meta: KeyMeta,
+    ) -> ICypher:
+        if self._key_cache is None:
+            with self._tracer.span("model.derive_key", iterations=key_meta.iterations):
+                return build_cypher(algorithm, master_password, key_meta)
+        if path is not None:
+            with self._tracer.span("model.key_cache_lookup") as span:
+                key = self._key_cache.get(path, key_meta, master_password)
+                span.set(hit=key is not None)
+            if key is not None:
+                return build_cypher_from_key(algorithm, key)
+        with self._tracer.span("model.derive_key", iterations=key_meta.iterations):
+            key = derive_key(master_password.encode("utf8"), key_meta)
+        # The key goes to the cache only once it has decrypted the store
+        # (or written it), so a mistyped password never replaces a good key.
+        self._unconfirmed_key_verifier = KeyCache.verifier(key, master_password)
+        return build_cypher_from_key(algorithm, key)
+
+    def _remember_key(self, path: Path) -> None:
+        if self._key_cache is None or self._unconfirmed_key_verifier is None:
+            return
+        self._key_cache.put(path, self.cypher_impl.key, self._unconfirmed_key_verifier)
+        self._unconfirmed_key_verifier = None
 
-    def _check_integrity(self, content_bytes: bytes, header: Header) -> None:
-        content_hash = hashlib.sha256(content_bytes).digest()
+    def _append_records(
+        self, journal: JournalState, records: Sequence[JournalRecord]
+    ) -> None:
+        key = chain_key(self.cypher_impl.key.binary)
+        tag = journal.chain_tag
+        frames = bytearray()
+        for record in records:
+            sealed = seal_record(self.cypher_impl, record.as_bytes())
+            tag = chain_tag(key, tag, sealed)
+            frames += frame_prefix(len(sealed))
+            frames += sealed
+        journal_size = journal.journal_size + len(frames)
+        with journal.path.open("r+b") as file:
+            # Drops what's left of an append a crash cut short, if any.
+            file.truncate(journal.end_offset)
+            file.seek(journal.end_offset)
+            file.write(frames)
+            file.flush()
+            os.fsync(file.fileno())
+            # Up to here a crash leaves the previous commit in force.
+            self._commit_journal(file, journal.commit_offset, journal_size, tag)
+        journal.journal_size = journal_size
+        journal.chain_tag = tag
+
+    # A single write of less than a hundred bytes near the start of the file.
+    def _commit_journal(
+        self, file: BinaryIO, commit_offset: int, journal_size: int, tag: bytes
+    ) -> None:
+        file.seek(commit_offset)
+        file.write(journal_commit(journal_size, tag))
+        file.flush()
+        os.fsync(file.fileno())
+
+    # Costs one write per changed record, but the index is still encrypted
+    # and written whole, so each update grows with the number of items.
+    def _update_indexed(
+        self, index: RecordIndex, header: Header, records: Sequence[JournalRecord]
+    ) -> None:
+        payloads = [
+            entry_payload(record.entry)
+            for record in records
+            if record.entry is not None
+        ]
+        sealed_records = iter(self.cypher_impl.encrypt_fields(payloads))
+        digests = iter([leaf_digest(payload) for payload in payloads])
+        with index.path.open("r+b") as file:
+            for record in records:
+                if record.entry is None:
+                    index.remove(record.item_id)
+                    continue
+                sealed = next(sealed_records)
+                entry = index.place(record.item_id, len(sealed), next(digests))
+                file.seek(entry.offset)
+                file.write(sealed)
+            header_and_locator = self._write_index(file, index, header)
+            # Up to here a crash leaves the previous index in force.
+            file.flush()
+            os.fsync(file.fileno())
+            self._switch_index(file, header_and_locator)
+            file.truncate(index.index_offset + index.index_size)
+            file.flush()
+            os.fsync(file.fileno())
+
+    # Writes the index after the records, and returns the header and the
+    # locator pointing to it, for _switch_index.
+    def _write_index(self, file: BinaryIO, index: RecordIndex, header: Header) -> bytes:
+        encrypted_index = bytearray(index.as_bytes())
+        self.cypher_impl.encrypt_into(encrypted_index)
+        index.index_offset = index.next_index_offset()
+        file.seek(index.index_offset)
+        file.write(encrypted_index)
+        index.index_size = len(encrypted_index)
+        return header.as_bytes() + locator(index.index_offset, index.index_size)
+
+    # A single write of less than a hundred bytes at the start of the file.
+    def _switch_index(self, file: BinaryIO, header_and_locator: bytes) -> None:
+        file.seek(0)
+        file.write(header_and_locator)
+
+    # A v2 indexed store hashes the whole index instead; it isn't updated in
+    # place but rewritten in the current format on the first change.
+    def _read_indexed(
+        self, cypher: ICypher, store_file: StoreFile, content: memoryview
+    ) -> tuple[list[Entry], list[bytes] | None, RecordIndex | None]:
+        header = store_file.header
+        base = header.bytes_size_on_disk
+        index_offset, index_size = parse_locator(content[:INDEX_LOCATOR_SIZE])
+        index_end = index_offset - base + index_size
+        if index_offset < base + INDEX_LOCATOR_SIZE or index_end > len(content):
+            raise IntegrityError()
+        with self._tracer.span("model.read_index", bytes=index_size):
+            plain_index = cypher.decrypt(
+                content[index_offset - base : index_end].tobytes()
+            )
+            if not header.has_merkle_root:
+                if hashlib.sha256(plain_index).digest() != header.content_hash:
+                    raise IntegrityError()
+            try:
+                index = RecordIndex.from_bytes(
+                    store_file.path, base + INDEX_LOCATOR_SIZE, plain_index
+                )
+            except (ValueError, TypeError) as error:
+                raise IntegrityError() from error
+        if index.data_end > index_offset:
+            raise IntegrityError()
+        index.index_offset, index.index_size = index_offset, index_size
+        digests = [entry.digest for entry in index.entries.values()]
+        # Once the digests add up to the root, a record not matching its own
+        # digest is the damaged one.
+        if header.has_merkle_root and merkle_root(digests) != header.content_hash:
+            raise IntegrityError()
+        records = [
+            content[entry.offset - base : entry.offset - base + entry.length].tobytes()
+            for entry in index.entries.values()
+        ]
+        digest_function = self._record_digest_function(header)
+        try:
+            entries = self._open_records(
+                cypher, index.entries, records, digest_function
+            )
+        except ValueError as error:
+            raise IntegrityError() from error
+        if not header.has_merkle_root:
+            return entries, None, None
+        return entries, digests, index
+
+    def _open_records(
+        self,
+        cypher: ICypher,
+        index_entries: dict[str, IndexEntry],
+        records: Sequence[bytes],
+        digest_function: Callable[[bytes], bytes],
+    ) -> list[Entry]:
+        entries = []
+        with self._tracer.span("model.decrypt_records", records=len(records)):
+            payloads = cypher.decrypt_fields(records)
+        with self._tracer.span("model.parse_records", records=len(records)):
+            for (item_id, index_entry), payload in zip(
+                index_entries.items(), payloads, strict=True
+            ):
+                if digest_function(payload) != index_entry.digest:
+                    raise IntegrityError(item_id=item_id)
+                entry = json.loads(payload)
+                if entry[-1] != item_id:
+                    raise IntegrityError(item_id=item_id)
+                entries.append(entry)
+        return entries
+
+    def _record_digest_function(self, header: Header) -> Callable[[bytes], bytes]:
+        if header.has_merkle_root:
+            return leaf_digest
+        return lambda payload: hashlib.sha256(payload).digest()
+
+    # Only the journal up to the committed size counts, and its frames have
+    # to chain from the snapshot to the committed tag. Anything after it is
+    # an append a crash cut short before committing it, overwritten by the
+    # next one.
+    def _replay_journal(
+        self, cypher: ICypher, store_file: StoreFile, content: memoryview
+    ) -> tuple[list[Entry], list[bytes] | None, JournalState]:
+        header = store_file.header
+        snapshot_offset = JOURNAL_COMMIT_SIZE + JOURNAL_FRAME_LENGTH_SIZE
+        if len(content) < snapshot_offset:
+            raise IntegrityError()
+        journal_size, committed_tag = parse_commit(content[:JOURNAL_COMMIT_SIZE])
+        snapshot_size = int.from_bytes(content[JOURNAL_COMMIT_SIZE:snapshot_offset])
+        journal_offset = snapshot_offset + snapshot_size
+        if journal_offset + journal_size > len(content):
+            raise IntegrityError()
+        key = chain_key(cypher.key.binary)
+        with content[snapshot_offset:journal_offset] as snapshot:
+            tag = chain_start(key, header.as_bytes(), snapshot)
+            snapshot_entries, snapshot_digests = self._read_entries(
+                cypher, snapshot, header
+            )
+        entries = {entry[-1]: entry for entry in snapshot_entries}
+        journal = JournalState(
+            path=store_file.path,
+            commit_offset=header.bytes_size_on_disk,
+            journal_offset=header.bytes_size_on_disk + journal_offset,
+            snapshot_size=snapshot_size,
+            chain_tag=committed_tag,
+            journal_size=journal_size,
+        )
+        with (
+            self._tracer.span("model.replay_journal", bytes=journal_size),
+            content[journal_offset : journal_offset + journal_size] as committed,
+        ):
+            # The chain is checked before any record is applied.
+            for body in iter_frames(committed):
+                with body:
+                    tag = chain_tag(key, tag, body)
+            if not hmac.compare_digest(tag, committed_tag):
+                raise IntegrityError()
+            for body in iter_frames(committed):
+                with body:
+                    payload = open_record(cypher, body)
+                try:
+                    record = JournalRecord.from_bytes(payload)
+                except (ValueError, TypeError) as error:
+                    raise IntegrityError() from error
+                record.apply(entries)
+        if snapshot_digests is None:
+            return list(entries.values()), None, journal
+        # Entries the journal didn't touch keep the digests of the snapshot.
+        known_digests = {
+            id(entry): digest
+            for entry, digest in zip(snapshot_entries, snapshot_digests, strict=True)
+        }
+        digest_of = digest_function(store_file.header.flags)
+        digests = [
+            known_digests.get(id(entry)) or digest_of(entry)
+            for entry in entries.values()
+        ]
+        return list(entries.values()), digests, journal
+
+    # Stores before the Merkle root hash their whole content, digests of the
+    # entries are returned only for the current format.
+    def _read_entries(
+        self, cypher: ICypher, content: memoryview, header: Header
+    ) -> tuple[list[Entry], list[bytes] | None]:
+        field_encrypted = bool(header.flags & StoreFlags.FIELD_ENCRYPTED)
+        if field_encrypted:
+            hasher = hmac.new(cypher.key.binary, digestmod=hashlib.sha256)
+            chunks: Iterator[memoryview | bytes] = self._iter_chunks(content)
+        else:
+            hasher = hashlib.sha256()
+            chunks = cypher.iter_decrypt(content)
+        if is_compressed(header.flags):
+            chunks = iter_decompress(chunks, header.flags)
+        # Records are hashed as they are parsed, in the form they were read.
+        entries_stream: EntryStream | JsonArrayStream = (
+            EntryStream(leaf_digest if header.has_merkle_root else None)
+            if header.flags & StoreFlags.BINARY_ENTRIES
+            else JsonArrayStream()
+        )
+        entries: list[Entry] = []
+        # Chunks are decrypted, hashed and parsed in turns, so the phases
+        # are laps of one span: "decrypt" includes decompressing.
+        try:
+            with (
+                self._tracer.span("model.read_entries", bytes=len(content)) as span,
+                closing(chunks),
+            ):
+                for chunk in chunks:
+                    span.lap("decrypt")
+                    if not header.has_merkle_root:
+                        hasher.update(chunk)
+                        span.lap("sha256")
+                    entries.extend(entries_stream.feed(chunk))
+                    span.lap("parse")
+                entries.extend(entries_stream.close())
+                span.set(entries=len(entries))
+        except ValueError as error:
+            # A wrong key or damaged file rarely even decodes.
+            raise IntegrityError() from error
+        if not header.has_merkle_root:
+            if header.content_hash != hasher.digest():
+                raise IntegrityError()
+            return entries, None
+        with self._tracer.span("model.verify", entries=len(entries)):
+            if isinstance(entries_stream, EntryStream):
+                digests = entries_stream.digests
+            else:
+                try:
+                    digests = [entry_digest(entry) for entry in entries]
+                except TypeError as error:
+                    raise IntegrityError() from error
+            content_hash = merkle_root(digests)
+        if field_encrypted:
+            content_hash = self._field_encrypted_hash(content_hash)
         if header.content_hash != content_hash:
             raise IntegrityError()
+        return entries, digests
 
-    def _read_encrypted_content(self, path: Path, header: Header) -> bytes:
-        with path.open("rb") as file:
-            file.seek(header.bytes_size_on_disk)
-            content = file.read()
-        return content
-
-    def _parse_items(self, content: bytes) -> list[Item]:
-        return [Item(*item_args) for item_args in json.loads(content)]
-
-    def _encrypt_content(self, content: list[Item]) -> bytes:
-        content_json_convertible = [item.as_tuple() for item in content]
-        content_json = json.dumps(content_json_convertible)
-        encrypted_content = self.cypher_impl.encrypt(content_json)
-        return encrypted_content
-
-    def _decrypt_content(self, path: Path, header: Header) -> bytes:
-        encrypted_content = self._read_encrypted_content(path, header)
-        return self.cypher_impl.decrypt(encrypted_content)
+    def _iter_chunks(self, content: memoryview) -> Iterator[memoryview]:
+        for offset in range(0, len(content), STREAM_CHUNK_SIZE):
+            with content[offset : offset + STREAM_CHUNK_SIZE] as chunk:
+                yield chunk
+
+    # Only what the listing shows is decrypted, in one batch.
+    def _build_items(
+        self, entries: list[Entry], flags: StoreFlags
+    ) -> tuple[list[Item], dict[str, EncryptedItem]]:
+        if not flags & StoreFlags.FIELD_ENCRYPTED:
+            return [Item(*entry) for entry in entries], {}
+        sealed_items = {
+            entry[-1]: EncryptedItem.from_hex_tuple(entry[:-1]) for entry in entries
+        }
+        listed_fields = iter(
+            self.cypher_impl.decrypt_fields(
+                [
+                    field
+                    for sealed in sealed_items.values()
+                    for field in (sealed.description, sealed.login)
+                ]
+            )
+        )
+        items = [
+            Item(description.decode("utf8"), login.decode("utf8"), "", item_id)
+            for item_id, description, login in zip(
+                sealed_items, listed_fields, listed_fields, strict=False
+            )
+        ]
+        return items, sealed_items
+
+    def _seal(self, items: Sequence[Item]) -> None:
+        fields = iter(
+            self.cypher_impl.encrypt_fields(
+                [field.encode("utf8") for item in items for field in item.as_tuple()]
+            )
+        )
+        for item, description, login, password in zip(
+            items, fields, fields, fields, strict=False
+        ):
+            self._sealed_items[item.id] = EncryptedItem(description, login, password)
+
+    # Sealing one item at a time costs a block cypher call each.
+    def _seal_unsealed_items(self) -> None:
+        if self.store.flags & StoreFlags.FIELD_ENCRYPTED:
+            self._seal(
+                [item for item in self.store.items if item.id not in self._sealed_items]
+            )
+
+    def _entry(self, item: Item) -> Entry:
+        return self.store.entry(item)
+
+    def _entry_function(self, flags: StoreFlags) -> EntryFunction:
+        if flags & StoreFlags.FIELD_ENCRYPTED:
+            return self._sealed_entry
+        return Item.as_entry
+
+    def _sealed_entry(self, item: Item) -> Entry:
+        if item.id not in self._sealed_items:
+            self._seal([item])
+        return (*self._sealed_items[item.id].as_hex_tuple(), item.id)
+
+    def _field_encrypted_hash(self, content: bytes | bytearray) -> bytes:
+        # Field-encrypted content is stored as is, so it is authenticated
+        # with the store key rather than hashed.
+        return hmac.digest(self.cypher_impl.key.binary, content, hashlib.sha256)
+
+    def _read_header(self, file: BinaryIO) -> Header:
+        magic_bytes = file.read(len(DB_LEGACY_MAGIC_BYTES))
+        alg_bytes = file.read(len(DB_ALG_BYTES))
+        salt_bytes = file.read(DB_SALT_SIZE)
+        iterations_bytes = file.read(DB_ITERATIONS_SIZE)
+        flags = StoreFlags(0)
+        if magic_bytes != DB_LEGACY_MAGIC_BYTES:
+            flags = StoreFlags(int.from_bytes(file.read(DB_FLAGS_SIZE)))
+        return Header(
+            magic_bytes=magic_bytes,
+            alg_bytes=alg_bytes,
+            salt_bytes=salt_bytes,
+            iterations_bytes=iterations_bytes,
+            content_hash=file.read(CONTENT_HASH_SIZE),
+            flags=flags,
+        )
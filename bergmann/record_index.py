@@ -0,0 +1,124 @@
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Self
+
+from bergmann.common.exceptions import IntegrityError
+from bergmann.convention import (
+    INDEX_COMPACTION_MIN_SIZE,
+    INDEX_COMPACTION_RATIO,
+    INDEX_LOCATOR_SIZE,
+    INDEX_SLOT_ALIGNMENT,
+)
+
+
+@dataclass(slots=True)
+class IndexEntry:
+    offset: int
+    length: int
+    capacity: int
+    digest: bytes = field(repr=False)
+
+
+# Offsets of the individually encrypted records of an indexed store. The
+# records come right after the header and the locator, the index itself is
+# written after the last record.
+#
+# Nothing the header points to is ever overwritten: changed records and the
+# next index go past the current index, and the header and locator switch
+# to them once they are on disk.
+@dataclass(slots=True)
+class RecordIndex:
+    path: Path
+    data_offset: int
+    entries: dict[str, IndexEntry] = field(default_factory=dict)
+    data_end: int = 0
+    garbage_size: int = 0
+    # Where the index the header points to was written, if it was.
+    index_offset: int = 0
+    index_size: int = 0
+
+    def __post_init__(self):
+        self.data_end = max(self.data_end, self.data_offset)
+
+    @property
+    def locator_offset(self) -> int:
+        return self.data_offset - INDEX_LOCATOR_SIZE
+
+    @classmethod
+    def from_bytes(cls, path: Path, data_offset: int, data: bytes) -> Self:
+        index = cls(path=path, data_offset=data_offset)
+        live_size = 0
+        for item_id, offset, length, capacity, digest in json.loads(data):
+            if offset < data_offset or length > capacity:
+                raise IntegrityError()
+            index.entries[item_id] = IndexEntry(
+                offset, length, capacity, bytes.fromhex(digest)
+            )
+            index.data_end = max(index.data_end, offset + capacity)
+            live_size += capacity
+        index.garbage_size = index.data_end - data_offset - live_size
+        return index
+
+    def as_bytes(self) -> bytes:
+        return json.dumps(
+            [
+                (
+                    item_id,
+                    entry.offset,
+                    entry.length,
+                    entry.capacity,
+                    entry.digest.hex(),
+                )
+                for item_id, entry in self.entries.items()
+            ]
+        ).encode("utf8")
+
+    # Every placed record gets a new slot, the one it replaces and the
+    # written index it lands after become garbage.
+    def place(self, item_id: str, length: int, digest: bytes) -> IndexEntry:
+        self._skip_written_index()
+        entry = self.entries.get(item_id)
+        if entry is not None:
+            self.garbage_size += entry.capacity
+        capacity = slot_capacity(length)
+        new_entry = IndexEntry(self.data_end, length, capacity, digest)
+        self.entries[item_id] = new_entry
+        self.data_end += capacity
+        return new_entry
+
+    # Where the next index goes, past the records and the index in force.
+    def next_index_offset(self) -> int:
+        self._skip_written_index()
+        return self.data_end
+
+    def remove(self, item_id: str) -> None:
+        entry = self.entries.pop(item_id)
+        self.garbage_size += entry.capacity
+
+    def needs_compaction(self) -> bool:
+        live_size = self.data_end - self.data_offset - self.garbage_size
+        threshold = live_size * INDEX_COMPACTION_RATIO
+        return self.garbage_size >= max(INDEX_COMPACTION_MIN_SIZE, threshold)
+
+    def _skip_written_index(self) -> None:
+        index_end = self.index_offset + self.index_size
+        if self.data_end < index_end:
+            self.garbage_size += index_end - self.data_end
+            self.data_end = index_end
+
+
+def slot_capacity(length: int) -> int:
+    return -(-length // INDEX_SLOT_ALIGNMENT) * INDEX_SLOT_ALIGNMENT
+
+
+def locator(index_offset: int, index_size: int) -> bytes:
+    half = INDEX_LOCATOR_SIZE // 2
+    return index_offset.to_bytes(half) + index_size.to_bytes(half)
+
+
+def parse_locator(data: bytes | memoryview) -> tuple[int, int]:
+    half = INDEX_LOCATOR_SIZE // 2
+    if len(data) != INDEX_LOCATOR_SIZE:
+        raise IntegrityError()
+    return int.from_bytes(data[:half]), int.from_bytes(data[half:])
@@ -0,0 +1,156 @@
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from collections.abc import Iterable, Sequence
+from typing import Final
+
+from bergmann.entities.item import Item
+
+NGRAM_SIZE: Final[int] = 3
+# Postings kept for the n-grams queries started with most recently.
+POSTINGS_LIMIT: Final[int] = 64
+
+
+# Case-insensitive substring search over the login and description of items,
+# every term of a query has to occur in a matching item. Matches come in the
+# order the items were added.
+#
+# Items are numbered in that order. The first term is looked up by the
+# postings of its leading n-gram (up to three chars), computed with one scan
+# on first use and kept up to date on changes, and longer terms are checked
+# on those candidates only. A query extending the previous one, as typing
+# does, narrows down the previous result instead, so a keystroke costs a pass
+# over the current matches at most.
+class SearchIndex:
+    def __init__(self, items: Iterable[Item] = ()):
+        self._ids: list[str] = []
+        self._texts: list[str] = []
+        self._ordinals: dict[str, int] = {}
+        self._postings: OrderedDict[str, list[int]] = OrderedDict()
+        self._last_terms: list[str] = []
+        self._last_result: list[int] | None = None
+        for item in items:
+            self._append(item)
+
+    def __len__(self) -> int:
+        return len(self._ordinals)
+
+    def add(self, item: Item) -> None:
+        if item.id in self._ordinals:
+            self.replace(item)
+            return
+        ordinal = self._append(item)
+        text = self._texts[ordinal]
+        for ngram, ordinals in self._postings.items():
+            if ngram in text:
+                ordinals.append(ordinal)
+        self._last_result = None
+
+    def replace(self, item: Item) -> None:
+        ordinal = self._ordinals.get(item.id)
+        if ordinal is None:
+            self.add(item)
+            return
+        self._set_text(ordinal, _searchable(item))
+
+    def remove(self, item_id: str) -> None:
+        ordinal = self._ordinals.pop(item_id, None)
+        if ordinal is None:
+            return
+        # The slot stays as an empty text, which no term matches.
+        self._set_text(ordinal, "")
+        if len(self._texts) > 2 * len(self._ordinals) + NGRAM_SIZE:
+            self._compact()
+
+    def search(self, query: str) -> list[str]:
+        terms = query.casefold().split()
+        if not terms:
+            result = list(self._ordinals.values())
+        else:
+            candidates = self._last_result if self._narrows(terms) else None
+            for term in sorted(terms, key=len, reverse=True):
+                candidates = self._match(term, candidates)
+            result = candidates or []
+        self._last_terms = terms
+        self._last_result = result
+        ids = self._ids
+        return [ids[ordinal] for ordinal in result]
+
+    # The item with this id, or else the only item the query matches.
+    def find_one(self, query: str) -> str:
+        if query in self._ordinals:
+            return query
+        item_ids = self.search(query)
+        if len(item_ids) != 1:
+            raise LookupError(f"{len(item_ids)} items match {query!r}, expected one")
+        return item_ids[0]
+
+    def matches(self, item_id: str, query: str) -> bool:
+        ordinal = self._ordinals.get(item_id)
+        if ordinal is None:
+            return False
+        text = self._texts[ordinal]
+        return all(term in text for term in query.casefold().split())
+
+    def _append(self, item: Item) -> int:
+        ordinal = len(self._texts)
+        self._ids.append(item.id)
+        self._texts.append(_searchable(item))
+        self._ordinals[item.id] = ordinal
+        return ordinal
+
+    def _set_text(self, ordinal: int, text: str) -> None:
+        previous = self._texts[ordinal]
+        self._texts[ordinal] = text
+        for ngram, ordinals in self._postings.items():
+            matched, matches = ngram in previous, ngram in text
+            if matched and not matches:
+                del ordinals[bisect_left(ordinals, ordinal)]
+            elif matches and not matched:
+                insort(ordinals, ordinal)
+        self._last_result = None
+
+    def _compact(self) -> None:
+        live = [
+            (self._ids[ordinal], self._texts[ordinal])
+            for ordinal in self._ordinals.values()
+        ]
+        self._ids = [item_id for item_id, _ in live]
+        self._texts = [text for _, text in live]
+        self._ordinals = {item_id: ordinal for ordinal, item_id in enumerate(self._ids)}
+        self._postings.clear()
+        self._last_result = None
+
+    def _narrows(self, terms: Sequence[str]) -> bool:
+        if self._last_result is None or not self._last_terms:
+            return False
+        return all(
+            any(last_term in term for term in terms) for last_term in self._last_terms
+        )
+
+    def _match(self, term: str, candidates: list[int] | None) -> list[int]:
+        posting = self._postings.get(term[:NGRAM_SIZE])
+        if candidates is None or (
+            posting is not None and len(posting) < len(candidates)
+        ):
+            candidates = self._posting(term[:NGRAM_SIZE])
+            if len(term) <= NGRAM_SIZE:
+                return list(candidates)
+        texts = self._texts
+        return [ordinal for ordinal in candidates if term in texts[ordinal]]
+
+    def _posting(self, ngram: str) -> list[int]:
+        ordinals = self._postings.get(ngram)
+        if ordinals is not None:
+            self._postings.move_to_end(ngram)
+            return ordinals
+        ordinals = [
+            ordinal for ordinal, text in enumerate(self._texts) if ngram in text
+        ]
+        self._postings[ngram] = ordinals
+        if len(self._postings) > POSTINGS_LIMIT:
+            self._postings.popitem(last=False)
+        return ordinals
+
+
+def _searchable(item: Item) -> str:
+    return f"{item.login}\n{item.description}".casefold()
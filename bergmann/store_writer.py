@@ -0,0 +1,167 @@
+import threading
+import time
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+from pathlib import Path
+from typing import Final
+
+from bergmann.entities.journal_record import JournalRecord
+
+# A write starts once no change came for this long...
+WRITE_DEBOUNCE: Final[float] = 0.25
+# ...but never later than this after the first unwritten change.
+WRITE_MAX_DELAY: Final[float] = 2.0
+# A failed write is retried after this long, or at the next flush.
+WRITE_RETRY_DELAY: Final[float] = 5.0
+
+# None asks for the whole store to be written.
+type Change = JournalRecord | None
+# Called under the lock, returns the write to run without it.
+type Prepare = Callable[[Path, list[Change]], Callable[[], None]]
+
+
+# Collects changes submitted from the UI thread and persists them in batches
+# on a worker thread. The lock guards the state the changes were staged in:
+# it is held only while a batch is taken and its writes are prepared, so a
+# batch always matches the in-memory store, and encrypting and writing it
+# doesn't hold up the UI.
+#
+# The store of a failed write stays dirty: it is written whole on retry,
+# as a failed write may have left the file behind or torn.
+class StoreWriter:
+    def __init__(
+        self,
+        prepare: Prepare,
+        lock: AbstractContextManager[object],
+        debounce: float = WRITE_DEBOUNCE,
+        max_delay: float = WRITE_MAX_DELAY,
+        retry_delay: float = WRITE_RETRY_DELAY,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._prepare = prepare
+        self._lock = lock
+        self._debounce = debounce
+        self._max_delay = max_delay
+        self._retry_delay = retry_delay
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._pending: dict[Path, list[Change]] = {}
+        self._first_change_at = 0.0
+        self._last_change_at = 0.0
+        self._urgent = False
+        self._retry_at = 0.0
+        self._submitted = 0
+        self._written = 0
+        self._error: Exception | None = None
+        self._thread: threading.Thread | None = None
+
+    def submit(self, path: Path, change: Change) -> None:
+        with self._condition:
+            now = self._clock()
+            if not self._pending:
+                self._first_change_at = now
+            self._last_change_at = now
+            self._pending.setdefault(path, []).append(change)
+            self._submitted += 1
+            self._start()
+            self._condition.notify_all()
+
+    def flush(self) -> None:
+        with self._condition:
+            self._urgent = True
+            self._condition.notify_all()
+        self.wait_idle()
+
+    def wait_idle(self) -> None:
+        with self._condition:
+            target = self._submitted
+            while self._written < target:
+                self._condition.wait()
+            error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    # Drops the changes not written yet, for a store that is being closed.
+    def discard(self) -> None:
+        with self._condition:
+            self._submitted -= sum(map(len, self._pending.values()))
+            self._pending = {}
+            self._condition.notify_all()
+
+    def _start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="store-writer", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wait_for_batch()
+            with self._lock:
+                with self._condition:
+                    batch, self._pending = self._pending, {}
+                    self._urgent = False
+                    written = self._submitted
+                writes, failed, error = self._prepare_writes(batch)
+            write_failed, write_error = self._write(writes)
+            failed += write_failed
+            with self._condition:
+                if failed:
+                    self._retry(failed)
+                self._written = written
+                self._error = write_error or error
+                self._condition.notify_all()
+
+    def _wait_for_batch(self) -> None:
+        with self._condition:
+            while not self._pending:
+                self._condition.wait()
+            while not self._urgent:
+                deadline = min(
+                    self._last_change_at + self._debounce,
+                    self._first_change_at + self._max_delay,
+                )
+                deadline = max(deadline, self._retry_at)
+                timeout = deadline - self._clock()
+                if timeout <= 0:
+                    return
+                self._condition.wait(timeout)
+
+    def _prepare_writes(
+        self, batch: dict[Path, list[Change]]
+    ) -> tuple[list[tuple[Path, Callable[[], None]]], list[Path], Exception | None]:
+        writes = []
+        failed = []
+        error = None
+        for path, changes in batch.items():
+            try:
+                writes.append((path, self._prepare(path, changes)))
+            except Exception as exception:
+                failed.append(path)
+                error = exception
+        return writes, failed, error
+
+    def _write(
+        self, writes: list[tuple[Path, Callable[[], None]]]
+    ) -> tuple[list[Path], Exception | None]:
+        failed = []
+        error = None
+        for path, write in writes:
+            try:
+                write()
+            except Exception as exception:
+                failed.append(path)
+                error = exception
+        return failed, error
+
+    # Counted as a new submission, so a later flush waits for the retry.
+    def _retry(self, failed: list[Path]) -> None:
+        now = self._clock()
+        if not self._pending:
+            self._first_change_at = now
+        self._last_change_at = now
+        self._retry_at = now + self._retry_delay
+        for path in failed:
+            self._pending[path] = [None, *self._pending.get(path, [])]
+            self._submitted += 1
@@ -0,0 +1,196 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Final, Self
+
+# Finished spans kept for the trace panel and the export, oldest dropped first.
+SPANS_LIMIT: Final[int] = 10_000
+
+type SpanListener = Callable[["SpanRecord"], None]
+
+
+@dataclass(frozen=True, slots=True)
+class SpanRecord:
+    name: str
+    start_ns: int
+    duration_ns: int
+    thread_id: int
+    thread_name: str
+    # Spans open on the same thread when this one started.
+    depth: int
+    args: dict[str, Any]
+
+    @property
+    def duration_ms(self) -> float:
+        return self.duration_ns / 1_000_000
+
+
+# One line per span, indented under the spans enclosing it.
+def format_span(span: SpanRecord) -> str:
+    details = " ".join(f"{key}={value}" for key, value in span.args.items())
+    line = f"{'  ' * span.depth}{span.name} {span.duration_ms:.3f} ms"
+    return f"{line} {details}" if details else line
+
+
+# A timed phase, used as a context manager. Phases interleaved in a loop,
+# such as decrypting and parsing chunk by chunk, are timed with lap: each
+# call adds the time since the previous one (or the start) to the phase
+# named, and the totals come with the span's args as "<phase>_ms".
+class Span:
+    __slots__ = ("_tracer", "_name", "_args", "_phases", "_depth", "_started", "_lap")
+
+    def __init__(self, tracer: "Tracer", name: str, args: dict[str, Any]):
+        self._tracer = tracer
+        self._name = name
+        self._args = args
+        self._phases: dict[str, int] = {}
+
+    def __enter__(self) -> Self:
+        self._depth = self._tracer._enter()
+        self._started = self._lap = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, *exc_info: object) -> None:
+        finished = time.perf_counter_ns()
+        self._tracer._leave()
+        args = self._args
+        for phase, elapsed in self._phases.items():
+            args[f"{phase}_ms"] = round(elapsed / 1_000_000, 3)
+        if exc_type is not None:
+            args["error"] = exc_type.__name__
+        thread = threading.current_thread()
+        self._tracer._record(
+            SpanRecord(
+                name=self._name,
+                start_ns=self._started,
+                duration_ns=finished - self._started,
+                thread_id=thread.ident or 0,
+                thread_name=thread.name,
+                depth=self._depth,
+                args=args,
+            )
+        )
+
+    def set(self, **args: Any) -> None:
+        self._args.update(args)
+
+    def lap(self, phase: str) -> None:
+        now = time.perf_counter_ns()
+        self._phases[phase] = self._phases.get(phase, 0) + now - self._lap
+        self._lap = now
+
+
+# What a disabled tracer hands out: one shared span doing nothing.
+class _NullSpan(Span):
+    __slots__ = ()
+
+    def __init__(self) -> None:
+        pass
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        pass
+
+    def set(self, **args: Any) -> None:
+        pass
+
+    def lap(self, phase: str) -> None:
+        pass
+
+
+_NULL_SPAN: Final[Span] = _NullSpan()
+
+
+# Records spans of the phases of unlocking and writing stores, see --debug.
+# While disabled, span() returns a shared no-op span, so an instrumented
+# phase costs a call and an attribute check.
+class Tracer:
+    def __init__(self, enabled: bool = False, limit: int = SPANS_LIMIT):
+        self.enabled = enabled
+        self._spans: deque[SpanRecord] = deque(maxlen=limit)
+        self._recorded = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._listeners: list[SpanListener] = []
+        self._origin_ns = time.perf_counter_ns()
+
+    def span(self, name: str, **args: Any) -> Span:
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, name, args)
+
+    # Listeners are called on the thread that finished the span.
+    def subscribe(self, listener: SpanListener) -> None:
+        self._listeners.append(listener)
+
+    @property
+    def spans(self) -> list[SpanRecord]:
+        with self._lock:
+            return list(self._spans)
+
+    # Spans finished after the first `seen` ones, and the count to pass next
+    # time. Spans dropped over the limit in between are skipped.
+    def spans_since(self, seen: int) -> tuple[list[SpanRecord], int]:
+        with self._lock:
+            new = min(self._recorded - seen, len(self._spans))
+            spans = list(self._spans)[len(self._spans) - new :] if new > 0 else []
+            return spans, self._recorded
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+    # The Trace Event Format read by chrome://tracing and Perfetto.
+    def chrome_trace(self) -> dict[str, Any]:
+        pid = os.getpid()
+        spans = self.spans
+        threads = {span.thread_id: span.thread_name for span in spans}
+        events: list[dict[str, Any]] = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": thread_id,
+                "args": {"name": thread_name},
+            }
+            for thread_id, thread_name in threads.items()
+        ]
+        events.extend(
+            {
+                "name": span.name,
+                "cat": span.name.partition(".")[0],
+                "ph": "X",
+                "ts": (span.start_ns - self._origin_ns) / 1000,
+                "dur": span.duration_ns / 1000,
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": span.args,
+            }
+            for span in spans
+        )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path: Path) -> None:
+        path.write_text(json.dumps(self.chrome_trace(), default=str))
+
+    def _enter(self) -> int:
+        depth = getattr(self._local, "depth", 0)
+        self._local.depth = depth + 1
+        return depth
+
+    def _leave(self) -> None:
+        self._local.depth -= 1
+
+    def _record(self, span: SpanRecord) -> None:
+        with self._lock:
+            self._spans.append(span)
+            self._recorded += 1
+        for listener in self._listeners:
+            listener(span)
@@ -1,3 +1,4 @@
+import asyncio
 from pathlib import Path
 
 from textual import work
@@ -5,16 +6,10 @@ from textual.app import App, ComposeResult
 from textual.binding import Binding
 from textual.widgets import Footer
 
-from bergmann.common.ru_keys import RU_KEY_FOR_EN__F
+from bergmann.common.ru_keys import RU_KEY_FOR_EN__F, RU_KEY_FOR_EN__L
 from bergmann.di import di
 from bergmann.entities.item import Item
 from bergmann.entities.load_db_result import LoadItemsResult
-from bergmann.ui.widgets.passwords_modal.initialize_new_db_modal import (
-    InitializeNewStoreModal,
-)
-from bergmann.ui.widgets.passwords_modal.load_db_modal import LoadDBModal
-from bergmann.ui.widgets.passwords_modal.passwords_explorer import PasswordsExplorer
-from bergmann.ui.widgets.select_file_modal.select_file_modal import SelectFileModal
 from bergmann.ui.widgets.welcome import WelcomeWidget
 
 
@@ -22,7 +17,12 @@ class Bergmann(App[None]):
     BINDINGS = [
         Binding(key="f", action="select_file", description="Select passwords file"),
         Binding(key=RU_KEY_FOR_EN__F, action="select_file", show=False),
+        Binding(key="l", action="forget_keys", description="Forget cached keys"),
+        Binding(key=RU_KEY_FOR_EN__L, action="forget_keys", show=False),
+        # A priority binding, the passwords screens are modal.
+        Binding(key="ctrl+t", action="show_trace", description="Trace", priority=True),
     ]
+    KEY_CACHE_PURGE_INTERVAL = 5.0
 
     def __init__(self, debug: bool):
         super().__init__()
@@ -33,6 +33,28 @@ class Bergmann(App[None]):
         yield WelcomeWidget(select_source_binding="f")
         yield Footer()
 
+    def on_mount(self) -> None:
+        self.set_interval(
+            self.KEY_CACHE_PURGE_INTERVAL, self._gateway.purge_expired_keys
+        )
+
+    # The trace panel is there in --debug mode only, spans aren't recorded
+    # otherwise.
+    def check_action(self, action: str, parameters: tuple[object, ...]) -> bool | None:
+        if action == "show_trace":
+            return self._debug
+        return True
+
+    def action_show_trace(self) -> None:
+        from bergmann.ui.widgets.trace_panel import TracePanel
+
+        if not isinstance(self.screen, TracePanel):
+            self.push_screen(TracePanel())
+
+    def action_forget_keys(self) -> None:
+        self._gateway.forget_keys()
+        self.notify("cached keys forgotten")
+
     @work
     async def action_select_file(self) -> None:
         path = await self._select_file()
@@ -46,12 +68,28 @@ class Bergmann(App[None]):
         if load_db_result.new_db_initialized:
             self.notify(f"new db initialized: {path=}")
         await self._show_passwords_explorer(load_db_result.items, path)
+        try:
+            await asyncio.to_thread(self._gateway.flush)
+        except Exception as error:
+            # The store stays unlocked, so the writer can still retry.
+            self.notify(f"changes not saved: {error}", severity="error")
+            return
         self._gateway.clean()
 
+    # Screens are imported when first shown, so they (and the clipboard and
+    # crypto modules behind them) don't delay the welcome screen.
     async def _show_passwords_explorer(self, content: list[Item], path: Path) -> None:
+        from bergmann.ui.widgets.passwords_modal.passwords_explorer import (
+            PasswordsExplorer,
+        )
+
         await self.app.push_screen_wait(PasswordsExplorer(content, path))
 
     async def _select_file(self) -> Path | None:
+        from bergmann.ui.widgets.select_file_modal.select_file_modal import (
+            SelectFileModal,
+        )
+
         return await self.app.push_screen_wait(SelectFileModal())
 
     async def _load_db(self, path: Path) -> LoadItemsResult:
@@ -60,9 +98,15 @@ class Bergmann(App[None]):
         return LoadItemsResult.new_store(await self._initialize_new_db(path))
 
     async def _initialize_new_db(self, path: Path) -> list[Item] | None:
+        from bergmann.ui.widgets.passwords_modal.initialize_new_db_modal import (
+            InitializeNewStoreModal,
+        )
+
         return await self.app.push_screen_wait(InitializeNewStoreModal(path))
 
     async def _load_existent_db(self, path: Path) -> list[Item] | None:
+        from bergmann.ui.widgets.passwords_modal.load_db_modal import LoadDBModal
+
         return await self.app.push_screen_wait(LoadDBModal(path))
 
     def _handle_exception(self, error: Exception) -> None:
@@ -1,6 +1,6 @@
 from pathlib import Path
 
-from textual import on
+from textual import on, work
 from textual.app import ComposeResult
 from textual.binding import Binding
 from textual.containers import Container
@@ -58,8 +58,13 @@ class InitializeNewStoreModal(ModalScreen[list[Item] | None]):
         super().__init__(name=name, id=id, classes=classes)
         self._gateway = di.gateway
         self._path = path
+        self._initializing = False
 
     def action_quit(self) -> None:
+        if self._initializing:
+            self.workers.cancel_group(self, "initialize")
+            self.notify("initialization cancelled", severity="warning")
+            return
         self.dismiss(None)
 
     def compose(self) -> ComposeResult:
@@ -102,13 +107,40 @@ class InitializeNewStoreModal(ModalScreen[list[Item] | None]):
         self.handle_password_submit(event.input)
 
     def handle_password_submit(self, input_: Input) -> None:
+        if self._initializing:
+            return
         try:
             check_input_value_valid(input_)
-            master_password = input_.value
-            content = self._gateway.init_new_store(self._path, master_password)
-            self.dismiss(content)
         except Exception as e:
             self.notify(
                 message=f"password invalid:\n{e!s}",
                 severity="error",
             )
+            return
+        self.initialize(input_.value)
+
+    @work(exclusive=True, group="initialize")
+    async def initialize(self, master_password: str) -> None:
+        self._set_initializing(True)
+        try:
+            content = await self._gateway.init_new_store_async(
+                self._path, master_password
+            )
+        except Exception as e:
+            self.notify(
+                message=f"password invalid:\n{e!s}",
+                severity="error",
+            )
+            return
+        finally:
+            self._set_initializing(False)
+        self.dismiss(content)
+
+    def _set_initializing(self, initializing: bool) -> None:
+        self._initializing = initializing
+        self.query_one(
+            "#initialize-new-store-modal__input-wrapper"
+        ).loading = initializing
+        self.query_one(
+            "#initialize-new-store-modal__init-db-button", Button
+        ).disabled = initializing
@@ -1,6 +1,6 @@
 from pathlib import Path
 
-from textual import on
+from textual import on, work
 from textual.app import ComposeResult
 from textual.binding import Binding
 from textual.containers import Container
@@ -59,8 +59,13 @@ class LoadDBModal(ModalScreen[list[Item] | None]):
         super().__init__(name=name, id=id, classes=classes)
         self._gateway = di.gateway
         self._path = path
+        self._unlocking = False
 
     def action_quit(self) -> None:
+        if self._unlocking:
+            self.workers.cancel_group(self, "unlock")
+            self.notify("unlock cancelled", severity="warning", timeout=2)
+            return
         self.dismiss(None)
 
     def compose(self) -> ComposeResult:
@@ -103,15 +108,31 @@ class LoadDBModal(ModalScreen[list[Item] | None]):
         self.handle_password_submit(event.input)
 
     def handle_password_submit(self, input_: Input) -> None:
+        if self._unlocking:
+            return
         try:
             check_input_value_valid(input_)
-            master_password = input_.value
-            content = self._gateway.load_existent_store(self._path, master_password)
-            self.dismiss(content)
+        except ValueError as e:
+            self.notify(
+                message=f"ValidationError: {e!s}",
+                severity="error",
+                timeout=2,
+            )
+            return
+        self.unlock(input_.value)
+
+    @work(exclusive=True, group="unlock")
+    async def unlock(self, master_password: str) -> None:
+        self._set_unlocking(True)
+        try:
+            content = await self._gateway.load_existent_store_async(
+                self._path, master_password
+            )
         except IntegrityError:
             self.notify(
                 message="IntegrityError: password invalid", severity="error", timeout=2
             )
+            return
         except InvalidHeader as e:
             self.notify(
                 f"InvalidHeader: corrupted file {self._path}: "
@@ -119,15 +140,21 @@ class LoadDBModal(ModalScreen[list[Item] | None]):
                 severity="error",
                 timeout=2,
             )
-        except ValueError as e:
-            self.notify(
-                message=f"ValidationError: {e!s}",
-                severity="error",
-                timeout=2,
-            )
+            return
         except Exception:
             self.notify(
                 message="GenericError: cannot decrypt file",
                 severity="error",
                 timeout=2,
             )
+            return
+        finally:
+            self._set_unlocking(False)
+        self.dismiss(content)
+
+    def _set_unlocking(self, unlocking: bool) -> None:
+        self._unlocking = unlocking
+        self.query_one("#load-new-db-modal__input-wrapper").loading = unlocking
+        self.query_one(
+            "#load-new-db-modal__init-db-button", Button
+        ).disabled = unlocking
@@ -1,13 +1,12 @@
 from pathlib import Path
 
 import pyperclip
-from textual import work
+from textual import on, work
 from textual.app import ComposeResult
 from textual.binding import Binding
 from textual.containers import Container
-from textual.coordinate import Coordinate
 from textual.screen import ModalScreen
-from textual.widgets import DataTable, Footer, Label
+from textual.widgets import Footer, Input, Label
 
 from bergmann.common.ru_keys import (
     RU_KEY_FOR_EN__D,
@@ -18,16 +17,22 @@ from bergmann.common.ru_keys import (
 )
 from bergmann.di import di
 from bergmann.entities.item import Item
+from bergmann.search_index import SearchIndex
 from bergmann.ui.widgets.passwords_modal.item_fields_modal import ItemFieldsModal
 from bergmann.ui.widgets.passwords_modal.passwords_table import PasswordsTable
 
 
 class PasswordsExplorer(ModalScreen[None]):
+    AUTO_FOCUS = "PasswordsTable"
     DEFAULT_CSS = """
     #passwords-explorer__selected_file {
         height: auto;
         padding: 1 2 1 2;
     }
+    #passwords-explorer__search {
+        display: none;
+        margin: 0 1;
+    }
     #passwords-explorer__data-table {
         padding: 0 1 1 1;
         border: green;
@@ -46,6 +51,7 @@ class PasswordsExplorer(ModalScreen[None]):
         Binding(RU_KEY_FOR_EN__N, action="add_new_item", show=False),
         Binding(RU_KEY_FOR_EN__E, action="edit_item", show=False),
         Binding(key="delete", action="delete_item", description="Delete"),
+        Binding(key="slash", action="search", description="Search"),
     )
 
     def __init__(
@@ -60,40 +66,45 @@ class PasswordsExplorer(ModalScreen[None]):
         self._gateway = di.gateway
         self._content = content
         self._path = path
+        self._items = {item.id: item for item in content}
+        self._index = SearchIndex()
+        self._query = ""
 
     @work
     async def action_edit_item(self) -> None:
-        dt = self.query_one(DataTable)
-        if dt.row_count == 0:
+        table = self.query_one(PasswordsTable)
+        item = table.current_item
+        if item is None:
             return
-        row_key, _ = dt.coordinate_to_cell_key(dt.cursor_coordinate)
-        row_index = dt.cursor_row
-        login_coordinate = Coordinate(row_index, 0)
-        description_coordinate = Coordinate(row_index, 1)
-        item = self._content[row_index]
         new_item = await self.app.push_screen_wait(
             ItemFieldsModal(
                 description=item.description,
                 login=item.login,
-                password=item.password,
+                password=self._gateway.reveal_password(item),
             )
         )
         if new_item is None:
             return
-        self._content[row_index] = new_item
-        self._gateway.update(self._path, self._content)
-        dt.update_cell_at(login_coordinate, new_item.login)
-        dt.update_cell_at(description_coordinate, new_item.description)
+        new_item.id = item.id
+        self._content[self._content.index(item)] = new_item
+        self._items[new_item.id] = new_item
+        self._index.replace(new_item)
+        self._gateway.replace_item(self._path, new_item)
+        if self._index.matches(new_item.id, self._query):
+            table.replace_item(new_item)
+        else:
+            table.remove_item(new_item.id)
 
     def action_delete_item(self) -> None:
-        dt = self.query_one(DataTable)
-        if dt.row_count == 0:
+        table = self.query_one(PasswordsTable)
+        item = table.current_item
+        if item is None:
             return
-        row_key, _ = dt.coordinate_to_cell_key(dt.cursor_coordinate)
-        row_index = dt.cursor_row
-        self._content.pop(row_index)
-        self._gateway.update(self._path, self._content)
-        dt.remove_row(row_key)
+        del self._items[item.id]
+        self._content.remove(item)
+        self._index.remove(item.id)
+        self._gateway.delete_item(self._path, item.id)
+        table.remove_item(item.id)
 
     @work
     async def action_add_new_item(self) -> None:
@@ -102,45 +113,74 @@ class PasswordsExplorer(ModalScreen[None]):
             self.notify("no item created", severity="warning")
             return
         self._content.append(item)
-        dt = self.query_one(DataTable)
-        self._gateway.update(self._path, self._content)
-        dt.add_row(item.login, item.description)
+        self._items[item.id] = item
+        self._index.add(item)
+        self._gateway.add_item(self._path, item)
+        if self._index.matches(item.id, self._query):
+            self.query_one(PasswordsTable).add_item(item)
+
+    def action_search(self) -> None:
+        search = self.query_one("#passwords-explorer__search", Input)
+        search.display = True
+        search.focus()
+
+    @on(Input.Changed, "#passwords-explorer__search")
+    def filter_items(self, event: Input.Changed) -> None:
+        self._query = event.value
+        self.query_one(PasswordsTable).set_items(
+            self._items[item_id] for item_id in self._index.search(self._query)
+        )
+
+    @on(Input.Submitted, "#passwords-explorer__search")
+    def leave_search(self) -> None:
+        self.query_one(PasswordsTable).focus()
 
     def action_copy_login(self) -> None:
         item = self.get_current_item()
+        if item is None:
+            return
         pyperclip.copy(item.login)
         self.notify("Login copied to clipboard", timeout=1)
 
     def action_copy_password(self) -> None:
         item = self.get_current_item()
-        pyperclip.copy(item.password)
+        if item is None:
+            return
+        pyperclip.copy(self._gateway.reveal_password(item))
         self.notify("Password copied to clipboard")
 
     def action_copy_description(self) -> None:
         item = self.get_current_item()
+        if item is None:
+            return
         pyperclip.copy(item.description)
         self.notify("Description copied to clipboard")
 
-    def get_current_item(self) -> Item:
-        dt = self.query_one(DataTable)
-        row_item = dt.cursor_row
-        item = self._content[row_item]
-        return item
+    def get_current_item(self) -> Item | None:
+        return self.query_one(PasswordsTable).current_item
 
     def compose(self) -> ComposeResult:
         with Container(id="passwords-explorer__selected_file"):
             yield Label(f"Path: {self._path}")
+        yield Input(placeholder="search", id="passwords-explorer__search")
         with Container(id="passwords-explorer__data-table"):
             yield PasswordsTable()
 
         yield Footer()
 
     def on_mount(self) -> None:
-        table = self.query_one(DataTable)
-        table.cursor_type = "cell"
-        table.zebra_stripes = True
-        table.add_columns("login", "description")
-        table.add_rows((item.login, item.description) for item in self._content)
+        tracer = di.tracer
+        with tracer.span("explorer.mount", items=len(self._content)):
+            with tracer.span("explorer.build_index"):
+                self._index = SearchIndex(self._content)
+            with tracer.span("explorer.populate_table"):
+                self.query_one(PasswordsTable).set_items(self._content)
 
     def action_quit(self) -> None:
+        search = self.query_one("#passwords-explorer__search", Input)
+        if search.has_focus:
+            search.value = ""
+            search.display = False
+            self.query_one(PasswordsTable).focus()
+            return
         self.dismiss(None)
@@ -1,17 +1,78 @@
-from textual.binding import Binding
-from textual.widgets import DataTable
+from collections.abc import Callable, Iterable
+from operator import attrgetter
+from typing import ClassVar, Final
+
+from rich.cells import cell_len, set_cell_size
+from rich.segment import Segment
+from rich.style import Style
+from textual import events
+from textual.binding import Binding, BindingType
+from textual.geometry import Size
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
 
 from bergmann.common.ru_keys import (
     RU_KEY_FOR_EN__H,
     RU_KEY_FOR_EN__J,
     RU_KEY_FOR_EN__K,
     RU_KEY_FOR_EN__L,
+    RU_KEY_FOR_EN__S,
+)
+from bergmann.entities.item import Item
+
+COLUMNS: Final[tuple[tuple[str, Callable[[Item], str]], ...]] = (
+    ("login", attrgetter("login")),
+    ("description", attrgetter("description")),
 )
+CELL_PADDING: Final[int] = 1
+MAX_COLUMN_WIDTH: Final[int] = 60
 
 
-class PasswordsTable(DataTable):
-    BINDINGS = [
-        *DataTable.BINDINGS,
+# Table over a list of items that renders only the rows in view, so showing
+# a store costs the same for ten items and for a hundred thousand. Columns
+# are as wide as the widest cell seen in view so far.
+#
+# The cursor follows its item, not its position: when the rows are replaced
+# (filtering) or reordered (sorting) it stays on the same item if it is
+# still shown.
+class PasswordsTable(ScrollView, can_focus=True):
+    DEFAULT_CSS = """
+    PasswordsTable {
+        background: $surface;
+        color: $text;
+        height: auto;
+        max-height: 100%;
+    }
+    PasswordsTable > .passwords-table--header {
+        text-style: bold;
+        background: $primary;
+        color: $text;
+    }
+    PasswordsTable > .passwords-table--even-row {
+        background: $primary 10%;
+    }
+    PasswordsTable:dark > .passwords-table--even-row {
+        background: $primary 15%;
+    }
+    PasswordsTable > .passwords-table--cursor {
+        background: $secondary;
+        color: $text;
+    }
+    """
+    COMPONENT_CLASSES: ClassVar[set[str]] = {
+        "passwords-table--header",
+        "passwords-table--even-row",
+        "passwords-table--cursor",
+    }
+    BINDINGS: ClassVar[list[BindingType]] = [
+        Binding("up", "cursor_up", "Cursor Up", show=False),
+        Binding("down", "cursor_down", "Cursor Down", show=False),
+        Binding("right", "cursor_right", "Cursor Right", show=False),
+        Binding("left", "cursor_left", "Cursor Left", show=False),
+        Binding("pageup", "page_up", "Page Up", show=False),
+        Binding("pagedown", "page_down", "Page Down", show=False),
+        Binding("home", "first_row", "First Row", show=False),
+        Binding("end", "last_row", "Last Row", show=False),
         Binding("k", "cursor_up", "Cursor Up", show=False),
         Binding("j", "cursor_down", "Cursor Down", show=False),
         Binding("l", "cursor_right", "Cursor Right", show=False),
@@ -20,4 +81,228 @@ class PasswordsTable(DataTable):
         Binding(RU_KEY_FOR_EN__J, "cursor_down", "Cursor Down", show=False),
         Binding(RU_KEY_FOR_EN__L, "cursor_right", "Cursor Right", show=False),
         Binding(RU_KEY_FOR_EN__H, "cursor_left", "Cursor Left", show=False),
+        Binding("s", "sort", "Sort", show=False),
+        Binding(RU_KEY_FOR_EN__S, "sort", "Sort", show=False),
     ]
+
+    def __init__(
+        self,
+        name: str | None = None,
+        id: str | None = None,
+        classes: str | None = None,
+    ) -> None:
+        super().__init__(name=name, id=id, classes=classes)
+        self._items: list[Item] = []
+        self._rows: list[Item] = []
+        self._sort_column: int | None = None
+        self._sort_reverse = False
+        self._column_widths = [cell_len(title) for title, _ in COLUMNS]
+        self.cursor_row = 0
+        self.cursor_column = 0
+
+    @property
+    def row_count(self) -> int:
+        return len(self._rows)
+
+    @property
+    def current_item(self) -> Item | None:
+        if not self._rows:
+            return None
+        return self._rows[self.cursor_row]
+
+    # Items are shown in the given order unless the table is sorted.
+    def set_items(self, items: Iterable[Item]) -> None:
+        self._items = list(items)
+        self._reorder()
+
+    def add_item(self, item: Item) -> None:
+        self._items.append(item)
+        self._reorder()
+
+    def replace_item(self, item: Item) -> None:
+        index = self._index_of(self._items, item.id)
+        if index is None:
+            return
+        self._items[index] = item
+        if self._sort_column is None:
+            self._rows[self._index_of(self._rows, item.id)] = item
+            self._fit_columns((item,))
+            self.refresh()
+        else:
+            self._reorder()
+
+    def remove_item(self, item_id: str) -> None:
+        index = self._index_of(self._items, item_id)
+        if index is None:
+            return
+        del self._items[index]
+        self._reorder()
+
+    def sort(self, column: int) -> None:
+        if self._sort_column != column:
+            self._sort_column, self._sort_reverse = column, False
+        elif not self._sort_reverse:
+            self._sort_reverse = True
+        else:
+            self._sort_column, self._sort_reverse = None, False
+        self._reorder()
+
+    def action_sort(self) -> None:
+        self.sort(self.cursor_column)
+
+    def action_cursor_up(self) -> None:
+        self._move_cursor(self.cursor_row - 1, self.cursor_column)
+
+    def action_cursor_down(self) -> None:
+        self._move_cursor(self.cursor_row + 1, self.cursor_column)
+
+    def action_cursor_left(self) -> None:
+        self._move_cursor(self.cursor_row, self.cursor_column - 1)
+
+    def action_cursor_right(self) -> None:
+        self._move_cursor(self.cursor_row, self.cursor_column + 1)
+
+    def action_page_up(self) -> None:
+        self._move_cursor(self.cursor_row - self._visible_rows, self.cursor_column)
+
+    def action_page_down(self) -> None:
+        self._move_cursor(self.cursor_row + self._visible_rows, self.cursor_column)
+
+    def action_first_row(self) -> None:
+        self._move_cursor(0, self.cursor_column)
+
+    def action_last_row(self) -> None:
+        self._move_cursor(len(self._rows) - 1, self.cursor_column)
+
+    def render_line(self, y: int) -> Strip:
+        scroll_x, scroll_y = self.scroll_offset
+        width = self.size.width
+        if y == 0:
+            strip = self._render_header()
+        else:
+            row = scroll_y + y - 1
+            if row >= len(self._rows):
+                return Strip.blank(width, self.rich_style)
+            strip = self._render_row(row)
+        return strip.crop_extend(scroll_x, scroll_x + width, self.rich_style)
+
+    def watch_scroll_y(self, old_value: float, new_value: float) -> None:
+        self._fit_columns(self._rows_in_view())
+        super().watch_scroll_y(old_value, new_value)
+
+    def on_resize(self) -> None:
+        self._fit_columns(self._rows_in_view())
+
+    async def _on_click(self, event: events.Click) -> None:
+        meta = event.style.meta
+        if "column" not in meta:
+            return
+        if "row" not in meta:
+            self.sort(meta["column"])
+            return
+        self._move_cursor(meta["row"], meta["column"])
+
+    # Rows fitting under the header.
+    @property
+    def _visible_rows(self) -> int:
+        return max(self.size.height - 1, 1)
+
+    def _rows_in_view(self) -> list[Item]:
+        top = round(self.scroll_y)
+        return self._rows[top : top + self.size.height]
+
+    def _reorder(self) -> None:
+        current = self.current_item
+        if self._sort_column is None:
+            self._rows = list(self._items)
+        else:
+            _, cell = COLUMNS[self._sort_column]
+            self._rows = sorted(
+                self._items,
+                key=lambda item: cell(item).casefold(),
+                reverse=self._sort_reverse,
+            )
+        row = self.cursor_row
+        if current is not None:
+            index = self._index_of(self._rows, current.id)
+            if index is not None:
+                row = index
+        self.virtual_size = Size(self.virtual_size.width, len(self._rows) + 1)
+        self._move_cursor(row, self.cursor_column)
+        self._fit_columns(self._rows_in_view())
+        self.refresh()
+
+    def _move_cursor(self, row: int, column: int) -> None:
+        self.cursor_row = max(min(row, len(self._rows) - 1), 0)
+        self.cursor_column = max(min(column, len(COLUMNS) - 1), 0)
+        top = round(self.scroll_y)
+        if self.cursor_row < top:
+            self.scroll_to(y=self.cursor_row, animate=False)
+        elif self.cursor_row >= top + self._visible_rows:
+            self.scroll_to(y=self.cursor_row - self._visible_rows + 1, animate=False)
+        self.refresh()
+
+    # Columns only grow, so they don't jump while scrolling back and forth.
+    def _fit_columns(self, items: Iterable[Item]) -> None:
+        widths = self._column_widths
+        for item in items:
+            for index, (_, cell) in enumerate(COLUMNS):
+                widths[index] = max(
+                    widths[index], min(cell_len(cell(item)), MAX_COLUMN_WIDTH)
+                )
+        width = sum(widths) + 2 * CELL_PADDING * len(widths)
+        if width != self.virtual_size.width:
+            self.virtual_size = Size(width, self.virtual_size.height)
+
+    def _render_header(self) -> Strip:
+        style = self.rich_style + self.get_component_rich_style(
+            "passwords-table--header"
+        )
+        titles = []
+        for index, (title, _) in enumerate(COLUMNS):
+            if index == self._sort_column:
+                title += " ▼" if self._sort_reverse else " ▲"
+            titles.append(title)
+        return self._render_cells(titles, None, style, None)
+
+    def _render_row(self, row: int) -> Strip:
+        style = self.rich_style
+        if row % 2:
+            style += self.get_component_rich_style("passwords-table--even-row")
+        cursor_style = None
+        if row == self.cursor_row:
+            cursor_style = style + self.get_component_rich_style(
+                "passwords-table--cursor"
+            )
+        item = self._rows[row]
+        return self._render_cells(
+            [cell(item) for _, cell in COLUMNS], row, style, cursor_style
+        )
+
+    def _render_cells(
+        self,
+        cells: list[str],
+        row: int | None,
+        style: Style,
+        cursor_style: Style | None,
+    ) -> Strip:
+        padding = " " * CELL_PADDING
+        segments = []
+        for column, (text, width) in enumerate(zip(cells, self._column_widths)):
+            cell_style = style
+            if cursor_style is not None and column == self.cursor_column:
+                cell_style = cursor_style
+            meta = {"column": column} if row is None else {"row": row, "column": column}
+            segments.append(
+                Segment(
+                    f"{padding}{set_cell_size(text, width)}{padding}",
+                    cell_style + Style.from_meta(meta),
+                )
+            )
+        return Strip(segments)
+
+    @staticmethod
+    def _index_of(items: list[Item], item_id: str) -> int | None:
+        return next(
+            (index for index, item in enumerate(items) if item.id == item_id), None
+        )
@@ -3,7 +3,7 @@ from typing import Iterable
 
 from textual.widgets import DirectoryTree
 
-from bergmann.common import logger
+from bergmann.common.logger import logger
 
 
 class BmnFilteredDirectoryTree(DirectoryTree):
@@ -0,0 +1,70 @@
+from pathlib import Path
+from typing import Final
+
+from textual.app import ComposeResult
+from textual.binding import Binding
+from textual.screen import ModalScreen
+from textual.widgets import Footer, Label, Log
+
+from bergmann.di import di
+from bergmann.tracing import format_span
+
+# Written to the working directory, open it in chrome://tracing or Perfetto.
+CHROME_TRACE_FILE: Final[Path] = Path("bergmann-trace.json")
+
+
+# Spans recorded in --debug mode, newest last, a span after the ones it
+# encloses. Kept open, it follows the spans as they finish.
+class TracePanel(ModalScreen[None]):
+    DEFAULT_CSS = """
+    TracePanel {
+        align: center bottom;
+    }
+    #trace-panel__title {
+        width: 100%;
+        padding: 0 1;
+        background: $panel;
+    }
+    #trace-panel__log {
+        height: 60%;
+        border: green;
+    }
+    """
+    BINDINGS = (
+        Binding(key="escape", action="dismiss", description="Close"),
+        Binding(key="x", action="export", description="Export Chrome trace"),
+        Binding(key="c", action="clear", description="Clear"),
+    )
+    REFRESH_INTERVAL = 0.5
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._tracer = di.tracer
+        self._seen = 0
+
+    def compose(self) -> ComposeResult:
+        yield Label("Trace spans", id="trace-panel__title")
+        yield Log(id="trace-panel__log", auto_scroll=True)
+        yield Footer()
+
+    def on_mount(self) -> None:
+        self._show_new_spans()
+        self.set_interval(self.REFRESH_INTERVAL, self._show_new_spans)
+
+    def action_export(self) -> None:
+        path = CHROME_TRACE_FILE.resolve()
+        try:
+            self._tracer.export_chrome_trace(path)
+        except OSError as error:
+            self.notify(f"trace not exported: {error}", severity="error")
+            return
+        self.notify(f"trace exported: {path}")
+
+    def action_clear(self) -> None:
+        self._tracer.clear()
+        self.query_one(Log).clear()
+
+    def _show_new_spans(self) -> None:
+        spans, self._seen = self._tracer.spans_since(self._seen)
+        if spans:
+            self.query_one(Log).write_lines(format_span(span) for span in spans)
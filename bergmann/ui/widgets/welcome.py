@@ -1,8 +1,10 @@
 from textual.app import ComposeResult
 from textual.widget import Widget
-from textual.widgets import Markdown
+from textual.widgets import Static
 
 
+# Plain markup rather than Markdown: the welcome screen is the first frame,
+# and the Markdown widget brings in a whole parser for three lines.
 class WelcomeWidget(Widget):
     DEFAULT_CSS = """
     WelcomeWidget {
@@ -10,20 +12,20 @@ class WelcomeWidget(Widget):
         width: 100%;
         align: center middle;
     }
-    Markdown {
+    Static {
         width: 70%;
-        height: 100%;
-        align: center middle;
+        height: auto;
     }
 """
-    _welcome_text = """Welcome to the `Bergmann` app!  
-This app is designed for *securely* storing passwords.  
-To select a location for saving your passwords, press **'{}'**.  
-"""  # noqa: W291
+    _welcome_text = (
+        "Welcome to the [bold]Bergmann[/bold] app!\n"
+        "This app is designed for [italic]securely[/italic] storing passwords.\n"
+        "To select a location for saving your passwords, press [bold]'{}'[/bold]."
+    )
 
     def __init__(self, select_source_binding: str, *children: Widget):
         super().__init__(*children)
         self._select_source_binding = select_source_binding
 
     def compose(self) -> ComposeResult:
-        yield Markdown(self._welcome_text.format(self._select_source_binding))
+        yield Static(self._welcome_text.format(self._select_source_binding))
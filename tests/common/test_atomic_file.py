@@ -0,0 +1,69 @@
+import os
+import stat
+from pathlib import Path
+
+import pytest
+
+from bergmann.common.atomic_file import atomic_write
+
+
+def test_atomic_write__target_replaced(tmp_path: Path) -> None:
+    # Arrange
+    path = tmp_path / "store.bmn"
+    path.write_bytes(b"old content")
+    path.chmod(0o600)
+
+    # Act
+    with atomic_write(path, expected_size=11) as file:
+        file.write(b"new content")
+
+    # Assert
+    assert path.read_bytes() == b"new content"
+    assert stat.S_IMODE(path.stat().st_mode) == 0o600
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_atomic_write__failed_write_keeps_target(tmp_path: Path) -> None:
+    # Arrange
+    path = tmp_path / "store.bmn"
+    path.write_bytes(b"old content")
+
+    # Act
+    with pytest.raises(RuntimeError):
+        with atomic_write(path, expected_size=1 << 20) as file:
+            file.write(b"partial")
+            raise RuntimeError()
+
+    # Assert
+    assert path.read_bytes() == b"old content"
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_atomic_write__concurrent_writes_kept_apart(tmp_path: Path) -> None:
+    # Arrange
+    path = tmp_path / "store.bmn"
+
+    # Act
+    with atomic_write(path) as first, atomic_write(path) as second:
+        first.write(b"first")
+        second.write(b"second")
+
+    # Assert
+    assert path.read_bytes() == b"first"
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_atomic_write__temp_file_private_until_complete(tmp_path: Path) -> None:
+    # Arrange
+    path = tmp_path / "store.bmn"
+    path.write_bytes(b"old content")
+    path.chmod(0o644)
+
+    # Act
+    with atomic_write(path) as file:
+        written_mode = stat.S_IMODE(os.fstat(file.fileno()).st_mode)
+        file.write(b"new content")
+
+    # Assert
+    assert written_mode == 0o600
+    assert stat.S_IMODE(path.stat().st_mode) == 0o644
@@ -0,0 +1,53 @@
+import pytest
+
+from bergmann.common.entry_stream import EntryStream, encode_entries, encode_entry
+
+
+def test_feed__entries_split_across_chunks() -> None:
+    # Arrange
+    entries = [["описание", "login", "п" * 300, "id"], [], ["", "\x00"]]
+    raw = bytes(encode_entries(entries))
+    sut = EntryStream()
+
+    # Act
+    result = [
+        entry for byte in range(len(raw)) for entry in sut.feed(raw[byte : byte + 1])
+    ]
+    result += sut.close()
+
+    # Assert
+    assert result == entries
+
+
+def test_feed__digests_of_records_as_read() -> None:
+    # Arrange
+    entries = [["описание", "login", "id"], ["другое", "", "id2"]]
+    raw = bytes(encode_entries(entries))
+    sut = EntryStream(lambda record: bytes(record))
+
+    # Act
+    for byte in range(len(raw)):
+        sut.feed(raw[byte : byte + 1])
+    sut.close()
+
+    # Assert
+    assert sut.digests == [encode_entry(entry) for entry in entries]
+
+
+def test_encode_entries__non_ascii_not_escaped() -> None:
+    # Act
+    result = encode_entries([["пароль"]])
+
+    # Assert
+    assert len(result) == 1 + 1 + 1 + len("пароль".encode())
+
+
+@pytest.mark.parametrize("raw", [b"", b"\x02", b"\x01\x05ab", b"\x01\x02\x05a"])
+def test_close__invalid_stream(raw: bytes) -> None:
+    # Arrange
+    sut = EntryStream()
+
+    # Act\Assert
+    with pytest.raises(ValueError):
+        sut.feed(raw)
+        sut.close()
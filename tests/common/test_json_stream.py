@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+from bergmann.common.json_stream import JsonArrayStream
+
+
+def test_feed__elements_split_across_chunks() -> None:
+    # Arrange
+    elements = [['a]"b', "ж", "\\"], {"key": ["[", "}"]}, []]
+    raw = json.dumps(elements, ensure_ascii=False).encode("utf8")
+    sut = JsonArrayStream()
+
+    # Act
+    result = [
+        element
+        for byte in range(len(raw))
+        for element in sut.feed(raw[byte : byte + 1])
+    ]
+    result += sut.close()
+
+    # Assert
+    assert result == elements
+
+
+def test_feed__element_returned_once_closed() -> None:
+    # Arrange
+    sut = JsonArrayStream()
+
+    # Act
+    first = sut.feed(b'[["a", "b"], ["c"')
+    second = sut.feed(b"]]")
+
+    # Assert
+    assert first == [["a", "b"]]
+    assert second == [["c"]]
+
+
+@pytest.mark.parametrize("raw", [b"", b"[[1]", b'[["a]', b"[1]", b"{}", b"[[]] x"])
+def test_close__malformed_array(raw: bytes) -> None:
+    # Arrange
+    sut = JsonArrayStream()
+
+    # Act\Assert
+    with pytest.raises(ValueError):
+        sut.feed(raw)
+        sut.close()
@@ -0,0 +1,35 @@
+from typing import Final
+
+from grassnechik import Grassnechik
+from grassnechik import Key as BinaryKey
+
+
+class GrassnechikBlockCypher:
+    block_size: Final[int] = 16
+
+    def __init__(self, key: bytes):
+        self._crypto_impl = Grassnechik(BinaryKey(key))  # type: ignore
+
+    def encrypt(self, plain_text: bytes) -> bytes:
+        cypher_blocks: list[bytes] = []
+        for block_index in range(0, len(plain_text), self.block_size):
+            block = plain_text[block_index : block_index + self.block_size]
+            encrypted = self._crypto_impl.encrypt(tuple(block))
+            cypher_blocks.append(bytes(encrypted))
+        return b"".join(cypher_blocks)
+
+    def decrypt(self, cypher_text: bytes) -> bytes:
+        plain_blocks: list[bytes] = []
+        for block_index in range(0, len(cypher_text), self.block_size):
+            block = cypher_text[block_index : block_index + self.block_size]
+            decrypted = self._crypto_impl.decrypt(tuple(block))
+            plain_blocks.append(bytes(decrypted))
+        return b"".join(plain_blocks)
+
+    def encrypt_into(self, buffer: bytearray | memoryview) -> None:
+        with memoryview(buffer) as view:
+            view[:] = self.encrypt(view.tobytes())
+
+    def decrypt_into(self, buffer: bytearray | memoryview) -> None:
+        with memoryview(buffer) as view:
+            view[:] = self.decrypt(view.tobytes())
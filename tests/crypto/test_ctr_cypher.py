@@ -0,0 +1,163 @@
+import os
+from collections.abc import Callable
+from concurrent.futures import Future
+
+import pytest
+
+from bergmann.convention import DB_ITERATIONS_BYTES
+from bergmann.crypto import kuzctrcypher, worker_pools
+from bergmann.crypto.kuzctrcypher import NONCE_SIZE, KuzCtrCypher
+from bergmann.key import KeyMeta
+
+
+# Runs segments in-process and counts those submitted but not collected.
+class CountingExecutor:
+    def __init__(self, sut: KuzCtrCypher):
+        self._sut = sut
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def submit(
+        self, _: Callable[..., bytes], nonce: bytes, block: int, data: bytes
+    ) -> Future[bytes]:
+        future = CountedFuture(self)
+        future.set_result(
+            kuzctrcypher.xor_keystream(self._sut._crypto_impl, nonce, block, data)
+        )
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        return future
+
+
+class CountedFuture(Future[bytes]):
+    def __init__(self, executor: CountingExecutor):
+        super().__init__()
+        self._executor = executor
+
+    def result(self, timeout: float | None = None) -> bytes:
+        self._executor.in_flight -= 1
+        return super().result(timeout)
+
+
+@pytest.fixture(scope="session")
+def sut() -> KuzCtrCypher:
+    key_meta = KeyMeta(
+        salt=b"0123456789abcdef",
+        iterations=int.from_bytes(DB_ITERATIONS_BYTES),
+    )
+    return KuzCtrCypher("test-password", key_meta)
+
+
+def test_encrypt__message_not_aligned_to_block_size(sut: KuzCtrCypher) -> None:
+    # Arrange
+    message = "0123456789abcdef0123"
+
+    # Act
+    result = sut.encrypt(message)
+
+    # Assert
+    assert len(result) == NONCE_SIZE + len(message.encode("utf8"))
+    assert sut.decrypt(result) == message.encode("utf8")
+
+
+def test_encrypt__fresh_nonce_per_call(sut: KuzCtrCypher) -> None:
+    # Arrange
+    message = "0123456789abcdef"
+
+    # Act
+    first, second = sut.encrypt(message), sut.encrypt(message)
+
+    # Assert
+    assert first[:NONCE_SIZE] != second[:NONCE_SIZE]
+    assert first[NONCE_SIZE:] != second[NONCE_SIZE:]
+
+
+def test_encrypt_into__process_pool_same_as_sequential(
+    sut: KuzCtrCypher, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Arrange
+    plain_text = os.urandom(3000)
+    monkeypatch.setattr(kuzctrcypher, "SEGMENT_SIZE", 1024)
+    monkeypatch.setattr(kuzctrcypher, "PARALLEL_THRESHOLD", 2048)
+    monkeypatch.setattr(kuzctrcypher.os, "cpu_count", lambda: 2)
+    buffer = bytearray(plain_text)
+
+    # Act
+    sut.encrypt_into(buffer)
+
+    # Assert
+    monkeypatch.undo()
+    assert sut.decrypt(bytes(buffer)) == plain_text
+
+
+def test_encrypt_into__segments_in_flight_bounded(
+    sut: KuzCtrCypher, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Arrange
+    plain_text = os.urandom(20 * 1024)
+    executor = CountingExecutor(sut)
+    monkeypatch.setattr(kuzctrcypher, "SEGMENT_SIZE", 1024)
+    monkeypatch.setattr(kuzctrcypher, "PARALLEL_THRESHOLD", 2048)
+    monkeypatch.setattr(kuzctrcypher.os, "cpu_count", lambda: 2)
+    monkeypatch.setattr(KuzCtrCypher, "_executor", lambda self, workers: executor)
+    buffer = bytearray(plain_text)
+
+    # Act
+    sut.encrypt_into(buffer)
+
+    # Assert
+    monkeypatch.undo()
+    assert executor.max_in_flight == 2 * kuzctrcypher.SEGMENTS_IN_FLIGHT_PER_WORKER
+    assert sut.decrypt(bytes(buffer)) == plain_text
+
+
+def test_encrypt_into__process_pool_kept_until_shut_down(
+    sut: KuzCtrCypher, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Arrange
+    monkeypatch.setattr(kuzctrcypher, "SEGMENT_SIZE", 1024)
+    monkeypatch.setattr(kuzctrcypher, "PARALLEL_THRESHOLD", 2048)
+    monkeypatch.setattr(kuzctrcypher.os, "cpu_count", lambda: 2)
+    sut.encrypt_into(bytearray(3000))
+    pools = dict(worker_pools._pools)
+
+    # Act
+    sut.encrypt_into(bytearray(3000))
+    kept = dict(worker_pools._pools)
+    worker_pools.shutdown_pools()
+
+    # Assert
+    assert len(pools) == 1
+    assert kept == pools
+    assert worker_pools._pools == {}
+
+
+def test_iter_decrypt__process_pool_same_as_decrypt(
+    sut: KuzCtrCypher, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Arrange
+    plain_text = os.urandom(5000)
+    cypher_text = sut.encrypt(plain_text.hex())
+    monkeypatch.setattr(kuzctrcypher, "SEGMENT_SIZE", 1024)
+    monkeypatch.setattr(kuzctrcypher, "PARALLEL_THRESHOLD", 2048)
+    monkeypatch.setattr(kuzctrcypher.os, "cpu_count", lambda: 2)
+
+    # Act
+    result = [chunk.tobytes() for chunk in sut.iter_decrypt(cypher_text)]
+
+    # Assert
+    assert len(result) == 5
+    assert b"".join(result) == plain_text.hex().encode("utf8")
+
+
+def test_encrypt_fields__own_nonce_per_field(sut: KuzCtrCypher) -> None:
+    # Arrange
+    fields = [b"", b"same", b"same", b"d" * 33]
+
+    # Act
+    result = sut.encrypt_fields(fields)
+
+    # Assert
+    assert result[1] != result[2]
+    assert sut.decrypt_fields(result) == fields
+    assert [sut.decrypt(field) for field in result] == fields
@@ -1,6 +1,8 @@
 import pytest
 
+from bergmann.common.exceptions import IntegrityError
 from bergmann.convention import DB_ITERATIONS_BYTES
+from bergmann.crypto import kuzcypher
 from bergmann.crypto.kuzcypher import KuzCypher
 from bergmann.key import KeyMeta
 
@@ -57,3 +59,83 @@ def test_encrypt__message_larger_than_block_size(sut: KuzCypher) -> None:
     assert len(result) % sut.block_size == 0
     assert result != message
     assert sut.decrypt(result) == message.encode("utf8")
+
+
+def test_encrypt_into__same_as_encrypt(sut: KuzCypher) -> None:
+    # Arrange
+    message = "0123456789abcdef0123"
+    buffer = bytearray(message.encode("utf8"))
+
+    # Act
+    sut.encrypt_into(buffer)
+
+    # Assert
+    assert len(buffer) % sut.block_size == 0
+    assert bytes(buffer) == sut.encrypt(message)
+
+
+def test_decrypt_into__view_over_plain_text(sut: KuzCypher) -> None:
+    # Arrange
+    message = "0123456789abcdef0123"
+    buffer = bytearray(sut.encrypt(message))
+
+    # Act
+    result = sut.decrypt_into(buffer)
+
+    # Assert
+    assert isinstance(result, memoryview)
+    assert result.obj is buffer
+    assert result == message.encode("utf8")
+
+
+def test_iter_decrypt__chunks_join_to_plain_text(
+    sut: KuzCypher, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Arrange
+    message = "0123456789abcdef" * 5 + "tail"
+    cypher_text = sut.encrypt(message)
+    monkeypatch.setattr(kuzcypher, "STREAM_CHUNK_SIZE", 32)
+
+    # Act
+    result = [chunk.tobytes() for chunk in sut.iter_decrypt(cypher_text)]
+
+    # Assert
+    assert len(result) == 3
+    assert b"".join(result) == message.encode("utf8")
+
+
+def test_encrypt_fields__decrypted_back(sut: KuzCypher) -> None:
+    # Arrange
+    fields = [b"", b"login", b"0123456789abcdef", b"d" * 33]
+
+    # Act
+    result = sut.encrypt_fields(fields)
+
+    # Assert
+    assert [len(field) % sut.block_size for field in result] == [0, 0, 0, 0]
+    assert sut.decrypt_fields(result) == fields
+    assert sut.decrypt(result[3]) == fields[3]
+
+
+@pytest.mark.parametrize(
+    "plain_text",
+    [
+        b"",
+        b"0123456789abcde\x00",
+        b"0123456789abcde\x11",
+        b"0123456789abc\x01\x03\x03",
+        b"\x20" * 16,
+    ],
+)
+def test_unpad_view__invalid_padding(sut: KuzCypher, plain_text: bytes) -> None:
+    # Act\Assert
+    with pytest.raises(IntegrityError):
+        sut.unpad_view(bytearray(plain_text))
+
+
+def test_unpad_view__full_padding_block(sut: KuzCypher) -> None:
+    # Act
+    result = sut.unpad_view(bytearray(b"abc" + b"\x10" * 16))
+
+    # Assert
+    assert result.tobytes() == b"abc"
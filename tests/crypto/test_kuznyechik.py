@@ -0,0 +1,96 @@
+import os
+
+import pytest
+
+from bergmann.convention import DB_ITERATIONS_BYTES
+from bergmann.crypto.kuzcypher import KuzCypher
+from bergmann.crypto.kuznyechik import Kuznyechik
+from bergmann.key import KeyMeta
+from tests.crypto.grassnechik_adapter import GrassnechikBlockCypher
+
+# GOST R 34.12-2015, appendix A.1
+KEY = bytes.fromhex("8899aabbccddeeff0011223344556677fedcba98765432100123456789abcdef")
+PLAIN_TEXT = bytes.fromhex("1122334455667700ffeeddccbbaa9988")
+CYPHER_TEXT = bytes.fromhex("7f679d90bebc24305a468d42b9d4edcd")
+
+
+@pytest.fixture(scope="session")
+def sut() -> Kuznyechik:
+    return Kuznyechik(KEY)
+
+
+def test_encrypt__standard_test_vector(sut: Kuznyechik) -> None:
+    # Act
+    result = sut.encrypt(PLAIN_TEXT)
+
+    # Assert
+    assert result == CYPHER_TEXT
+
+
+def test_decrypt__standard_test_vector(sut: Kuznyechik) -> None:
+    # Act
+    result = sut.decrypt(CYPHER_TEXT)
+
+    # Assert
+    assert result == PLAIN_TEXT
+
+
+def test_encrypt__same_as_reference_implementation(sut: Kuznyechik) -> None:
+    # Arrange
+    plain_text = os.urandom(sut.block_size * 8)
+    reference = GrassnechikBlockCypher(KEY)
+
+    # Act
+    result = sut.encrypt(plain_text)
+
+    # Assert
+    assert result == reference.encrypt(plain_text)
+    assert reference.decrypt(result) == plain_text
+    assert sut.decrypt(result) == plain_text
+
+
+def test_encrypt__not_aligned_data(sut: Kuznyechik) -> None:
+    # Act\Assert
+    with pytest.raises(ValueError):
+        sut.encrypt(b"0123")
+
+
+def test_init__invalid_key_size() -> None:
+    # Act\Assert
+    with pytest.raises(ValueError):
+        Kuznyechik(b"short-key")
+
+
+def test_kuz_cypher__engines_compatible() -> None:
+    # Arrange
+    key_meta = KeyMeta(
+        salt=b"0123456789abcdef",
+        iterations=int.from_bytes(DB_ITERATIONS_BYTES),
+    )
+    message = "0123456789abcdef0123"
+    table_cypher = KuzCypher("test-password", key_meta)
+    reference_cypher = KuzCypher(
+        "test-password", key_meta, block_cypher_factory=GrassnechikBlockCypher
+    )
+
+    # Act
+    result = table_cypher.encrypt(message)
+
+    # Assert
+    assert result == reference_cypher.encrypt(message)
+    assert reference_cypher.decrypt(result) == message.encode("utf8")
+
+
+def test_numpy_kuznyechik__same_as_scalar(sut: Kuznyechik) -> None:
+    # Arrange
+    kuznyechik_numpy = pytest.importorskip("bergmann.crypto.kuznyechik_numpy")
+    plain_text = os.urandom(sut.block_size * 5000)
+    numpy_sut = kuznyechik_numpy.NumpyKuznyechik(KEY)
+
+    # Act
+    result = numpy_sut.encrypt(plain_text)
+
+    # Assert
+    assert result == sut.encrypt(plain_text)
+    assert numpy_sut.decrypt(result) == plain_text
+    assert numpy_sut.encrypt(PLAIN_TEXT) == CYPHER_TEXT
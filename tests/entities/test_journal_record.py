@@ -0,0 +1,36 @@
+import pytest
+
+from bergmann.common.exceptions import IntegrityError
+from bergmann.entities.journal_record import JournalRecord
+
+
+def test_from_bytes__round_trip() -> None:
+    # Arrange
+    records = [
+        JournalRecord.add(["description", "login", "password", "id"]),
+        JournalRecord.replace(["description", "login", "password", "id"]),
+        JournalRecord.delete("id"),
+    ]
+
+    # Act
+    result = [JournalRecord.from_bytes(record.as_bytes()) for record in records]
+
+    # Assert
+    assert result == records
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b'["add", []]',
+        b'["replace", ["login", 1]]',
+        b'["delete", ["id"]]',
+        b'["add", ["id"], "extra"]',
+        b'{"add": ["id"]}',
+        b'"add"',
+    ],
+)
+def test_from_bytes__malformed_record(data: bytes) -> None:
+    # Act\Assert
+    with pytest.raises(IntegrityError):
+        JournalRecord.from_bytes(data)
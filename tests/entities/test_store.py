@@ -0,0 +1,23 @@
+import json
+
+import pytest
+
+from bergmann.entities import store
+from bergmann.entities.store import serialize_entries
+
+
+@pytest.mark.parametrize("entries_count", [0, 1, 2, 5])
+def test_serialize_entries__same_as_json_dumps(
+    entries_count: int, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Arrange
+    monkeypatch.setattr(store, "SERIALIZE_BATCH_SIZE", 2)
+    entries = [
+        (f"site {i}", "логин", 'pass"word', str(i)) for i in range(entries_count)
+    ]
+
+    # Act
+    result = serialize_entries(entries)
+
+    # Assert
+    assert result == json.dumps(entries).encode("utf8")
@@ -0,0 +1,133 @@
+import os
+import threading
+from pathlib import Path
+
+import pytest
+
+from bergmann import agent as agent_module
+from bergmann.agent import Agent, AgentClient
+from bergmann.common.exceptions import AgentError
+from bergmann.di import di
+from bergmann.entities.item import Item
+
+
+@pytest.fixture
+def store_path(tmp_path: Path) -> Path:
+    path = tmp_path / "db.bmn"
+    path.touch()
+    di.gateway.init_new_store(path, "master")
+    di.gateway.add_item(path, Item(description="GitHub", login="bob", password="p1"))
+    di.gateway.add_item(path, Item(description="GitLab", login="eve", password="p2"))
+    di.gateway.clean()
+    return path
+
+
+@pytest.fixture
+def sut(store_path: Path) -> Agent:
+    items = di.gateway.load_existent_store(store_path, "master")
+    return Agent(store_path, di.gateway, items)
+
+
+def _serve(sut: Agent, socket_path: Path) -> threading.Thread:
+    sut.listen(socket_path)
+    thread = threading.Thread(target=sut.serve, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_handle__get_and_list(sut: Agent, store_path: Path) -> None:
+    # Arrange
+    store = str(store_path.resolve())
+
+    # Act
+    password = sut.handle({"op": "get", "store": store, "query": "github"})
+    login = sut.handle(
+        {"op": "get", "store": store, "query": "gitlab", "field": "login"}
+    )
+    listed = sut.handle({"op": "list", "store": store, "query": "git"})
+
+    # Assert
+    assert password == {"ok": True, "value": "p1"}
+    assert login == {"ok": True, "value": "eve"}
+    assert [item[1:] for item in listed["items"]] == [
+        ["bob", "GitHub"],
+        ["eve", "GitLab"],
+    ]
+
+
+@pytest.mark.parametrize(
+    "request_",
+    [
+        {"op": "get", "store": "/other/store", "query": "github"},
+        {"op": "get", "query": "git"},
+        {"op": "get", "query": "github", "field": "salt"},
+        {"op": "unlock"},
+    ],
+)
+def test_handle__bad_request_fails(
+    sut: Agent, store_path: Path, request_: dict[str, str]
+) -> None:
+    # Arrange
+    request = {"store": str(store_path.resolve()), **request_}
+
+    # Act
+    response = sut.handle(request)
+
+    # Assert
+    assert response["ok"] is False
+    assert not sut.locked
+
+
+def test_handle__store_changed_on_disk_locks(sut: Agent, store_path: Path) -> None:
+    # Arrange
+    with store_path.open("ab") as file:
+        file.write(b"\0")
+
+    # Act
+    response = sut.handle(
+        {"op": "get", "store": str(store_path.resolve()), "query": "github"}
+    )
+
+    # Assert
+    assert response["ok"] is False
+    assert sut.locked
+
+
+def test_serve__lookups_until_idle_lock(store_path: Path, tmp_path: Path) -> None:
+    # Arrange
+    socket_path = tmp_path / "agent" / "agent.sock"
+    items = di.gateway.load_existent_store(store_path, "master")
+    sut = Agent(store_path, di.gateway, items, idle_timeout=0.5)
+    thread = _serve(sut, socket_path)
+
+    # Act
+    with AgentClient(socket_path) as client:
+        store = client.store()
+        password = client.get_field(store_path, "bob")
+
+    # Assert
+    assert store == store_path.resolve()
+    assert password == "p1"
+    assert (socket_path.stat().st_mode & 0o777) == 0o600
+    thread.join(5)
+    assert not thread.is_alive()
+    assert sut.locked
+    assert not socket_path.exists()
+
+
+def test_serve__other_user_refused(
+    sut: Agent, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Arrange
+    socket_path = tmp_path / "agent" / "agent.sock"
+    monkeypatch.setattr(agent_module, "peer_uid", lambda _: os.getuid() + 1)
+    thread = _serve(sut, socket_path)
+
+    # Act\Assert
+    try:
+        with pytest.raises((AgentError, ConnectionError)):
+            with AgentClient(socket_path) as client:
+                client.store()
+    finally:
+        sut.lock()
+        thread.join(5)
@@ -0,0 +1,186 @@
+import io
+import os
+import shlex
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from bergmann.agent import AgentClient
+from bergmann.cli import run
+from bergmann.di import di
+from bergmann.passwords_model import PasswordsModel
+
+# Seconds from a fresh interpreter to bergmann.main being importable, the
+# headless commands pay it on every call.
+COLD_START_BUDGET = 0.5
+# Seconds eval "$(bergmann agent STORE)" may take: unlocking, not serving.
+AGENT_START_TIMEOUT = 30
+
+
+def _run(argv: list[str], *secrets: str) -> tuple[int, str]:
+    read_fd, write_fd = os.pipe()
+    with os.fdopen(write_fd, "w") as pipe:
+        pipe.write("".join(f"{secret}\n" for secret in secrets))
+    out = io.StringIO()
+    try:
+        status = run([*argv, "--password-fd", str(read_fd)], stdout=out)
+    finally:
+        os.close(read_fd)
+    return status, out.getvalue()
+
+
+@pytest.fixture
+def store_path(tmp_path: Path) -> Path:
+    path = tmp_path / "db.bmn"
+    path.touch()
+    di.gateway.init_new_store(path, "master")
+    di.gateway.clean()
+    return path
+
+
+def test_add_get_rm__round_trip(store_path: Path) -> None:
+    # Arrange
+    path = str(store_path)
+
+    # Act
+    add_status, item_id = _run(
+        ["add", path, "--login", "bob", "--description", "GitHub"],
+        "master",
+        "secret",
+    )
+    get_status, password = _run(["get", path, "github"], "master")
+    rm_status, _ = _run(["rm", path, item_id.strip()], "master")
+    list_status, listing = _run(["list", path, "github"], "master")
+
+    # Assert
+    assert (add_status, get_status, rm_status, list_status) == (0, 0, 0, 0)
+    assert password == "secret\n"
+    assert listing == ""
+
+
+def test_get__wrong_password_fails(
+    store_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    # Act
+    status, out = _run(["get", str(store_path), "example"], "wrong")
+
+    # Assert
+    assert status == 1
+    assert out == ""
+    assert "password invalid" in capsys.readouterr().err
+
+
+def test_add__failed_write_reported(
+    store_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    # Arrange
+    def fail(*_: object) -> None:
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(PasswordsModel, "prepare_changes", fail)
+    monkeypatch.setattr(PasswordsModel, "prepare_flush", fail)
+
+    # Act
+    status, _ = _run(
+        ["add", str(store_path), "--login", "bob", "--description", "GitHub"],
+        "master",
+        "secret",
+    )
+
+    # Assert
+    assert status == 1
+    assert "No space left on device" in capsys.readouterr().err
+
+
+def test_import__cold_start_without_textual() -> None:
+    # Arrange
+    script = (
+        "import sys, time\n"
+        "started = time.perf_counter()\n"
+        "import bergmann.main\n"
+        "print(time.perf_counter() - started)\n"
+        "print(any(name.split('.')[0] == 'textual' for name in sys.modules))\n"
+    )
+
+    # Act
+    result = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    )
+
+    # Assert
+    elapsed, textual_loaded = result.stdout.split()
+    assert textual_loaded == "False"
+    assert float(elapsed) < COLD_START_BUDGET
+
+
+def test_agent__eval_of_printed_command_returns(
+    store_path: Path, tmp_path: Path
+) -> None:
+    # Arrange
+    socket_path = tmp_path / "agent" / "agent.sock"
+    command = shlex.join(
+        [
+            sys.executable,
+            "-m",
+            "bergmann.main",
+            "agent",
+            str(store_path),
+            "--socket",
+            str(socket_path),
+            "--password-fd",
+            "0",
+        ]
+    )
+
+    # Act
+    result = subprocess.run(
+        ["sh", "-c", f'eval "$({command})" && echo "$BERGMANN_AGENT_SOCK"'],
+        input="master\n",
+        capture_output=True,
+        text=True,
+        timeout=AGENT_START_TIMEOUT,
+        check=True,
+    )
+
+    # Assert
+    assert result.stdout == f"{socket_path}\n"
+    with AgentClient(socket_path) as client:
+        assert client.store() == store_path.resolve()
+        client.lock()
+
+
+def test_agent__failed_unlock_reported_by_parent(
+    store_path: Path, tmp_path: Path
+) -> None:
+    # Arrange
+    socket_path = tmp_path / "agent" / "agent.sock"
+    command = [
+        sys.executable,
+        "-m",
+        "bergmann.main",
+        "agent",
+        str(store_path),
+        "--socket",
+        str(socket_path),
+        "--password-fd",
+        "0",
+    ]
+
+    # Act
+    result = subprocess.run(
+        command,
+        input="wrong\n",
+        capture_output=True,
+        text=True,
+        timeout=AGENT_START_TIMEOUT,
+    )
+
+    # Assert
+    assert result.returncode == 1
+    assert result.stdout == ""
+    assert "password invalid" in result.stderr
+    assert not socket_path.exists()
@@ -0,0 +1,38 @@
+import pytest
+
+from bergmann import compression
+from bergmann.compression import compress, iter_decompress
+from bergmann.convention import StoreFlags
+
+CODECS = [StoreFlags.ZLIB_COMPRESSED, StoreFlags.LZMA_COMPRESSED]
+
+
+@pytest.mark.parametrize("flags", CODECS)
+def test_iter_decompress__output_bounded_by_chunk_size(
+    flags: StoreFlags, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Arrange
+    monkeypatch.setattr(compression, "STREAM_CHUNK_SIZE", 64)
+    data = b"entry " * 1000
+    compressed = bytes(compress(data, flags, level=1))
+    chunks = [
+        compressed[offset : offset + 7] for offset in range(0, len(compressed), 7)
+    ]
+
+    # Act
+    result = list(iter_decompress(chunks, flags))
+
+    # Assert
+    assert b"".join(result) == data
+    assert max(len(piece) for piece in result) <= 64
+
+
+@pytest.mark.parametrize("flags", CODECS)
+@pytest.mark.parametrize("damage", [lambda data: data[:-3], lambda data: data + b"x"])
+def test_iter_decompress__damaged_content(flags: StoreFlags, damage) -> None:
+    # Arrange
+    compressed = damage(bytes(compress(b"entry " * 100, flags)))
+
+    # Act\Assert
+    with pytest.raises(ValueError):
+        list(iter_decompress([compressed], flags))
@@ -1,15 +1,29 @@
-import hashlib
+import asyncio
 from pathlib import Path
 
+import pytest
+
+from bergmann.common.entry_stream import EntryStream
 from bergmann.convention import (
     CONTENT_HASH_SIZE,
     DB_ALG_BYTES,
+    DB_FLAGS,
+    DB_FLAGS_SIZE,
     DB_ITERATIONS_BYTES,
     DB_MAGIC_BYTES,
+    DB_MAX_ITERATIONS,
+    DB_MIN_ITERATIONS,
     DB_SALT_SIZE,
+    JOURNAL_COMMIT_SIZE,
+    JOURNAL_FRAME_LENGTH_SIZE,
+    StoreFlags,
 )
 from bergmann.di import di
 from bergmann.entities.item import Item
+from bergmann.entities.store import record_digest
+from bergmann.interactor import Interactor
+from bergmann.merkle_tree import merkle_root
+from bergmann.passwords_model import PasswordsModel
 
 
 def test_init_new_store(tmp_path: Path) -> None:
@@ -34,16 +48,31 @@ def test_init_new_store(tmp_path: Path) -> None:
     offset += DB_SALT_SIZE
     iteration_bytes = db_bytes[offset : offset + len(DB_ITERATIONS_BYTES)]
     offset += len(DB_ITERATIONS_BYTES)
+    flags_bytes = db_bytes[offset : offset + DB_FLAGS_SIZE]
+    offset += DB_FLAGS_SIZE
     content_hash = db_bytes[offset : offset + CONTENT_HASH_SIZE]
     assert magic_bytes == DB_MAGIC_BYTES
     assert alg_bytes == DB_ALG_BYTES
     assert salt_bytes == cypher_impl.key_meta.salt
-    assert iteration_bytes == DB_ITERATIONS_BYTES
+    iterations = int.from_bytes(iteration_bytes)
+    assert iterations == cypher_impl.key_meta.iterations
+    assert DB_MIN_ITERATIONS <= iterations <= DB_MAX_ITERATIONS
+    assert StoreFlags(int.from_bytes(flags_bytes)) == DB_FLAGS
 
     offset += CONTENT_HASH_SIZE
+    journal_size = int.from_bytes(db_bytes[offset : offset + JOURNAL_FRAME_LENGTH_SIZE])
+    assert journal_size == 0
+    offset += JOURNAL_COMMIT_SIZE
+    snapshot_size = int.from_bytes(
+        db_bytes[offset : offset + JOURNAL_FRAME_LENGTH_SIZE]
+    )
+    offset += JOURNAL_FRAME_LENGTH_SIZE
     content_bytes = db_bytes[offset:]
+    assert len(content_bytes) == snapshot_size
     decrypted_content = cypher_impl.decrypt(content_bytes)
-    expected_content_hash = hashlib.sha256(decrypted_content).digest()
+    entries_stream = EntryStream()
+    entries = entries_stream.feed(decrypted_content) + entries_stream.close()
+    expected_content_hash = merkle_root([record_digest(entry) for entry in entries])
     assert content_hash == expected_content_hash
 
 
@@ -79,3 +108,67 @@ def test_update(tmp_path: Path) -> None:
     # assert
     loaded_items = sut.load_existent_store(db_path, "test-password")
     assert len(loaded_items) == 2
+
+
+def test_load_existent_store_async(tmp_path: Path) -> None:
+    # Arrange
+    db_path = tmp_path / "new.bmn"
+    sut = di.gateway
+    items = sut.init_new_store(db_path, "test-password")
+
+    # Act
+    result = asyncio.run(sut.load_existent_store_async(db_path, "test-password"))
+
+    # Assert
+    assert result == items
+
+
+def test_load_existent_store_async__cancelled(tmp_path: Path) -> None:
+    # Arrange
+    db_path = tmp_path / "new.bmn"
+    sut = di.gateway
+    sut.init_new_store(db_path, "test-password")
+    sut.clean()
+
+    async def cancel_unlock() -> None:
+        task = asyncio.create_task(
+            sut.load_existent_store_async(db_path, "test-password")
+        )
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await task
+
+    # Act
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(cancel_unlock())
+
+    # Assert
+    with pytest.raises(ValueError):
+        di.passwords_interactor.store  # noqa
+
+
+def test_delete_item__coalesced_until_flush(tmp_path: Path) -> None:
+    # Arrange
+    db_path = tmp_path / "new.bmn"
+    sut = Interactor(
+        files_helper=di.files_helper,
+        passwords_model=PasswordsModel(),
+        write_debounce=60.0,
+    )
+    initial_items = sut.init_new_store(db_path, "test-password")
+    items = [Item(f"site {index}", "login", "password") for index in range(20)]
+    for item in items:
+        sut.add_item(db_path, item)
+    sut.flush()
+    size_with_items = db_path.stat().st_size
+
+    # Act
+    for item in items:
+        sut.delete_item(db_path, item.id)
+    size_before_flush = db_path.stat().st_size
+    sut.flush()
+
+    # Assert
+    assert size_before_flush == size_with_items
+    loaded_items = sut.load_existent_store(db_path, "test-password")
+    assert loaded_items == initial_items
@@ -0,0 +1,24 @@
+import pytest
+
+from bergmann.common.exceptions import IntegrityError
+from bergmann.journal import frame_prefix, iter_frames
+
+
+def test_iter_frames__bodies_in_order() -> None:
+    # Arrange
+    data = frame_prefix(3) + b"abc" + frame_prefix(0) + frame_prefix(2) + b"de"
+
+    # Act
+    result = [body.tobytes() for body in iter_frames(memoryview(data))]
+
+    # Assert
+    assert result == [b"abc", b"", b"de"]
+
+
+def test_iter_frames__truncated_last_frame_fails() -> None:
+    # Arrange
+    data = frame_prefix(3) + b"abc" + frame_prefix(5) + b"de"
+
+    # Act\Assert
+    with pytest.raises(IntegrityError):
+        list(iter_frames(memoryview(data)))
@@ -0,0 +1,42 @@
+import pytest
+
+from bergmann import kdf_calibration
+from bergmann.convention import DB_MAX_ITERATIONS, DB_MIN_ITERATIONS
+from bergmann.kdf_calibration import calibrate_iterations
+
+
+@pytest.fixture(autouse=True)
+def clear_calibration_cache() -> None:
+    calibrate_iterations.cache_clear()
+
+
+@pytest.mark.parametrize(
+    ("throughput", "expected"),
+    [
+        (1_000_000.0, 250_000),
+        (1_234_567.0, 308_000),
+        (1_000.0, DB_MIN_ITERATIONS),
+        (1e12, DB_MAX_ITERATIONS),
+    ],
+)
+def test_calibrate_iterations(
+    monkeypatch: pytest.MonkeyPatch, throughput: float, expected: int
+) -> None:
+    # Arrange
+    monkeypatch.setattr(
+        kdf_calibration, "measure_pbkdf2_throughput", lambda *_: throughput
+    )
+
+    # Act
+    result = calibrate_iterations(target_latency=0.25)
+
+    # Assert
+    assert result == expected
+
+
+def test_measure_pbkdf2_throughput() -> None:
+    # Act
+    result = kdf_calibration.measure_pbkdf2_throughput(probe_iterations=1_000)
+
+    # Assert
+    assert result > 0
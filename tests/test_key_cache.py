@@ -0,0 +1,94 @@
+from pathlib import Path
+
+import pytest
+
+from bergmann.key import Key, KeyMeta
+from bergmann.key_cache import KeyCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def sut(clock: FakeClock) -> KeyCache:
+    return KeyCache(ttl=60, clock=clock)
+
+
+@pytest.fixture
+def key() -> Key:
+    return Key(b"k" * 32, KeyMeta(salt=b"s" * 16, iterations=1000))
+
+
+def test_get__cached_key(sut: KeyCache, key: Key, tmp_path: Path) -> None:
+    # Arrange
+    sut.put(tmp_path / "db.bmn", key, KeyCache.verifier(key, "test-password"))
+
+    # Act
+    result = sut.get(tmp_path / "db.bmn", key.meta, "test-password")
+
+    # Assert
+    assert result is not None
+    assert result.binary == key.binary
+
+
+def test_get__other_password(sut: KeyCache, key: Key, tmp_path: Path) -> None:
+    # Arrange
+    sut.put(tmp_path / "db.bmn", key, KeyCache.verifier(key, "test-password"))
+
+    # Act
+    result = sut.get(tmp_path / "db.bmn", key.meta, "other-password")
+
+    # Assert
+    assert result is None
+
+
+def test_get__other_key_meta(sut: KeyCache, key: Key, tmp_path: Path) -> None:
+    # Arrange
+    sut.put(tmp_path / "db.bmn", key, KeyCache.verifier(key, "test-password"))
+    other_meta = KeyMeta(salt=b"o" * 16, iterations=1000)
+
+    # Act
+    result = sut.get(tmp_path / "db.bmn", other_meta, "test-password")
+
+    # Assert
+    assert result is None
+
+
+def test_get__idle_ttl_expired(
+    sut: KeyCache, key: Key, clock: FakeClock, tmp_path: Path
+) -> None:
+    # Arrange
+    sut.put(tmp_path / "db.bmn", key, KeyCache.verifier(key, "test-password"))
+    clock.now = 59
+    assert sut.get(tmp_path / "db.bmn", key.meta, "test-password") is not None
+    clock.now = 59 + 60
+
+    # Act
+    result = sut.get(tmp_path / "db.bmn", key.meta, "test-password")
+
+    # Assert
+    assert result is None
+    assert len(sut) == 0
+
+
+def test_evict__key_material_zeroed(sut: KeyCache, key: Key, tmp_path: Path) -> None:
+    # Arrange
+    sut.put(tmp_path / "db.bmn", key, KeyCache.verifier(key, "test-password"))
+    (entry,) = sut._entries.values()
+
+    # Act
+    sut.evict(tmp_path / "db.bmn")
+
+    # Assert
+    assert len(sut) == 0
+    assert entry.key_bytes == bytes(32)
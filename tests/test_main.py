@@ -0,0 +1,136 @@
+import argparse
+import subprocess
+import sys
+
+import pytest
+
+from bergmann.convention import StoreFlags
+from bergmann.main import parse_compression, parse_key_cache_ttl
+
+# What the welcome screen needs: the entry point and the app with its first
+# screen. Milliseconds of imports, best of a few fresh interpreters.
+FIRST_FRAME_MODULES = ("bergmann.main", "bergmann.ui.app")
+FIRST_FRAME_IMPORT_BUDGET_MS = 400
+RUNS = 3
+# Loaded on first use only, not before the first frame.
+LAZY_MODULES = (
+    "bergmann.ui.widgets.passwords_modal.passwords_explorer",
+    "bergmann.ui.widgets.passwords_modal.load_db_modal",
+    "bergmann.ui.widgets.passwords_modal.initialize_new_db_modal",
+    "bergmann.ui.widgets.select_file_modal.select_file_modal",
+    "bergmann.common.logger",
+    "bergmann.crypto.kuzctrcypher",
+    "bergmann.crypto.kuznyechik",
+    "grassnechik",
+    "pyperclip",
+    "markdown_it",
+    "multiprocessing",
+)
+# A decrypt run by the numpy Kuznyechik loads none of the pure Python one.
+NUMPY_DECRYPT_SCRIPT = """
+import os, sys
+from bergmann.crypto.kuzcypher import KuzCypher, default_block_cypher_factory
+from bergmann.key import Key, KeyMeta
+
+cypher = KuzCypher.from_key(Key(os.urandom(32), KeyMeta(os.urandom(16), 100_000)))
+assert cypher.decrypt(cypher.encrypt("text")) == b"text"
+print(default_block_cypher_factory().__name__)
+print(*sys.modules)
+"""
+NUMPY_DECRYPT_UNLOADED_MODULES = ("bergmann.crypto.kuznyechik", "grassnechik")
+
+
+def _import_times() -> dict[str, int]:
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            f"import {','.join(FIRST_FRAME_MODULES)}",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # "import time: self [us] | cumulative | imported package", nested
+    # imports are indented under the one that triggered them.
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, module = line.split("|")
+        if cumulative.strip().isdigit():
+            times[module.strip()] = int(cumulative)
+    return times
+
+
+def test_first_frame_imports__within_budget() -> None:
+    # Act
+    runs = [_import_times() for _ in range(RUNS)]
+
+    # Assert
+    elapsed_ms = min(
+        sum(times[module] for module in FIRST_FRAME_MODULES) / 1000 for times in runs
+    )
+    assert elapsed_ms < FIRST_FRAME_IMPORT_BUDGET_MS
+    assert not set(LAZY_MODULES) & set(runs[0])
+
+
+def test_numpy_decrypt__fallback_not_imported() -> None:
+    # Arrange
+    pytest.importorskip("numpy")
+
+    # Act
+    result = subprocess.run(
+        [sys.executable, "-c", NUMPY_DECRYPT_SCRIPT],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    # Assert
+    factory, modules = result.stdout.splitlines()
+    assert factory == "NumpyKuznyechik"
+    assert not set(NUMPY_DECRYPT_UNLOADED_MODULES) & set(modules.split())
+
+
+def test_parse_key_cache_ttl() -> None:
+    # Act
+    result = parse_key_cache_ttl(["bergmann", "--key-cache-ttl=90.5"])
+
+    # Assert
+    assert result == 90.5
+    assert parse_key_cache_ttl(["bergmann"]) is None
+
+
+@pytest.mark.parametrize("value", ["", "soon", "-1", "nan", "inf", "-inf"])
+def test_parse_key_cache_ttl__invalid(value: str) -> None:
+    # Act\Assert
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_key_cache_ttl([f"--key-cache-ttl={value}"])
+
+
+@pytest.mark.parametrize(
+    ("option", "expected"),
+    [
+        ("--compression=zlib", (StoreFlags.ZLIB_COMPRESSED, None)),
+        ("--compression=zlib:-1", (StoreFlags.ZLIB_COMPRESSED, -1)),
+        ("--compression=lzma:9", (StoreFlags.LZMA_COMPRESSED, 9)),
+    ],
+)
+def test_parse_compression(option: str, expected: tuple[StoreFlags, int]) -> None:
+    # Act
+    result = parse_compression(["bergmann", option])
+
+    # Assert
+    assert result == expected
+
+
+@pytest.mark.parametrize(
+    "value", ["", "gzip", "zlib:", "zlib:fast", "zlib:10", "lzma:-1", "lzma:1.5"]
+)
+def test_parse_compression__invalid(value: str) -> None:
+    # Act\Assert
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_compression([f"--compression={value}"])
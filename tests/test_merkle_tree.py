@@ -0,0 +1,48 @@
+import hashlib
+
+from bergmann.merkle_tree import EMPTY_ROOT, MerkleTree, leaf_digest, merkle_root
+
+
+def _leaves(count: int) -> list[bytes]:
+    return [leaf_digest(str(index).encode()) for index in range(count)]
+
+
+def test_root__empty_tree() -> None:
+    # Act\Assert
+    assert MerkleTree().root == EMPTY_ROOT == hashlib.sha256(b"").digest()
+
+
+def test_append__same_root_as_rebuilt_tree() -> None:
+    # Arrange
+    leaves = _leaves(13)
+    sut = MerkleTree()
+    roots = []
+
+    # Act
+    for leaf in leaves:
+        sut.append(leaf)
+        roots.append(sut.root)
+
+    # Assert
+    assert roots == [merkle_root(leaves[: count + 1]) for count in range(13)]
+
+
+def test_replace_and_pop__same_root_as_rebuilt_tree() -> None:
+    # Arrange
+    leaves = _leaves(9)
+    sut = MerkleTree(leaves)
+    replacement = leaf_digest(b"replacement")
+
+    # Act
+    sut.replace(4, replacement)
+    replaced_root = sut.root
+    sut.pop(0)
+    sut.pop(3)
+
+    # Assert
+    leaves[4] = replacement
+    assert replaced_root == merkle_root(leaves)
+    del leaves[0]
+    del leaves[3]
+    assert sut.root == merkle_root(leaves)
+    assert list(sut.leaves) == leaves
@@ -1,16 +1,37 @@
+import hashlib
+import json
+import tracemalloc
 from pathlib import Path
 
 import pytest
 
+from bergmann import journal, passwords_model
 from bergmann.common.exceptions import IntegrityError, InvalidHeader
 from bergmann.convention import (
     DB_ALG_BYTES,
+    DB_FLAGGED_MAGIC_BYTES,
+    DB_FLAGS,
+    DB_FLAGS_SIZE,
     DB_ITERATIONS_BYTES,
+    DB_LEGACY_MAGIC_BYTES,
     DB_MAGIC_BYTES,
     DB_SALT_SIZE,
+    INDEX_LOCATOR_SIZE,
+    JOURNAL_COMMIT_SIZE,
+    JOURNAL_FRAME_LENGTH_SIZE,
+    KUZ_ECB_ALG_BYTES,
+    StoreFlags,
 )
+from bergmann.crypto import kuzctrcypher, kuzcypher
+from bergmann.crypto.factory import build_cypher
+from bergmann.entities.item import Item
+from bergmann.entities.journal_record import JournalRecord
 from bergmann.entities.store import Store
+from bergmann.entities.store_meta import StoreMeta
+from bergmann.key import KeyMeta
+from bergmann.key_cache import KeyCache
 from bergmann.passwords_model import PasswordsModel
+from bergmann.tracing import Tracer
 
 
 @pytest.fixture
@@ -198,9 +219,55 @@ def test_decrypt_store__no_key_initialized(sut: PasswordsModel, tmp_path: Path)
         sut.decrypt_store(tmp_path / "new.bmn")
 
 
-def test_decrypt_store__integrity_error(sut: PasswordsModel, tmp_path: Path) -> None:
+def test_decrypt_store__binary_records_hashed_as_read(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Arrange
+    path = tmp_path / "new.bmn"
+    sut = PasswordsModel()
+    sut.initialize_new_store()
+    sut.initialize_key_for_new_db("test-key")
+    sut.flush_encrypted_store(path)
+    expected = sut.store.items_hash()
+
+    def encode_again(entry: object) -> bytes:
+        raise AssertionError("entry encoded again")
+
+    monkeypatch.setattr(passwords_model, "entry_digest", encode_again)
+    monkeypatch.setattr(passwords_model, "entry_payload", encode_again)
+
+    # Act
+    sut.decrypt_store(path)
+
+    # Assert
+    assert sut.store.items_hash() == expected
+
+
+def test_decrypt_store__json_journal_rewritten_as_binary(tmp_path: Path) -> None:
+    # Arrange
+    path = tmp_path / "new.bmn"
+    sut = PasswordsModel(store_flags=StoreFlags.JOURNAL)
+    sut.initialize_new_store()
+    sut.initialize_key_for_new_db("test-key")
+    sut.flush_encrypted_store(path)
+    sut.decrypt_store(path)
+    sut.add_item(path, Item("added", "login", "password"))
+
+    # Act
+    sut.flush_encrypted_store(path)
+    sut.decrypt_store(path)
+
+    # Assert
+    assert sut.read_header(path).flags == DB_FLAGS
+    assert [item.description for item in sut.get_items()][-1] == "added"
+
+
+# A journaled store takes a trailing partial frame for a torn append, see
+# test_decrypt_store__torn_journal_append_dropped.
+def test_decrypt_store__integrity_error(tmp_path: Path) -> None:
     # Arrange
     path = tmp_path / "new.bmn"
+    sut = PasswordsModel(store_flags=StoreFlags.BINARY_ENTRIES)
     sut.initialize_new_store()
     sut.initialize_key_for_new_db("test-key")
     sut.flush_encrypted_store(path)
@@ -228,3 +295,642 @@ def test_initialize_key(sut: PasswordsModel, tmp_path: Path) -> None:
     # Assert
     assert sut.cypher_impl.key_meta == initialized_key_meta
     assert id(sut.cypher_impl.key_meta) != id(initialized_key_meta)
+
+
+def test_decrypt_store__legacy_ecb_store(sut: PasswordsModel, tmp_path: Path) -> None:
+    # Arrange
+    path = tmp_path / "legacy.bmn"
+    item = Item.example()
+    sut.store = Store(
+        meta=StoreMeta(salt=b"s" * DB_SALT_SIZE, algorithm=KUZ_ECB_ALG_BYTES),
+        items=[item],
+    )
+    sut.initialize_key_for_new_db("test-key")
+    sut.flush_encrypted_store(path)
+    sut.clean()
+
+    # Act
+    sut.initialize_key(path, master_password="test-key")
+    sut.decrypt_store(path)
+
+    # Assert
+    assert sut.read_header(path).alg_bytes == KUZ_ECB_ALG_BYTES
+    assert sut.store.algorithm == KUZ_ECB_ALG_BYTES
+    assert sut.get_items() == [item]
+
+
+def test_initialize_key__cached_key_reused(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Arrange
+    path = tmp_path / "new.bmn"
+    sut = PasswordsModel(key_cache=KeyCache(ttl=60))
+    sut.initialize_new_store()
+    sut.initialize_key_for_new_db("test-key")
+    sut.flush_encrypted_store(path)
+    sut.clean()
+
+    def fail_derive_key(*args: object) -> None:
+        raise AssertionError("key derived again")
+
+    monkeypatch.setattr(passwords_model, "derive_key", fail_derive_key)
+
+    # Act
+    sut.initialize_key(path, master_password="test-key")
+    sut.decrypt_store(path)
+
+    # Assert
+    assert sut.get_items()
+
+
+def test_decrypt_store__stored_iterations_honoured(tmp_path: Path) -> None:
+    # Arrange
+    path = tmp_path / "new.bmn"
+    sut = PasswordsModel(iterations_provider=lambda: 123_000)
+    sut.initialize_new_store()
+    sut.initialize_key_for_new_db("test-key")
+    sut.flush_encrypted_store(path)
+    sut.clean()
+
+    # Act
+    sut.initialize_key(path, master_password="test-key")
+    sut.decrypt_store(path)
+
+    # Assert
+    assert sut.cypher_impl.key_meta.iterations == 123_000
+    assert sut.store.key_meta.iterations == 123_000
+    assert sut.read_header(path).iterations_bytes == (123_000).to_bytes(length=4)
+
+
+def test_read_header__iterations_below_bounds(
+    sut: PasswordsModel, tmp_path: Path
+) -> None:
+    # Arrange
+    db_path = tmp_path / "new.bmn"
+    db_path.write_bytes(
+        b"".join(
+            (
+                DB_MAGIC_BYTES,
+                DB_ALG_BYTES,
+                b"s" * DB_SALT_SIZE,
+                (1_000).to_bytes(length=4),
+                b"h" * 32,
+            )
+        )
+    )
+
+    # Act\Assert
+    with pytest.raises(InvalidHeader) as e:
+        sut.read_header(db_path)
+
+    assert e.value.reason == "iterations"
+
+
+def test_read_header__unknown_flag(sut: PasswordsModel, tmp_path: Path) -> None:
+    # Arrange
+    db_path = tmp_path / "new.bmn"
+    db_path.write_bytes(
+        b"".join(
+            (
+                DB_MAGIC_BYTES,
+                DB_ALG_BYTES,
+                b"s" * DB_SALT_SIZE,
+                DB_ITERATIONS_BYTES,
+                (DB_FLAGS | 1 << 10).to_bytes(DB_FLAGS_SIZE),
+                b"h" * 32,
+            )
+        )
+    )
+
+    # Act\Assert
+    with pytest.raises(InvalidHeader) as e:
+        sut.read_header(db_path)
+
+    assert e.value.reason == "flags"
+
+
+def test_read_store_file__single_open(
+    sut: PasswordsModel, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Arrange
+    path = tmp_path / "new.bmn"
+    sut.initialize_new_store()
+    sut.initialize_key_for_new_db(master_password="test-key")
+    sut.flush_encrypted_store(path)
+    sut.clean()
+    opened: list[Path] = []
+    original_open = Path.open
+
+    def counting_open(self: Path, *args, **kwargs):  # noqa: ANN002, ANN003, ANN202
+        opened.append(self)
+        return original_open(self, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "open", counting_open)
+
+    # Act
+    store_file = sut.read_store_file(path)
+    sut.initialize_key_for_file(store_file, "test-key")
+    sut.decrypt_store_file(store_file)
+
+    # Assert
+    assert opened == [path]
+    assert store_file.key_meta == sut.store.key_meta
+    assert sut.store.items
+
+
+def test_decrypt_store__memory_bounded_by_chunk(
+    sut: PasswordsModel, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Arrange
+    path = tmp_path / "new.bmn"
+    sut.initialize_new_store()
+    sut.initialize_key_for_new_db(master_password="test-key")
+    sut.update_items([Item("note", "login", "x" * 100_000) for _ in range(20)])
+    sut.flush_encrypted_store(path)
+    content_size = path.stat().st_size
+    monkeypatch.setattr(kuzcypher, "STREAM_CHUNK_SIZE", 1 << 16)
+    monkeypatch.setattr(kuzctrcypher, "SEGMENT_SIZE", 1 << 16)
+    tracemalloc.start()
+
+    # Act
+    try:
+        sut.decrypt_store(path)
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # Assert
+    assert len(sut.store.items) == 20
+    assert peak - retained < content_size // 4
+
+
+def test_add_replace_delete_item__replayed_from_journal(
+    sut: PasswordsModel, tmp_path: Path
+) -> None:
+    # Arrange
+    path = tmp_path / "new.bmn"
+    sut.initialize_new_store()
+    sut.initialize_key_for_new_db("test-key")
+    sut.flush_encrypted_store(path)
+    snapshot_file_size = path.stat().st_size
+    example = sut.get_items()[0]
+    added = Item("added", "login", "password")
+    replacement = Item("replaced", "login", "password", id=example.id)
+
+    # Act
+    sut.add_item(path, added)
+    sut.replace_item(path, replacement)
+    sut.delete_item(path, added.id)
+    sut.clean()
+    sut.initialize_key(path, "test-key")
+    sut.decrypt_store(path)
+
+    # Assert
+    assert path.stat().st_size > snapshot_file_size
+    assert sut.get_items() == [replacement]
+
+
+# A crash between writing the frames and committing them leaves the commit
+# of the previous append, followed by any part of the new frames.
+@pytest.mark.parametrize("cut", [1, JOURNAL_FRAME_LENGTH_SIZE, 5, 17, -1])
+def test_decrypt_store__uncommitted_journal_append_dropped(
+    sut: PasswordsModel, tmp_path: Path, cut: int
+) -> None:
+    # Arrange
+    path = tmp_path / "new.bmn"
+    sut.initialize_new_store()
+    sut.initialize_key_for_new_db("test-key")
+    sut.flush_encrypted_store(path)
+    sut.add_item(path, Item("committed", "login", "password"))
+    descriptions = [item.description for item in sut.get_items()]
+    before_append = path.read_bytes()
+    sut.add_item(path, Item("torn", "login", "password"))
+    appended = path.read_bytes()[len(before_append) :]
+    path.write_bytes(before_append + appended[: cut % (len(appended) + 1)])
+
+    # Act
+    sut.clean()
+    sut.initialize_key(path, "test-key")
+    sut.decrypt_store(path)
+    sut.add_item(path, Item("next", "login", "password"))
+    sut.clean()
+    sut.initialize_key(path, "test-key")
+    sut.decrypt_store(path)
+
+    # Assert
+    assert [item.description for item in sut.get_items()] == [*descriptions, "next"]
+
+
+def test_decrypt_store__journal_cut_at_frame_boundary_fails(
+    sut: PasswordsModel, tmp_path: Path
+) -> None:
+    # Arrange
+    path = tmp_path / "new.bmn"
+    sut.initialize_new_store()
+    sut.initialize_key_for_new_db("test-key")
+    sut.flush_encrypted_store(path)
+    sut.add_item(path, Item("first", "login", "password"))
+    size_after_first = path.stat().st_size
+    sut.add_item(path, Item("second", "login", "password"))
+    with path.open("r+b") as file:
+        file.truncate(size_after_first)
+    sut.clean()
+    sut.initialize_key(path, "test-key")
+
+    # Act\Assert
+    with pytest.raises(IntegrityError):
+        sut.decrypt_store(path)
+
+
+def test_decrypt_store__journal_frame_of_other_store_fails(
+    sut: PasswordsModel, tmp_path: Path
+) -> None:
+    # Arrange
+    path = tmp_path / "new.bmn"
+    other_path = tmp_path / "other.bmn"
+    sut.initialize_new_store()
+    sut.initialize_key_for_new_db("test-key")
+    sut.flush_encrypted_store(path)
+    header_size = sut.read_header(path).bytes_size_on_disk
+    sut.store.add_item(Item("other", "login", "password"))
+    sut.flush_encrypted_store(other_path)
+    other_size = other_path.stat().st_size
+    sut.add_item(other_path, Item("spliced", "login", "password"))
+    other = other_path.read_bytes()
+    commit = other[header_size : header_size + JOURNAL_COMMIT_SIZE]
+    data = bytearray(path.read_bytes() + other[other_size:])
+    data[header_size : header_size + JOURNAL_COMMIT_SIZE] = commit
+    path.write_bytes(data)
+    sut.clean()
+    sut.initialize_key(path, "test-key")
+
+    # Act\Assert
+    with pytest.raises(IntegrityError):
+        sut.decrypt_store(path)
+
+
+def test_decrypt_store__damaged_journal_frame_before_last_fails(
+    sut: PasswordsModel, tmp_path: Path
+) -> None:
+    # Arrange
+    path = tmp_path / "new.bmn"
+    sut.initialize_new_store()
+    sut.initialize_key_for_new_db("test-key")
+    sut.flush_encrypted_store(path)
+    size_before_append = path.stat().st_size
+    sut.add_item(path, Item("first", "login", "password"))
+    sut.add_item(path, Item("second", "login", "password"))
+    data = bytearray(path.read_bytes())
+    data[size_before_append + JOURNAL_FRAME_LENGTH_SIZE] ^= 1
+    path.write_bytes(data)
+    sut.clean()
+    sut.initialize_key(path, "test-key")
+
+    # Act\Assert
+    with pytest.raises(IntegrityError):
+        sut.decrypt_store(path)
+
+
+def test_decrypt_store__malformed_journal_record_fails(
+    sut: PasswordsModel, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Arrange
+    path = tmp_path / "new.bmn"
+    sut.initialize_new_store()
+    sut.initialize_key_for_new_db("test-key")
+    sut.flush_encrypted_store(path)
+    monkeypatch.setattr(JournalRecord, "as_bytes", lambda self: b'["add", []]')
+    sut.add_item(path, Item("added", "login", "password"))
+    sut.clean()
+    sut.initialize_key(path, "test-key")
+
+    # Act\Assert
+    with pytest.raises(IntegrityError):
+        sut.decrypt_store(path)
+
+
+def test_add_item__journal_compacted_past_threshold(
+    sut: PasswordsModel, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Arrange
+    path = tmp_path / "new.bmn"
+    sut.initialize_new_store()
+    sut.initialize_key_for_new_db("test-key")
+    sut.flush_encrypted_store(path)
+    monkeypatch.setattr(journal, "JOURNAL_COMPACTION_MIN_SIZE", 0)
+    monkeypatch.setattr(journal, "JOURNAL_COMPACTION_RATIO", 0.0)
+
+    # Act
+    sut.add_item(path, Item("added", "login", "password"))
+
+    # Assert
+    header_size = sut.read_header(path).bytes_size_on_disk
+    snapshot_offset = header_size + JOURNAL_COMMIT_SIZE
+    snapshot_size = int.from_bytes(
+        path.read_bytes()[snapshot_offset : snapshot_offset + JOURNAL_FRAME_LENGTH_SIZE]
+    )
+    assert path.stat().st_size == (
+        snapshot_offset + JOURNAL_FRAME_LENGTH_SIZE + snapshot_size
+    )
+    assert len(sut.get_items()) == 2
+
+
+def test_add_item__legacy_store_rewritten_as_journal(
+    sut: PasswordsModel, tmp_path: Path
+) -> None:
+    # Arrange
+    path = tmp_path / "legacy.bmn"
+    salt = b"s" * DB_SALT_SIZE
+    content = json.dumps([Item.example().as_tuple()]).encode("utf8")
+    cypher = build_cypher(DB_ALG_BYTES, "test-key", KeyMeta(salt, 150_000))
+    path.write_bytes(
+        b"".join(
+            (
+                DB_LEGACY_MAGIC_BYTES,
+                DB_ALG_BYTES,
+                salt,
+                DB_ITERATIONS_BYTES,
+                hashlib.sha256(content).digest(),
+                cypher.encrypt(content.decode("utf8")),
+            )
+        )
+    )
+    sut.initialize_key(path, "test-key")
+    sut.decrypt_store(path)
+
+    # Act
+    sut.add_item(path, Item("added", "login", "password"))
+
+    # Assert
+    header = sut.read_header(path)
+    assert not header.is_legacy
+    assert header.flags & StoreFlags.JOURNAL
+    sut.clean()
+    sut.initialize_key(path, "test-key")
+    sut.decrypt_store(path)
+    assert [item.description for item in sut.get_items()][1:] == ["added"]
+
+
+def test_decrypt_store__field_encrypted_passwords_stay_sealed(
+    tmp_path: Path,
+) -> None:
+    # Arrange
+    path = tmp_path / "new.bmn"
+    sut = PasswordsModel(store_flags=DB_FLAGS | StoreFlags.FIELD_ENCRYPTED)
+    sut.initialize_new_store()
+    example = sut.get_items()[0]
+    sut.initialize_key_for_new_db("test-key")
+    sut.flush_encrypted_store(path)
+    added = Item("added", "login", "added password")
+    sut.add_item(path, added)
+    sut.clean()
+
+    # Act
+    sut.initialize_key(path, "test-key")
+    sut.decrypt_store(path)
+
+    # Assert
+    assert sut.read_header(path).flags & StoreFlags.FIELD_ENCRYPTED
+    items = sut.get_items()
+    assert [(item.description, item.login, item.password) for item in items] == [
+        (example.description, example.login, ""),
+        (added.description, added.login, ""),
+    ]
+    assert sut.reveal_password(items[0]) == example.password
+    assert sut.reveal_password(items[1]) == added.password
+
+
+def test_decrypt_store__field_encrypted_tampered(tmp_path: Path) -> None:
+    # Arrange
+    path = tmp_path / "new.bmn"
+    sut = PasswordsModel(store_flags=DB_FLAGS | StoreFlags.FIELD_ENCRYPTED)
+    sut.initialize_new_store()
+    sut.initialize_key_for_new_db("test-key")
+    sut.flush_encrypted_store(path)
+    content = bytearray(path.read_bytes())
+    content[-5] = ord("0") if content[-5] != ord("0") else ord("1")
+    path.write_bytes(content)
+    sut.clean()
+    sut.initialize_key(path, "test-key")
+
+    # Act\Assert
+    with pytest.raises(IntegrityError):
+        sut.decrypt_store(path)
+
+
+def test_add_replace_delete_item__indexed_store_reloaded(tmp_path: Path) -> None:
+    # Arrange
+    path = tmp_path / "new.bmn"
+    sut = PasswordsModel(store_flags=StoreFlags.INDEXED)
+    sut.initialize_new_store()
+    sut.initialize_key_for_new_db("test-key")
+    sut.flush_encrypted_store(path)
+    example = sut.get_items()[0]
+    added = Item("added", "login", "password")
+    replacement = Item("replaced", "login", "password", id=example.id)
+
+    # Act
+    sut.add_item(path, added)
+    sut.replace_item(path, replacement)
+    sut.delete_item(path, added.id)
+    sut.clean()
+    sut.initialize_key(path, "test-key")
+    sut.decrypt_store(path)
+
+    # Assert
+    assert sut.read_header(path).flags == StoreFlags.INDEXED
+    assert sut.get_items() == [replacement]
+
+
+def test_replace_item__indexed_records_kept_until_switched(tmp_path: Path) -> None:
+    # Arrange
+    path = tmp_path / "new.bmn"
+    sut = PasswordsModel(store_flags=StoreFlags.INDEXED)
+    sut.initialize_new_store()
+    sut.initialize_key_for_new_db("test-key")
+    sut.flush_encrypted_store(path)
+    example = sut.get_items()[0]
+    before = path.read_bytes()
+    header_size = sut.read_header(path).bytes_size_on_disk
+    locator_end = header_size + INDEX_LOCATOR_SIZE
+
+    # Act
+    sut.replace_item(path, Item("other", example.login, "pass", id=example.id))
+
+    # Assert
+    after = path.read_bytes()
+    assert after[locator_end : len(before)] == before[locator_end:]
+    index_offset = int.from_bytes(after[header_size : header_size + 8])
+    assert index_offset > int.from_bytes(before[header_size : header_size + 8])
+    sut.clean()
+    sut.initialize_key(path, "test-key")
+    sut.decrypt_store(path)
+    assert [item.description for item in sut.get_items()] == ["other"]
+
+
+@pytest.mark.parametrize("change", ["add", "replace", "delete"])
+def test_update_indexed__crash_before_switch_keeps_previous_items(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, change: str
+) -> None:
+    # Arrange
+    path = tmp_path / "new.bmn"
+    sut = PasswordsModel(store_flags=StoreFlags.INDEXED)
+    sut.initialize_new_store()
+    sut.initialize_key_for_new_db("test-key")
+    sut.store.add_item(Item("second", "login", "password"))
+    sut.flush_encrypted_store(path)
+    expected = [item.description for item in sut.get_items()]
+    example = sut.get_items()[0]
+
+    def crash(*args: object) -> None:
+        raise OSError("crashed")
+
+    monkeypatch.setattr(PasswordsModel, "_switch_index", crash)
+
+    # Act
+    with pytest.raises(OSError):
+        if change == "add":
+            sut.add_item(path, Item("added", "login", "password"))
+        elif change == "replace":
+            sut.replace_item(path, Item("other", "login", "pass", id=example.id))
+        else:
+            sut.delete_item(path, example.id)
+    reloaded = PasswordsModel()
+    reloaded.initialize_key(path, "test-key")
+    reloaded.decrypt_store(path)
+
+    # Assert
+    assert [item.description for item in reloaded.get_items()] == expected
+
+
+def test_decrypt_store__indexed_record_tampered(tmp_path: Path) -> None:
+    # Arrange
+    path = tmp_path / "new.bmn"
+    sut = PasswordsModel(store_flags=StoreFlags.INDEXED)
+    sut.initialize_new_store()
+    sut.initialize_key_for_new_db("test-key")
+    sut.flush_encrypted_store(path)
+    example = sut.get_items()[0]
+    header_size = sut.read_header(path).bytes_size_on_disk
+    content = bytearray(path.read_bytes())
+    content[header_size + 16 + 10] ^= 1
+    path.write_bytes(content)
+    sut.clean()
+    sut.initialize_key(path, "test-key")
+
+    # Act\Assert
+    with pytest.raises(IntegrityError) as error:
+        sut.decrypt_store(path)
+    assert error.value.item_id == example.id
+
+
+def test_decrypt_store__flagged_store_without_merkle_root(
+    sut: PasswordsModel, tmp_path: Path
+) -> None:
+    # Arrange
+    path = tmp_path / "flagged.bmn"
+    salt = b"s" * DB_SALT_SIZE
+    item = Item.example()
+    content = json.dumps([item.as_entry()]).encode("utf8")
+    cypher = build_cypher(DB_ALG_BYTES, "test-key", KeyMeta(salt, 150_000))
+    path.write_bytes(
+        b"".join(
+            (
+                DB_FLAGGED_MAGIC_BYTES,
+                DB_ALG_BYTES,
+                salt,
+                DB_ITERATIONS_BYTES,
+                StoreFlags(0).to_bytes(DB_FLAGS_SIZE),
+                hashlib.sha256(content).digest(),
+                cypher.encrypt(content.decode("utf8")),
+            )
+        )
+    )
+    sut.initialize_key(path, "test-key")
+
+    # Act
+    sut.decrypt_store(path)
+
+    # Assert
+    assert sut.get_items() == [item]
+    assert sut.store.items_hash() != hashlib.sha256(content).digest()
+
+
+def test_flush_encrypted_store__json_entries_rewritten_binary(tmp_path: Path) -> None:
+    # Arrange
+    path = tmp_path / "new.bmn"
+    json_model = PasswordsModel(store_flags=StoreFlags.JOURNAL)
+    json_model.initialize_new_store()
+    json_model.initialize_key_for_new_db("test-key")
+    json_model.flush_encrypted_store(path)
+    items = json_model.get_items()
+    sut = PasswordsModel()
+    sut.initialize_key(path, "test-key")
+    sut.decrypt_store(path)
+
+    # Act
+    sut.flush_encrypted_store(path)
+
+    # Assert
+    assert sut.read_header(path).flags == DB_FLAGS
+    sut.clean()
+    sut.initialize_key(path, "test-key")
+    sut.decrypt_store(path)
+    assert sut.get_items() == items
+
+
+@pytest.mark.parametrize(
+    "compression", [StoreFlags.ZLIB_COMPRESSED, StoreFlags.LZMA_COMPRESSED]
+)
+def test_decrypt_store__compressed_snapshot(
+    compression: StoreFlags, tmp_path: Path
+) -> None:
+    # Arrange
+    path = tmp_path / "new.bmn"
+    sut = PasswordsModel(store_flags=DB_FLAGS | compression, compression_level=1)
+    sut.initialize_new_store()
+    sut.initialize_key_for_new_db("test-key")
+    sut.store.items = [Item(f"site {i}", "login", "password") for i in range(100)]
+    sut.flush_encrypted_store(path)
+    items = sut.get_items()
+    sut.clean()
+    sut.initialize_key(path, "test-key")
+
+    # Act
+    sut.decrypt_store(path)
+
+    # Assert
+    assert sut.read_header(path).flags == DB_FLAGS | compression
+    assert sut.get_items() == items
+    assert path.stat().st_size < len(sut.store.serialize_items())
+
+
+def test_decrypt_store__phases_traced(tmp_path: Path) -> None:
+    # Arrange
+    path = tmp_path / "new.bmn"
+    tracer = Tracer(enabled=True)
+    sut = PasswordsModel(tracer=tracer)
+    sut.initialize_new_store()
+    sut.initialize_key_for_new_db("test-key")
+    sut.flush_encrypted_store(path)
+    sut.clean()
+    tracer.clear()
+
+    # Act
+    with sut.read_store_file(path) as store_file:
+        sut.initialize_key_for_file(store_file, "test-key")
+        sut.decrypt_store_file(store_file)
+
+    # Assert
+    spans = {span.name: span for span in tracer.spans}
+    assert list(spans) == [
+        "model.read_header",
+        "model.derive_key",
+        "model.read_entries",
+        "model.verify",
+        "model.replay_journal",
+        "model.build_items",
+        "model.decrypt_store",
+    ]
+    assert {"decrypt_ms", "parse_ms"} <= set(spans["model.read_entries"].args)
+    assert spans["model.decrypt_store"].args == {"items": 1}
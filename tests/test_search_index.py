@@ -0,0 +1,110 @@
+import random
+
+from bergmann.entities.item import Item
+from bergmann.search_index import SearchIndex
+
+
+def _items() -> list[Item]:
+    return [
+        Item(description="GitHub work", login="alice@corp.com", password="1"),
+        Item(description="gitlab", login="bob", password="2"),
+        Item(description="bank", login="Alice", password="3"),
+        Item(description="mail", login="carol@mail.com", password="4"),
+    ]
+
+
+def _scan(items: list[Item], query: str) -> list[str]:
+    terms = query.casefold().split()
+    return [
+        item.id
+        for item in items
+        if all(term in f"{item.login}\n{item.description}".casefold() for term in terms)
+    ]
+
+
+def test_search__all_terms_in_login_or_description() -> None:
+    # Arrange
+    items = _items()
+    sut = SearchIndex(items)
+
+    # Act\Assert
+    assert sut.search("") == [item.id for item in items]
+    assert sut.search("ALICE") == [items[0].id, items[2].id]
+    assert sut.search("git alice") == [items[0].id]
+    assert sut.search("b") == [items[0].id, items[1].id, items[2].id]
+    assert sut.search(".com mail") == [items[3].id]
+    assert sut.search("github bob") == []
+
+
+def test_search__narrowing_and_widening_queries() -> None:
+    # Arrange
+    items = _items()
+    sut = SearchIndex(items)
+
+    # Act
+    results = [sut.search(query) for query in ("g", "gi", "git", "gitl", "git", "a")]
+
+    # Assert
+    assert results == [
+        _scan(items, query) for query in ("g", "gi", "git", "gitl", "git", "a")
+    ]
+
+
+def test_add_replace_remove__results_follow_changes() -> None:
+    # Arrange
+    items = _items()
+    sut = SearchIndex(items)
+    sut.search("git")
+    added = Item(description="gitea", login="dave", password="5")
+    replaced = Item(description="bank", login="bob", password="6", id=items[1].id)
+
+    # Act
+    sut.add(added)
+    sut.replace(replaced)
+    sut.remove(items[0].id)
+
+    # Assert
+    assert sut.search("git") == [added.id]
+    assert sut.search("bob") == [replaced.id]
+    assert sut.matches(added.id, "GIT dave")
+    assert not sut.matches(items[0].id, "")
+    assert len(sut) == 4
+
+
+def test_search__same_as_scan_after_random_changes() -> None:
+    # Arrange
+    rng = random.Random(7)
+    alphabet = "abcde "
+
+    def random_item() -> Item:
+        return Item(
+            description="".join(rng.choices(alphabet, k=8)),
+            login="".join(rng.choices(alphabet, k=6)),
+            password="",
+        )
+
+    items = [random_item() for _ in range(50)]
+    sut = SearchIndex(items)
+    queries = ["a", "ab", "abc", "b", "ba c", "cd", "e", "dea"]
+
+    for step in range(200):
+        # Act
+        query = rng.choice(queries)
+        result = sut.search(query)
+
+        # Assert
+        assert result == _scan(items, query), (step, query)
+
+        index = rng.randrange(len(items))
+        match rng.randrange(3):
+            case 0:
+                item = random_item()
+                items.append(item)
+                sut.add(item)
+            case 1:
+                item = random_item()
+                item.id = items[index].id
+                items[index] = item
+                sut.replace(item)
+            case _:
+                sut.remove(items.pop(index).id)
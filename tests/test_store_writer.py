@@ -0,0 +1,127 @@
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from bergmann.entities.journal_record import JournalRecord
+from bergmann.store_writer import Change, StoreWriter
+
+
+def test_flush__changes_coalesced_into_one_batch() -> None:
+    # Arrange
+    batches: list[tuple[Path, list[Change]]] = []
+    sut = StoreWriter(
+        lambda path, changes: lambda: batches.append((path, changes)),
+        threading.Lock(),
+        debounce=60.0,
+        max_delay=60.0,
+    )
+    path = Path("store.bmn")
+    records = [JournalRecord.delete(str(index)) for index in range(20)]
+
+    # Act
+    for record in records:
+        sut.submit(path, record)
+    sut.flush()
+
+    # Assert
+    assert batches == [(path, records)]
+
+
+def test_wait_idle__written_after_debounce() -> None:
+    # Arrange
+    batches: list[list[Change]] = []
+    sut = StoreWriter(
+        lambda path, changes: lambda: batches.append(changes),
+        threading.Lock(),
+        debounce=0.01,
+    )
+
+    # Act
+    sut.submit(Path("store.bmn"), None)
+    sut.wait_idle()
+
+    # Assert
+    assert batches == [[None]]
+
+
+def test_flush__persist_error_raised() -> None:
+    # Arrange
+    def write() -> None:
+        raise OSError("disk full")
+
+    sut = StoreWriter(lambda path, changes: write, threading.Lock())
+    sut.submit(Path("store.bmn"), None)
+
+    # Act\Assert
+    with pytest.raises(OSError, match="disk full"):
+        sut.flush()
+
+
+def test_discard__failed_write_not_retried() -> None:
+    # Arrange
+    writes: list[Change] = []
+
+    def write() -> None:
+        writes.append(None)
+        raise OSError("disk full")
+
+    sut = StoreWriter(lambda path, changes: write, threading.Lock())
+    sut.submit(Path("store.bmn"), None)
+    with pytest.raises(OSError):
+        sut.flush()
+
+    # Act
+    sut.discard()
+    sut.flush()
+
+    # Assert
+    assert writes == [None]
+
+
+def test_flush__written_without_lock() -> None:
+    # Arrange
+    lock = threading.Lock()
+    locked_while_written: list[bool] = []
+
+    def prepare(path: Path, changes: list[Change]) -> Callable[[], None]:
+        assert lock.locked()
+        return lambda: locked_while_written.append(lock.locked())
+
+    sut = StoreWriter(prepare, lock)
+    sut.submit(Path("store.bmn"), JournalRecord.delete("1"))
+
+    # Act
+    sut.flush()
+
+    # Assert
+    assert locked_while_written == [False]
+
+
+def test_flush__failed_batch_written_whole_on_retry() -> None:
+    # Arrange
+    batches: list[list[Change]] = []
+    failures = [OSError("disk full")]
+
+    def write(changes: list[Change]) -> None:
+        if failures:
+            raise failures.pop()
+        batches.append(changes)
+
+    sut = StoreWriter(
+        lambda path, changes: lambda: write(changes),
+        threading.Lock(),
+        retry_delay=60.0,
+    )
+    path = Path("store.bmn")
+    record = JournalRecord.delete("1")
+    sut.submit(path, record)
+    with pytest.raises(OSError, match="disk full"):
+        sut.flush()
+
+    # Act
+    sut.flush()
+
+    # Assert
+    assert batches == [[None]]
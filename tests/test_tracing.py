@@ -0,0 +1,114 @@
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+from bergmann.tracing import SpanRecord, Tracer
+
+
+def _record_span(tracer: Tracer, name: str) -> None:
+    with tracer.span(name):
+        pass
+
+
+@pytest.fixture
+def sut() -> Tracer:
+    return Tracer(enabled=True)
+
+
+def test_span__nested_spans_recorded(sut: Tracer) -> None:
+    # Act
+    with sut.span("outer", items=2) as outer:
+        with sut.span("inner"):
+            pass
+        outer.set(done=True)
+
+    # Assert
+    inner_span, outer_span = sut.spans
+    assert (inner_span.name, inner_span.depth) == ("inner", 1)
+    assert (outer_span.name, outer_span.depth) == ("outer", 0)
+    assert outer_span.args == {"items": 2, "done": True}
+    assert outer_span.start_ns <= inner_span.start_ns
+    assert outer_span.duration_ns >= inner_span.duration_ns
+
+
+def test_span__laps_summed_by_phase(sut: Tracer) -> None:
+    # Act
+    with sut.span("loop") as span:
+        for _ in range(3):
+            span.lap("decrypt")
+            span.lap("parse")
+
+    # Assert
+    (loop_span,) = sut.spans
+    assert set(loop_span.args) == {"decrypt_ms", "parse_ms"}
+    # Each phase is rounded to the microsecond, up by half of one at most.
+    assert loop_span.args["decrypt_ms"] + loop_span.args["parse_ms"] <= (
+        loop_span.duration_ms + 0.001
+    )
+
+
+def test_span__failure_recorded(sut: Tracer) -> None:
+    # Act
+    with pytest.raises(KeyError), sut.span("failing"):
+        raise KeyError()
+
+    # Assert
+    (span,) = sut.spans
+    assert span.args == {"error": "KeyError"}
+
+
+def test_span__disabled_records_nothing() -> None:
+    # Arrange
+    sut = Tracer()
+
+    # Act
+    with sut.span("outer") as outer:
+        outer.lap("phase")
+        outer.set(items=1)
+
+    # Assert
+    assert sut.span("other") is outer
+    assert sut.spans == []
+
+
+def test_spans_since__new_spans_and_listeners(sut: Tracer) -> None:
+    # Arrange
+    heard: list[SpanRecord] = []
+    sut.subscribe(heard.append)
+    with sut.span("first"):
+        pass
+    _, seen = sut.spans_since(0)
+
+    # Act
+    thread = threading.Thread(target=_record_span, args=(sut, "second"))
+    thread.start()
+    thread.join()
+    spans, seen = sut.spans_since(seen)
+
+    # Assert
+    assert [span.name for span in spans] == ["second"]
+    assert seen == 2
+    assert [span.name for span in heard] == ["first", "second"]
+
+
+def test_export_chrome_trace(sut: Tracer, tmp_path: Path) -> None:
+    # Arrange
+    path = tmp_path / "trace.json"
+    with sut.span("model.derive_key", iterations=1000):
+        pass
+
+    # Act
+    sut.export_chrome_trace(path)
+
+    # Assert
+    events = json.loads(path.read_text())["traceEvents"]
+    thread_names = [event for event in events if event["ph"] == "M"]
+    (span,) = (event for event in events if event["ph"] == "X")
+    assert thread_names[0]["args"] == {"name": threading.current_thread().name}
+    assert span["name"] == "model.derive_key"
+    assert span["cat"] == "model"
+    assert span["args"] == {"iterations": 1000}
+    assert span["ts"] >= 0
+    assert span["dur"] >= 0